@@ -0,0 +1,189 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .budgets import current_window, current_windows, with_spent
+from .models import Budget, Notification
+
+# Budget threshold alerts. Every budget keeps a running total of the expenses
+# in its current period window; an expense write moves the totals of just the
+# budgets it falls in, found through ``budget_user_window_idx`` and the
+# account/category links, and records a ``Notification`` when a threshold is
+# crossed upwards within that window. The first write in a new window starts
+# the total and the thresholds over.
+
+ALERT_THRESHOLDS = (50, 80, 100)
+
+
+def alert_level(spent, amount):
+    """The highest threshold ``spent`` has reached, or 0."""
+    if amount <= 0:
+        return 0
+    progress = spent / amount * 100
+    return max((t for t in ALERT_THRESHOLDS if progress >= t), default=0)
+
+
+def expense_entries(records):
+    """Yield ``((user_id, account_id, category, date), amount)`` per expense."""
+    for record in records:
+        if record.record_type == "expense" and record.account_id:
+            yield (
+                record.user_id,
+                record.account_id,
+                record.category,
+                record.date,
+            ), record.amount
+
+
+def threshold_notification(budget_id, user_id, name, threshold):
+    if threshold >= 100:
+        message = f'You have used all of your "{name}" budget.'
+    else:
+        message = f'You have used {threshold}% of your "{name}" budget.'
+    return Notification(
+        user_id=user_id, budget_id=budget_id, threshold=threshold, message=message
+    )
+
+
+def previous_level(level, stored_start, window_start):
+    """
+    The threshold already reported in ``window_start``'s window: none once a
+    new window has begun. Totals kept before windows existed have no start
+    and count as the current window's.
+    """
+    if stored_start is None or stored_start == window_start:
+        return level
+    return 0
+
+
+def apply_expense_deltas(deltas, today=None):
+    """
+    Apply ``{(user_id, account_id, category, date): amount}`` to the running
+    totals of the budgets whose current window (on ``today``, default today)
+    covers them.
+
+    One query finds every candidate budget for the whole batch, and each
+    affected budget gets one ``F()`` update. A budget whose totals still
+    belong to an earlier window is recomputed for the current one instead,
+    all of them in one query. Must run inside the transaction that wrote the
+    records.
+    """
+    deltas = {key: amount for key, amount in deltas.items() if amount}
+    if not deltas:
+        return
+    if today is None:
+        today = timezone.localdate()
+
+    days = [day for _, _, _, day in deltas]
+    candidates = (
+        Budget.objects.filter(
+            user_id__in={user_id for user_id, _, _, _ in deltas},
+            start_date__lte=max(days),
+            end_date__gte=min(days),
+            account__in={account_id for _, account_id, _, _ in deltas},
+            budget_categories__category__in={category for _, _, category, _ in deltas},
+        )
+        .select_for_update(of=("self",))
+        .values_list(
+            "pk",
+            "user_id",
+            "account",
+            "budget_categories__category",
+            "period",
+            "start_date",
+            "end_date",
+            "name",
+            "amount",
+            "running_spent",
+            "alert_level",
+            "running_window_start",
+        )
+    )
+
+    budgets = {}
+    windows = {}
+    covering = defaultdict(list)
+    for pk, user_id, account_id, category, period, start, end, *state in candidates:
+        if pk not in budgets:
+            budgets[pk] = (user_id, *state)
+            window = current_window(
+                Budget(period=period, start_date=start, end_date=end), today
+            )
+            if window is not None:
+                windows[pk] = window
+        if pk in windows:
+            covering[user_id, account_id, category].append((pk, *windows[pk]))
+
+    budget_deltas = defaultdict(Decimal)
+    for (user_id, account_id, category, day), amount in deltas.items():
+        for pk, start, end in covering.get((user_id, account_id, category), ()):
+            if start <= day <= end:
+                budget_deltas[pk] += amount
+
+    moved = sorted(pk for pk, delta in budget_deltas.items() if delta)
+    rolled_over = [pk for pk in moved if budgets[pk][-1] != windows[pk][0]]
+    # The records are already written, so this includes their amounts.
+    recomputed = dict(
+        with_spent(
+            Budget.objects.filter(pk__in=rolled_over),
+            {pk: windows[pk] for pk in rolled_over},
+        ).values_list("pk", "spent")
+    )
+
+    notifications = []
+    for pk in moved:
+        user_id, name, amount, running_spent, level, stored_start = budgets[pk]
+        window_start = windows[pk][0]
+        if pk in recomputed:
+            running_spent = recomputed[pk]
+            update = {"running_spent": running_spent}
+        else:
+            running_spent += budget_deltas[pk]
+            update = {"running_spent": F("running_spent") + budget_deltas[pk]}
+        new_level = alert_level(running_spent, amount)
+        Budget.objects.filter(pk=pk).update(
+            **update, alert_level=new_level, running_window_start=window_start
+        )
+        if new_level > previous_level(level, stored_start, window_start):
+            notifications.append(threshold_notification(pk, user_id, name, new_level))
+    Notification.objects.bulk_create(notifications)
+
+
+def refresh_running_spent(budgets, today=None):
+    """
+    Recompute the running totals of ``budgets`` (a queryset) for their
+    current window on ``today`` (default today) from the records, after
+    their window, accounts or categories were edited.
+    """
+    if today is None:
+        today = timezone.localdate()
+    notifications = []
+    with transaction.atomic():
+        budgets = list(budgets.select_for_update(of=("self",)))
+        windows = current_windows(budgets, today)
+        spent = dict(
+            with_spent(
+                Budget.objects.filter(pk__in=[budget.pk for budget in budgets]),
+                windows,
+            ).values_list("pk", "spent")
+        )
+        for budget in budgets:
+            window_start = windows[budget.pk][0] if budget.pk in windows else None
+            level = alert_level(spent[budget.pk], budget.amount)
+            Budget.objects.filter(pk=budget.pk).update(
+                running_spent=spent[budget.pk],
+                alert_level=level,
+                running_window_start=window_start,
+            )
+            if level > previous_level(
+                budget.alert_level, budget.running_window_start, window_start
+            ):
+                notifications.append(
+                    threshold_notification(
+                        budget.pk, budget.user_id, budget.name, level
+                    )
+                )
+        Notification.objects.bulk_create(notifications)
@@ -0,0 +1,208 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from functools import lru_cache
+
+import numpy as np
+from django.db.models.functions import Coalesce
+
+from public.models import CustomUser
+from .models import CATEGORY_TYPE_CHOICES, RECORD_TYPE_CHOICES, Record
+from .rates import CENTS, MissingRate, current_rates
+
+# Columnar, in-memory copies of a user's records for analytics. A frame holds
+# one NumPy array per column, in date order:
+#
+#   days        int32  days since 1970-01-01
+#   amounts     int64  minor units (cents) in the user's base currency
+#   categories  int16  index into ``CATEGORIES``
+#   kinds       int8   index into ``RECORD_TYPES``
+#   accounts    int32  index into ``frame.account_ids`` (the source account)
+#
+# which is about 19 bytes a record. ``np.bincount`` sums in float64, which is
+# exact for totals below 2**53 minor units. Frames are built once per data version
+# and kept in a bounded LRU cache, so the functions below only ever do array
+# arithmetic.
+
+FRAME_CACHE_SIZE = 64
+EPOCH = date(1970, 1, 1).toordinal()
+
+CATEGORIES = [value for value, _ in CATEGORY_TYPE_CHOICES]
+CATEGORY_CODES = {value: code for code, value in enumerate(CATEGORIES)}
+RECORD_TYPES = [value for value, _ in RECORD_TYPE_CHOICES]
+RECORD_TYPE_CODES = {value: code for code, value in enumerate(RECORD_TYPES)}
+
+
+def day_number(day):
+    return day.toordinal() - EPOCH
+
+
+def day_from_number(number):
+    return date.fromordinal(int(number) + EPOCH)
+
+
+def minor_units(amounts):
+    """Minor-unit integers back to ``Decimal``."""
+    return (Decimal(int(amount)) * CENTS for amount in amounts)
+
+
+class RecordFrame:
+    """The records of one user as read-only column arrays, oldest first."""
+
+    def __init__(self, currency, days, amounts, categories, kinds, accounts):
+        self.currency = currency
+        self.days = np.array(days, dtype=np.int32)
+        self.amounts = np.array(amounts, dtype=np.int64)
+        self.categories = np.array(categories, dtype=np.int16)
+        self.kinds = np.array(kinds, dtype=np.int8)
+        self.accounts = np.array(accounts, dtype=np.int32)
+        for column in (
+            self.days,
+            self.amounts,
+            self.categories,
+            self.kinds,
+            self.accounts,
+        ):
+            # Frames are shared between requests through the cache.
+            column.flags.writeable = False
+        self.account_ids = []
+        # Currencies without a rate to ``currency``; their records are left out.
+        self.missing_rates = []
+
+    def __len__(self):
+        return len(self.days)
+
+    def rows(self, start=None, end=None, record_type=None):
+        """
+        Index selecting the records dated ``start`` to ``end`` (inclusive), of
+        ``record_type`` if given. Dates are sorted, so the range is a slice.
+        """
+        first = 0 if start is None else np.searchsorted(self.days, day_number(start))
+        last = (
+            len(self)
+            if end is None
+            else np.searchsorted(self.days, day_number(end), side="right")
+        )
+        if record_type is None:
+            return slice(first, last)
+        kinds = self.kinds[first:last]
+        return first + np.flatnonzero(kinds == RECORD_TYPE_CODES[record_type])
+
+
+def load_frame(user_id, currency, rates):
+    """
+    Read a user's records into a ``RecordFrame`` with one query, converted
+    with the ``RateTable`` ``rates``.
+    """
+    rows = (
+        Record.objects.filter(user_id=user_id)
+        .annotate(
+            source_account=Coalesce("account", "from_account"),
+            source_currency=Coalesce("account__currency", "from_account__currency"),
+        )
+        .order_by("date", "id")
+        .values_list(
+            "date",
+            "amount",
+            "category",
+            "record_type",
+            "source_account",
+            "source_currency",
+        )
+    )
+    columns = ([], [], [], [], [])
+    account_codes = {}
+    rates_on_day = {}
+    missing = set()
+    for day, amount, category, record_type, account_id, account_currency in rows:
+        if account_currency and account_currency != currency:
+            key = (account_currency, day)
+            if key not in rates_on_day:
+                try:
+                    rates_on_day[key] = rates.rate(account_currency, currency, day)
+                except MissingRate:
+                    rates_on_day[key] = None
+            if rates_on_day[key] is None:
+                missing.add(account_currency)
+                continue
+            amount = (amount * rates_on_day[key]).quantize(CENTS)
+        for column, value in zip(
+            columns,
+            (
+                day_number(day),
+                int(amount.scaleb(2)),
+                CATEGORY_CODES[category],
+                RECORD_TYPE_CODES[record_type],
+                account_codes.setdefault(account_id, len(account_codes)),
+            ),
+        ):
+            column.append(value)
+
+    frame = RecordFrame(currency, *columns)
+    frame.account_ids = list(account_codes)
+    frame.missing_rates = sorted(missing)
+    return frame
+
+
+@lru_cache(maxsize=FRAME_CACHE_SIZE)
+def cached_frame(user_id, data_version, currency, rates):
+    # ``data_version`` is only part of the key, and ``rates`` hashes by its
+    # version: a write or a rate change in any process makes the next lookup
+    # miss, and the stale frame ages out of the cache.
+    return load_frame(user_id, currency, rates)
+
+
+def record_frame(user):
+    """The current ``RecordFrame`` of ``user``, from the cache when possible."""
+    data_version, currency = CustomUser.objects.values_list(
+        "data_version", "base_currency"
+    ).get(pk=user.pk)
+    return cached_frame(user.pk, data_version, currency, current_rates())
+
+
+def category_totals(frame, start=None, end=None, record_type="expense"):
+    """``[(category, total)]`` over the range, largest first, zeros left out."""
+    rows = frame.rows(start, end, record_type)
+    totals = np.bincount(
+        frame.categories[rows],
+        weights=frame.amounts[rows],
+        minlength=len(CATEGORIES),
+    )
+    totals = np.rint(totals).astype(np.int64)
+    order = np.argsort(-totals, kind="stable")
+    order = order[totals[order] != 0]
+    return list(zip((CATEGORIES[code] for code in order), minor_units(totals[order])))
+
+
+def amount_percentiles(
+    frame, percentiles=(50, 90, 99), start=None, end=None, record_type="expense"
+):
+    """``{percentile: amount}`` of single record amounts over the range."""
+    amounts = frame.amounts[frame.rows(start, end, record_type)]
+    if not len(amounts):
+        return {percentile: None for percentile in percentiles}
+    values = np.percentile(amounts, percentiles, method="nearest")
+    return dict(zip(percentiles, minor_units(values)))
+
+
+def rolling_sums(frame, window, start, end, record_type="expense"):
+    """
+    ``[(day, total)]`` for each day from ``start`` to ``end``, where total is
+    the sum of the ``window`` days ending on that day.
+    """
+    first = start - timedelta(days=window - 1)
+    rows = frame.rows(first, end, record_type)
+    days = (end - first).days + 1
+    daily = np.bincount(
+        frame.days[rows] - day_number(first),
+        weights=frame.amounts[rows],
+        minlength=days,
+    )
+    daily = np.rint(daily).astype(np.int64)
+    cumulative = np.concatenate(([0], np.cumsum(daily)))
+    sums = cumulative[window:] - cumulative[:-window]
+    return list(
+        zip(
+            (start + timedelta(days=offset) for offset in range(len(sums))),
+            minor_units(sums),
+        )
+    )
@@ -0,0 +1,340 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, TruncMonth
+
+from .models import Account, AccountDailyBalance, BalanceCheckpoint, Record
+from .periods import month_end, month_start
+
+ZERO = Decimal("0.00")
+
+
+def ledger_entries(records):
+    """Yield ``(account_id, date, delta)`` for each balance movement in ``records``."""
+    for record in records:
+        if record.record_type == "expense" and record.account_id:
+            yield record.account_id, record.date, -record.amount
+        elif record.record_type == "income" and record.account_id:
+            yield record.account_id, record.date, record.amount
+        elif (
+            record.record_type == "transfer"
+            and record.from_account_id
+            and record.to_account_id
+        ):
+            yield record.from_account_id, record.date, -record.amount
+            yield record.to_account_id, record.date, record.amount
+
+
+def account_records(account_id):
+    return Record.objects.filter(
+        Q(account_id=account_id)
+        | Q(from_account_id=account_id)
+        | Q(to_account_id=account_id)
+    )
+
+
+def account_flow(account_id):
+    """Aggregate expression for the net effect of records on one account."""
+    inflow = Q(record_type="income", account_id=account_id) | Q(
+        record_type="transfer", to_account_id=account_id, from_account__isnull=False
+    )
+    outflow = Q(record_type="expense", account_id=account_id) | Q(
+        record_type="transfer", from_account_id=account_id, to_account__isnull=False
+    )
+    output_field = DecimalField(max_digits=14, decimal_places=2)
+    return Coalesce(
+        Sum("amount", filter=inflow), Value(ZERO), output_field=output_field
+    ) - Coalesce(Sum("amount", filter=outflow), Value(ZERO), output_field=output_field)
+
+
+def net_flow(account_id, after, until=None):
+    """Net change to an account from records dated after ``after`` up to ``until``."""
+    records = account_records(account_id).filter(date__gt=after)
+    if until is not None:
+        records = records.filter(date__lte=until)
+    return records.aggregate(flow=account_flow(account_id))["flow"]
+
+
+def balance_as_of(account_id, day):
+    """
+    Balance of an account at the end of ``day``.
+
+    Starts from the closest checkpoint before ``day``'s month and adds the
+    records since then, so only about a month of records is read. Falls back
+    to the next checkpoint, or the live balance, for days before the first one.
+    """
+    checkpoints = BalanceCheckpoint.objects.filter(account_id=account_id)
+    checkpoint = (
+        checkpoints.filter(month__lt=month_start(day)).order_by("-month").first()
+    )
+    if checkpoint is not None:
+        return checkpoint.balance + net_flow(
+            account_id, month_end(checkpoint.month), day
+        )
+
+    checkpoint = (
+        checkpoints.filter(month__gte=month_start(day)).order_by("month").first()
+    )
+    if checkpoint is not None:
+        return checkpoint.balance - net_flow(
+            account_id, day, month_end(checkpoint.month)
+        )
+
+    balance = Account.objects.values_list("balance", flat=True).get(pk=account_id)
+    return balance - net_flow(account_id, day)
+
+
+def update_checkpoints(deltas):
+    """
+    Apply ``{(account_id, month): delta}`` to the stored checkpoints.
+
+    A record dated in ``month`` changes the closing balance of that month and
+    every month after it, so each account takes one UPDATE: a checkpoint moves
+    by the sum of the deltas up to its month. Months that had no checkpoint
+    yet get one, so the next balance query stays short: one ``balance_as_of``
+    at the earliest of them, then the months' net flows added in order.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    per_account = defaultdict(list)
+    for (account_id, month), delta in sorted(deltas.items()):
+        per_account[account_id].append((month, delta))
+
+    for account_id, months in per_account.items():
+        moved = []
+        total = ZERO
+        for month, delta in months:
+            total += delta
+            moved.append(When(month__gte=month, then=F("balance") + total))
+        BalanceCheckpoint.objects.filter(
+            account_id=account_id, month__gte=months[0][0]
+        ).update(
+            # The latest month on or before the checkpoint's wins.
+            balance=Case(*reversed(moved), default=F("balance"))
+        )
+
+    existing = set(
+        BalanceCheckpoint.objects.filter(
+            account_id__in=per_account,
+            month__in={month for _, month in deltas},
+        ).values_list("account_id", "month")
+    )
+    checkpoints = []
+    for account_id, months in per_account.items():
+        new_months = {
+            month for month, _ in months if (account_id, month) not in existing
+        }
+        if not new_months:
+            continue
+        first, last = min(new_months), max(new_months)
+        balance = balance_as_of(account_id, month_end(first))
+        flows = {}
+        if len(new_months) > 1:
+            flows = dict(
+                account_records(account_id)
+                .filter(date__gt=month_end(first), date__lte=month_end(last))
+                .annotate(month=TruncMonth("date"))
+                .values("month")
+                .annotate(flow=account_flow(account_id))
+                .values_list("month", "flow")
+                .order_by()
+            )
+        flows[first] = ZERO
+        for month in sorted(flows.keys() | new_months):
+            balance += flows.get(month, ZERO)
+            if month in new_months:
+                checkpoints.append(
+                    BalanceCheckpoint(
+                        account_id=account_id, month=month, balance=balance
+                    )
+                )
+    BalanceCheckpoint.objects.bulk_create(checkpoints)
+
+
+def update_daily_balances(deltas):
+    """
+    Apply ``{(account_id, date): delta}`` to the daily balance series.
+
+    Every stored day from ``date`` on moves by ``delta``, like the monthly
+    checkpoints. Each account takes one UPDATE: a stored day moves by the sum
+    of the deltas on or before it. Days that had no row yet get one from a
+    single ``balance_as_of`` at the earliest of them, carried forward through
+    the stored days in between.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    per_account = defaultdict(list)
+    for (account_id, day), delta in sorted(deltas.items()):
+        per_account[account_id].append((day, delta))
+
+    for account_id, days in per_account.items():
+        moved = []
+        total = ZERO
+        for day, delta in days:
+            total += delta
+            moved.append(When(date__gte=day, then=F("balance") + total))
+        AccountDailyBalance.objects.filter(
+            account_id=account_id, date__gte=days[0][0]
+        ).update(
+            # The latest day on or before the row's date wins.
+            balance=Case(*reversed(moved), default=F("balance")),
+            flow=Case(
+                *(When(date=day, then=F("flow") + delta) for day, delta in days),
+                default=F("flow"),
+            ),
+        )
+
+    stored = defaultdict(dict)
+    for account_id, day, balance in AccountDailyBalance.objects.filter(
+        account_id__in=per_account,
+        date__gte=min(day for _, day in deltas),
+        date__lte=max(day for _, day in deltas),
+    ).values_list("account_id", "date", "balance"):
+        stored[account_id][day] = balance
+
+    rows = []
+    for account_id, days in per_account.items():
+        stored_days = stored[account_id]
+        new_days = {day for day, _ in days if day not in stored_days}
+        if not new_days:
+            continue
+        first, last = min(new_days), max(new_days)
+        between = {day for day in stored_days if first < day < last}
+        balance = None
+        for day in sorted(new_days | between):
+            if day in stored_days:
+                balance = stored_days[day]
+                continue
+            if balance is None:
+                balance = balance_as_of(account_id, day)
+            else:
+                # No row means no earlier records on ``day``.
+                balance += deltas[account_id, day]
+            rows.append(
+                AccountDailyBalance(
+                    account_id=account_id,
+                    date=day,
+                    balance=balance,
+                    flow=deltas[account_id, day],
+                )
+            )
+    AccountDailyBalance.objects.bulk_create(rows)
+
+
+def balance_series(account_id, start, end):
+    """
+    ``[(date, balance)]`` at the end of every day from ``start`` to ``end``.
+
+    One range scan over the daily rows, starting at the last row on or before
+    ``start``, so days without records carry the previous balance forward.
+    """
+    carried = (
+        AccountDailyBalance.objects.filter(account_id=account_id, date__lte=start)
+        .order_by("-date")
+        .values("date")[:1]
+    )
+    rows = list(
+        AccountDailyBalance.objects.filter(
+            account_id=account_id,
+            date__gte=Coalesce(Subquery(carried), Value(start)),
+            date__lte=end,
+        )
+        .order_by("date")
+        .values_list("date", "balance", "flow")
+    )
+    if rows and rows[0][0] <= start:
+        balance = rows[0][1]
+    elif rows:
+        # The account's history starts inside the range.
+        balance = rows[0][1] - rows[0][2]
+    else:
+        # No records on or before ``end``: the balance before the first one.
+        first = (
+            AccountDailyBalance.objects.filter(account_id=account_id)
+            .order_by("date")
+            .values_list("balance", "flow")
+            .first()
+        )
+        if first is None:
+            balance = Account.objects.values_list("balance", flat=True).get(
+                pk=account_id
+            )
+        else:
+            balance = first[0] - first[1]
+
+    balances = {day: day_balance for day, day_balance, _ in rows}
+    series = []
+    day = start
+    while day <= end:
+        balance = balances.get(day, balance)
+        series.append((day, balance))
+        day += timedelta(days=1)
+    return series
+
+
+def shift_checkpoints(account_id, delta):
+    """
+    Move every checkpoint and daily balance of an account after its balance
+    was set by hand.
+    """
+    if delta:
+        BalanceCheckpoint.objects.filter(account_id=account_id).update(
+            balance=F("balance") + delta
+        )
+        AccountDailyBalance.objects.filter(account_id=account_id).update(
+            balance=F("balance") + delta
+        )
+
+
+def rebuild_checkpoints(account):
+    """Recompute all checkpoints of ``account`` with one grouped query."""
+    flows = (
+        account_records(account.pk)
+        .annotate(month=TruncMonth("date"))
+        .values("month")
+        .annotate(flow=account_flow(account.pk))
+        .order_by("-month")
+    )
+    with transaction.atomic():
+        balance = Account.objects.values_list("balance", flat=True).get(pk=account.pk)
+        checkpoints = []
+        for row in flows:
+            checkpoints.append(
+                BalanceCheckpoint(account=account, month=row["month"], balance=balance)
+            )
+            balance -= row["flow"]
+
+        BalanceCheckpoint.objects.filter(account=account).delete()
+        BalanceCheckpoint.objects.bulk_create(checkpoints)
+    return len(checkpoints)
+
+
+def rebuild_daily_balances(account):
+    """Recompute the daily balance series of ``account`` with one grouped query."""
+    flows = (
+        account_records(account.pk)
+        .values("date")
+        .annotate(flow=account_flow(account.pk))
+        .order_by("-date")
+    )
+    with transaction.atomic():
+        balance = Account.objects.values_list("balance", flat=True).get(pk=account.pk)
+        rows = []
+        for row in flows:
+            rows.append(
+                AccountDailyBalance(
+                    account=account, date=row["date"], balance=balance, flow=row["flow"]
+                )
+            )
+            balance -= row["flow"]
+
+        AccountDailyBalance.objects.filter(account=account).delete()
+        AccountDailyBalance.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
@@ -0,0 +1,311 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import (
+    Case,
+    DateField,
+    DecimalField,
+    F,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from public.models import CustomUser
+from .models import Budget, BudgetCategory, Record
+from .periods import advance, period_step
+
+# Budget spend is computed in the database as a correlated subquery, so a
+# list of budgets costs one query however many budgets it holds. ``amount``
+# is per period: a Week/Month/Year budget's spend covers only its current
+# window (see ``current_window``), a One-Time budget's its whole range.
+#
+# Results are cached per budget and window under the owner's
+# ``data_version``. Every expense write and every budget change bumps the
+# version in the same transaction, so a cached value is never read after the
+# data it was computed from has changed; old entries are simply never asked
+# for again.
+
+SPENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+ZERO = Decimal("0.00")
+SPENT_FIELD = DecimalField(max_digits=14, decimal_places=2)
+
+
+def spent_subquery():
+    """
+    Expression for the expenses a ``Budget`` row covers: its user's records in
+    the budget's accounts and categories, dated within its ``window_start``
+    and ``window_end`` annotations.
+    """
+    budget_accounts = Budget.account.through.objects.filter(
+        budget_id=OuterRef(OuterRef("pk"))
+    ).values("account_id")
+    budget_categories = BudgetCategory.objects.filter(
+        budget_id=OuterRef(OuterRef("pk"))
+    ).values("category")
+    records = (
+        Record.objects.filter(
+            user=OuterRef("user"),
+            record_type="expense",
+            date__gte=OuterRef("window_start"),
+            date__lte=OuterRef("window_end"),
+            account__in=budget_accounts,
+            category__in=budget_categories,
+        )
+        .order_by()
+        .values("user")
+        .annotate(total=Sum("amount"))
+        .values("total")
+    )
+    return Coalesce(Subquery(records), Value(ZERO), output_field=SPENT_FIELD)
+
+
+def current_windows(budgets, today):
+    """``{pk: (start, end)}`` of the current window of each of ``budgets``."""
+    windows = {}
+    for budget in budgets:
+        window = current_window(budget, today)
+        if window is not None:
+            windows[budget.pk] = window
+    return windows
+
+
+def with_spent(queryset, windows):
+    """
+    Annotate budgets with ``spent`` over the window ``windows`` (see
+    ``current_windows``) gives each; ``Budget.progress`` then reads it.
+    Budgets missing from ``windows`` have none, so spend nothing.
+    """
+
+    def bound(index):
+        return Case(
+            *[When(pk=pk, then=Value(window[index])) for pk, window in windows.items()],
+            default=None,
+            output_field=DateField(),
+        )
+
+    return queryset.annotate(window_start=bound(0), window_end=bound(1)).annotate(
+        spent=spent_subquery()
+    )
+
+
+def bump_data_version(user_ids):
+    user_ids = set(user_ids)
+    if user_ids:
+        CustomUser.objects.filter(pk__in=user_ids).update(
+            data_version=F("data_version") + 1
+        )
+
+
+def with_data_version(queryset):
+    return queryset.annotate(data_version=F("user__data_version"))
+
+
+def spent_cache_key(budget_id, data_version, window):
+    start = window[0] if window else None
+    return f"budget-spent:{budget_id}:{data_version}:{start}"
+
+
+def cached_spent(budgets, today=None):
+    """
+    ``{budget id: spent}`` in each budget's current window on ``today``
+    (default today) from the cache, computing the misses in one query.
+    Each budget needs a ``data_version`` (see ``with_data_version``).
+    """
+    if today is None:
+        today = timezone.localdate()
+    budgets = list(budgets)
+    windows = current_windows(budgets, today)
+    keys = {
+        spent_cache_key(budget.pk, budget.data_version, windows.get(budget.pk)): budget
+        for budget in budgets
+    }
+    found = cache.get_many(keys)
+    missing = [budget for key, budget in keys.items() if key not in found]
+    if missing:
+        spent = dict(
+            with_spent(
+                Budget.objects.filter(pk__in=[budget.pk for budget in missing]),
+                windows,
+            ).values_list("pk", "spent")
+        )
+        computed = {
+            spent_cache_key(
+                budget.pk, budget.data_version, windows.get(budget.pk)
+            ): spent[budget.pk]
+            for budget in missing
+        }
+        cache.set_many(computed, SPENT_CACHE_TIMEOUT)
+        found.update(computed)
+    return {budget.pk: found[key] for key, budget in keys.items()}
+
+
+def load_spent(budgets, today=None):
+    """Set ``spent`` on each of ``budgets`` via ``cached_spent``. Returns a list."""
+    budgets = list(budgets)
+    spent = cached_spent(budgets, today)
+    for budget in budgets:
+        budget.spent = spent[budget.pk]
+    return budgets
+
+
+def load_running_spent(budgets, today):
+    """
+    Set ``spent`` on each of ``budgets`` to the spend of its current window:
+    the running total where it belongs to that window, else computed, for
+    all such budgets in one query. Returns a list.
+    """
+    budgets = list(budgets)
+    windows = current_windows(budgets, today)
+    stale = {
+        budget.pk: windows[budget.pk]
+        for budget in budgets
+        if budget.pk in windows and budget.running_window_start != windows[budget.pk][0]
+    }
+    spent = {}
+    if stale:
+        spent = dict(
+            with_spent(Budget.objects.filter(pk__in=stale), stale).values_list(
+                "pk", "spent"
+            )
+        )
+    for budget in budgets:
+        if budget.pk not in windows:
+            budget.spent = ZERO
+        else:
+            budget.spent = spent.get(budget.pk, budget.running_spent)
+    return budgets
+
+
+def budget_windows(budget, until=None):
+    """
+    The successive ``(start, end)`` windows of a Week/Month/Year budget, from
+    its ``start_date`` to its ``end_date``. Each window starts one period after
+    the previous one; the last is cut short at ``end_date``. One-Time budgets
+    have a single window. With ``until``, windows starting after it are left out.
+    """
+    last_day = budget.end_date if until is None else min(budget.end_date, until)
+    if not period_step(budget.period):
+        if budget.start_date > last_day:
+            return []
+        return [(budget.start_date, budget.end_date)]
+
+    windows = []
+    step = 0
+    start = budget.start_date
+    while start <= last_day:
+        next_start = advance(budget.start_date, budget.period, step + 1)
+        windows.append((start, min(next_start - timedelta(days=1), budget.end_date)))
+        step += 1
+        start = next_start
+    return windows
+
+
+def current_window(budget, today):
+    """
+    The window containing ``today``: the last one once the budget has ended,
+    the first one before it starts. None if the budget ends before it starts.
+    """
+    windows = budget_windows(budget, today)
+    if windows:
+        return windows[-1]
+    windows = budget_windows(budget)
+    return windows[0] if windows else None
+
+
+def budget_records(budget):
+    """The expenses a budget covers, whatever their date."""
+    return Record.objects.filter(
+        user_id=budget.user_id,
+        record_type="expense",
+        account__in=Budget.account.through.objects.filter(budget_id=budget.pk).values(
+            "account_id"
+        ),
+        category__in=BudgetCategory.objects.filter(budget_id=budget.pk).values(
+            "category"
+        ),
+    )
+
+
+def budgets_for_record(record):
+    """The budgets whose spend ``record`` counts towards."""
+    if record.record_type != "expense" or not record.account_id:
+        return Budget.objects.none()
+    return Budget.objects.filter(
+        user_id=record.user_id,
+        account=record.account_id,
+        budget_categories__category=record.category,
+        start_date__lte=record.date,
+        end_date__gte=record.date,
+    )
+
+
+def set_budget_categories(budget, categories):
+    """Replace the categories a saved ``budget`` tracks."""
+    from .alerts import refresh_running_spent
+
+    categories = list(dict.fromkeys(categories))
+    with transaction.atomic():
+        budget.budget_categories.exclude(category__in=categories).delete()
+        existing = set(budget.budget_categories.values_list("category", flat=True))
+        BudgetCategory.objects.bulk_create(
+            BudgetCategory(budget=budget, category=category)
+            for category in categories
+            if category not in existing
+        )
+        bump_data_version([budget.user_id])
+        refresh_running_spent(Budget.objects.filter(pk=budget.pk))
+    # Drop a stale prefetch so ``budget.categories`` reads the new rows.
+    getattr(budget, "_prefetched_objects_cache", {}).pop("budget_categories", None)
+
+
+def budget_history(budget, until):
+    """
+    Spend per period window up to the one containing ``until``, as a list of
+    ``{"start", "end", "spent", "remaining", "progress"}``.
+
+    The windows are turned into a ``CASE`` over the record date, so the spend
+    of every window comes from one grouped query.
+    """
+    windows = budget_windows(budget, until)
+    if not windows:
+        return []
+
+    bucket = Case(
+        *[
+            When(date__lte=end, then=Value(index))
+            for index, (_, end) in enumerate(windows)
+        ],
+        output_field=IntegerField(),
+    )
+    totals = dict(
+        budget_records(budget)
+        .filter(date__gte=windows[0][0], date__lte=windows[-1][1])
+        .annotate(bucket=bucket)
+        .order_by()
+        .values("bucket")
+        .annotate(total=Sum("amount"))
+        .values_list("bucket", "total")
+    )
+
+    history = []
+    for index, (start, end) in enumerate(windows):
+        spent = totals.get(index) or ZERO
+        history.append(
+            {
+                "start": start,
+                "end": end,
+                "spent": spent,
+                "remaining": budget.amount - spent,
+                "progress": (spent / budget.amount) * 100 if budget.amount > 0 else 0,
+            }
+        )
+    return history
@@ -0,0 +1,101 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Q, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+
+from .periods import add_months
+from .rates import CENTS, MissingRate, current_rates
+
+# Income, expense and net per day, week or month. The database groups the
+# records by truncated date, so a request costs one query over the
+# ``(user, record_type, date)`` index for its range, however long the history
+# behind it; empty buckets are filled in and currencies converted here.
+
+BUCKETS = {"day": TruncDay, "week": TruncWeek, "month": TruncMonth}
+# Range used when ``start_date`` is not given, in buckets back from the end.
+DEFAULT_BUCKETS = {"day": 90, "week": 26, "month": 12}
+MAX_BUCKETS = 3700
+
+ZERO = Decimal("0.00")
+
+
+def bucket_start(day, bucket):
+    """The first day of the bucket containing ``day``, as ``Trunc*`` computes it."""
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def bucket_starts(start, end, bucket):
+    """Every bucket start from the one containing ``start`` up to ``end``."""
+    day = bucket_start(start, bucket)
+    starts = []
+    while day <= end:
+        starts.append(day)
+        if bucket == "month":
+            day = add_months(day, 1)
+        else:
+            day += timedelta(days=7 if bucket == "week" else 1)
+    return starts
+
+
+def default_start(end, bucket):
+    count = DEFAULT_BUCKETS[bucket] - 1
+    if bucket == "month":
+        return add_months(bucket_start(end, bucket), -count)
+    return bucket_start(end, bucket) - timedelta(
+        days=count * (7 if bucket == "week" else 1)
+    )
+
+
+def cash_flow(records, start, end, bucket, currency):
+    """
+    ``[{"start", "income", "expense", "net"}]`` for each bucket of ``records``
+    (a queryset) from ``start`` to ``end``, zero-filled, in ``currency``.
+    Transfers are left out.
+
+    Totals are grouped per account currency and converted at the rate of the
+    bucket's first day. Returns the series and the sorted currencies that had
+    no rate, whose amounts are left out.
+    """
+    totals = (
+        records.filter(
+            record_type__in=["income", "expense"], date__gte=start, date__lte=end
+        )
+        .annotate(bucket=BUCKETS[bucket]("date"))
+        .order_by()
+        .values("bucket", "account__currency")
+        .annotate(
+            income=Sum("amount", filter=Q(record_type="income"), default=ZERO),
+            expense=Sum("amount", filter=Q(record_type="expense"), default=ZERO),
+        )
+        .values_list("bucket", "account__currency", "income", "expense")
+    )
+    rates = current_rates()
+    found = defaultdict(lambda: [ZERO, ZERO])
+    missing_rates = set()
+    for day, account_currency, income, expense in totals:
+        try:
+            rate_on_day = rates.rate(account_currency, currency, day)
+        except MissingRate:
+            missing_rates.add(account_currency)
+            continue
+        found[day][0] += (income * rate_on_day).quantize(CENTS)
+        found[day][1] += (expense * rate_on_day).quantize(CENTS)
+
+    series = []
+    for day in bucket_starts(start, end, bucket):
+        income, expense = found.get(day, (ZERO, ZERO))
+        series.append(
+            {
+                "start": day,
+                "income": income,
+                "expense": expense,
+                "net": income - expense,
+            }
+        )
+    return series, sorted(missing_rates)
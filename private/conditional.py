@@ -0,0 +1,58 @@
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+# Conditional GET for the polled APIs. Every write to a user's accounts,
+# records, budgets or goals bumps ``CustomUser.data_version`` (see
+# ``budgets.bump_data_version`` and ``signals``), so the version alone tells
+# whether anything a user can list has changed. Authentication already loaded
+# the user row, so an unchanged list is answered with 304 without another
+# query. A detail view first checks that the object is still the user's, so
+# a missing or foreign id gets its 404 rather than a 304. Responses that also
+# depend on the date, like budget spend over the current period window, add
+# the day to the tag so a new window is never answered with 304.
+
+
+def data_version_etag(user, day=None):
+    if day is None:
+        return f'W/"{user.pk}-{user.data_version}"'
+    return f'W/"{user.pk}-{user.data_version}-{day.isoformat()}"'
+
+
+def not_modified(request, etag):
+    """A 304 response if the client's ``If-None-Match`` matches ``etag``."""
+    return get_conditional_response(request, etag=etag)
+
+
+def tag_response(response, etag):
+    if response.status_code in (200, 304):
+        response["ETag"] = etag
+        # Let clients keep the body but always revalidate it.
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class DataVersionETagMixin:
+    # Whether the response changes with ``timezone.localdate()``.
+    etag_per_day = False
+
+    def visible(self):
+        """Whether the object a detail view was asked for is the user's."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        if lookup_url_kwarg not in self.kwargs:
+            return True
+        return (
+            self.get_queryset()
+            .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            .exists()
+        )
+
+    def get(self, request, *args, **kwargs):
+        etag = data_version_etag(
+            request.user, timezone.localdate() if self.etag_per_day else None
+        )
+        response = not_modified(request, etag)
+        if response is not None and not self.visible():
+            response = None
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        return tag_response(response, etag)
@@ -0,0 +1,187 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db.models import Sum
+
+from public.models import CustomUser
+from .budgets import load_running_spent
+from .models import Account, Budget, Goal, RecordMonthlyRollup
+from .periods import month_start
+from .rates import MissingRate, current_rates
+
+# The home screen summary in a fixed number of queries: balances per currency,
+# this month's rollup rows per account currency, the active budgets with the
+# running totals of their current window and the goals. Money across accounts
+# is converted to the user's base currency at today's rates. The result is
+# cached under the user's ``data_version``, which every record, account,
+# budget and goal write bumps, and the exchange rate table's version.
+
+TOP_CATEGORIES = 5
+DASHBOARD_CACHE_TIMEOUT = 60 * 60
+
+ZERO = Decimal("0.00")
+
+
+def percentage(part, whole):
+    if not whole:
+        return ZERO
+    return (part / whole * 100).quantize(Decimal("0.01"))
+
+
+def dashboard_cache_key(user_id, data_version, base_currency, rates, today):
+    return f"dashboard:{user_id}:{data_version}:{base_currency}:{rates.version}:{today}"
+
+
+def dashboard_queries(user, today):
+    """The four querysets a dashboard is built from, by name."""
+    return {
+        "balances": Account.objects.filter(user=user, is_active=True)
+        .order_by("currency")
+        .values("currency")
+        .annotate(total=Sum("balance"))
+        .values_list("currency", "total"),
+        "month": RecordMonthlyRollup.objects.filter(
+            user=user, month=month_start(today), record_type__in=["income", "expense"]
+        )
+        .order_by()
+        .values("record_type", "category", "account__currency")
+        .annotate(total=Sum("total"))
+        .values_list("record_type", "category", "account__currency", "total"),
+        "budgets": Budget.objects.filter(
+            user=user, start_date__lte=today, end_date__gte=today
+        )
+        .order_by("end_date", "pk")
+        .only(
+            "name",
+            "amount",
+            "currency",
+            "period",
+            "start_date",
+            "end_date",
+            "running_spent",
+            "running_window_start",
+        ),
+        "goals": Goal.objects.filter(user=user)
+        .order_by("target_date", "pk")
+        .values_list("pk", "goal_name", "target_amount", "saved_amount", "target_date"),
+    }
+
+
+def build_dashboard(rows, today, base_currency, rates):
+    """
+    The summary from the rows of each of ``dashboard_queries``, the budgets
+    passed through ``load_running_spent``, converted with the ``RateTable``
+    ``rates``.
+    """
+    missing_rates = set()
+
+    def to_base(amount, currency):
+        try:
+            return rates.convert(amount, currency, base_currency, today)
+        except MissingRate:
+            missing_rates.add(currency)
+            return ZERO
+
+    balances = dict(rows["balances"])
+    net_worth = sum(
+        (to_base(total, currency) for currency, total in balances.items()), ZERO
+    )
+
+    totals = {"income": ZERO, "expense": ZERO}
+    categories = defaultdict(Decimal)
+    for record_type, category, currency, total in rows["month"]:
+        total = to_base(total, currency)
+        totals[record_type] += total
+        if record_type == "expense":
+            categories[category] += total
+    expenses = sorted(
+        ((category, total) for category, total in categories.items() if total),
+        key=lambda item: (-item[1], item[0]),
+    )
+
+    budgets = [
+        {
+            "id": budget.pk,
+            "name": budget.name,
+            "amount": budget.amount,
+            "currency": budget.currency,
+            "spent": budget.spent,
+            "progress": percentage(budget.spent, budget.amount),
+        }
+        for budget in rows["budgets"]
+    ]
+
+    goals = [
+        {
+            "id": pk,
+            "goal_name": name,
+            "target_amount": target,
+            "saved_amount": saved,
+            "target_date": target_date,
+            "progress": percentage(saved, target),
+        }
+        for pk, name, target, saved, target_date in rows["goals"]
+    ]
+
+    return {
+        "currency": base_currency,
+        "net_worth": net_worth,
+        "balances": balances,
+        "missing_rates": sorted(missing_rates),
+        "month": month_start(today),
+        "income": totals["income"],
+        "expense": totals["expense"],
+        "net": totals["income"] - totals["expense"],
+        "top_categories": [
+            {"category": category, "total": total}
+            for category, total in expenses[:TOP_CATEGORIES]
+        ],
+        "budgets": budgets,
+        "goals": goals,
+    }
+
+
+def dashboard_summary(user, today, base_currency, rates):
+    rows = {
+        name: list(queryset)
+        for name, queryset in dashboard_queries(user, today).items()
+    }
+    load_running_spent(rows["budgets"], today)
+    return build_dashboard(rows, today, base_currency, rates)
+
+
+def cached_dashboard(user, today):
+    # Read the version fresh: ``request.user`` may predate this request's writes.
+    data_version, base_currency = CustomUser.objects.values_list(
+        "data_version", "base_currency"
+    ).get(pk=user.pk)
+    rates = current_rates()
+    key = dashboard_cache_key(user.pk, data_version, base_currency, rates, today)
+    summary = cache.get(key)
+    if summary is None:
+        summary = dashboard_summary(user, today, base_currency, rates)
+        cache.set(key, summary, DASHBOARD_CACHE_TIMEOUT)
+    return summary
+
+
+async def acached_dashboard(user, today):
+    """``cached_dashboard`` with the async ORM and cache API."""
+    data_version, base_currency = await CustomUser.objects.values_list(
+        "data_version", "base_currency"
+    ).aget(pk=user.pk)
+    rates = await sync_to_async(current_rates)()
+    key = dashboard_cache_key(user.pk, data_version, base_currency, rates, today)
+    summary = await cache.aget(key)
+    if summary is None:
+        # ``values_list().aiterator()`` would run its query on the event loop
+        # (Django starts that iterator eagerly), so list each in a thread.
+        rows = {}
+        for name, queryset in dashboard_queries(user, today).items():
+            rows[name] = await sync_to_async(list)(queryset)
+        # Budgets in a new window may need their spend queried.
+        await sync_to_async(load_running_spent)(rows["budgets"], today)
+        summary = build_dashboard(rows, today, base_currency, rates)
+        await cache.aset(key, summary, DASHBOARD_CACHE_TIMEOUT)
+    return summary
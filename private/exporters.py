@@ -0,0 +1,62 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer
+
+EXPORT_FIELDS = [
+    "id",
+    "date",
+    "time",
+    "record_type",
+    "category",
+    "amount",
+    "account_id",
+    "from_account_id",
+    "to_account_id",
+    "note",
+    "is_recurring",
+    "recurrence_period",
+]
+
+
+class Echo:
+    """File-like object that hands back whatever ``csv.writer`` writes to it."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows, fields=EXPORT_FIELDS):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def ndjson_lines(rows, fields=EXPORT_FIELDS):
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode(dict(zip(fields, row))) + "\n"
+
+
+class CSVRenderer(BaseRenderer):
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+    lines = staticmethod(csv_lines)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Only used for error payloads; exports are streamed by the view.
+        data = data if isinstance(data, dict) else {"detail": data}
+        return "".join(self.lines([list(data.values())], list(data))).encode()
+
+
+class NDJSONRenderer(BaseRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+    lines = staticmethod(ndjson_lines)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return (json.dumps(data, cls=DjangoJSONEncoder) + "\n").encode()
@@ -0,0 +1,102 @@
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .models import CATEGORY_TYPE_CHOICES, RECORD_TYPE_CHOICES
+
+# Query parameters accepted by the record list and export endpoints. Each one
+# maps onto a composite index on ``Record`` that starts with ``user`` (or with
+# the account for ``?account``), see ``Record.Meta.indexes``.
+
+CATEGORIES = {value for value, _ in CATEGORY_TYPE_CHOICES}
+RECORD_TYPES = {value for value, _ in RECORD_TYPE_CHOICES}
+BOOLEANS = {"true": True, "1": True, "false": False, "0": False}
+
+
+def _list(params, name):
+    """``?category=A&category=B`` and ``?category=A,B`` are both accepted."""
+    values = []
+    for value in params.getlist(name):
+        values.extend(part.strip() for part in value.split(",") if part.strip())
+    return values
+
+
+def _date(value):
+    return date.fromisoformat(value)
+
+
+def _amount(value):
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValueError(value)
+
+
+def filter_records(queryset, params):
+    """
+    Narrow ``queryset`` by the record filters in ``params`` (a ``QueryDict``).
+
+    Raises ``ValidationError`` naming every parameter that could not be parsed.
+    """
+    filters = Q()
+    errors = {}
+
+    def parse(name, convert, message):
+        value = params.get(name)
+        if not value:
+            return None
+        try:
+            return convert(value)
+        except (ValueError, KeyError):
+            errors[name] = message
+            return None
+
+    start_date = parse("start_date", _date, "Use YYYY-MM-DD.")
+    end_date = parse("end_date", _date, "Use YYYY-MM-DD.")
+    account = parse("account", int, "Use an account id.")
+    min_amount = parse("min_amount", _amount, "Use a number.")
+    max_amount = parse("max_amount", _amount, "Use a number.")
+    is_recurring = parse(
+        "is_recurring", lambda v: BOOLEANS[v.lower()], "Use true or false."
+    )
+
+    record_types = _list(params, "record_type")
+    if set(record_types) - RECORD_TYPES:
+        errors["record_type"] = f"Choose from {', '.join(sorted(RECORD_TYPES))}."
+    categories = _list(params, "category")
+    unknown = set(categories) - CATEGORIES
+    if unknown:
+        errors["category"] = f"Unknown category: {', '.join(sorted(unknown))}."
+
+    if errors:
+        raise ValidationError(errors)
+
+    if start_date:
+        filters &= Q(date__gte=start_date)
+    if end_date:
+        filters &= Q(date__lte=end_date)
+    if record_types:
+        filters &= Q(record_type__in=record_types)
+    if categories:
+        filters &= Q(category__in=categories)
+    if account is not None:
+        filters &= (
+            Q(account_id=account)
+            | Q(from_account_id=account)
+            | Q(to_account_id=account)
+        )
+    if min_amount is not None:
+        filters &= Q(amount__gte=min_amount)
+    if max_amount is not None:
+        filters &= Q(amount__lte=max_amount)
+    if is_recurring is not None:
+        filters &= Q(is_recurring=is_recurring)
+    return queryset.filter(filters)
+
+
+class RecordFilterBackend(BaseFilterBackend):
+    def filter_queryset(self, request, queryset, view):
+        return filter_records(queryset, request.query_params)
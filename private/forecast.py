@@ -0,0 +1,184 @@
+from datetime import timedelta
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Sum
+
+from .budgets import current_window
+from .models import Record
+from .periods import add_months
+
+# End-of-period spend forecasts for budgets.
+#
+# The daily expenses behind all of a user's budgets are loaded with one
+# grouped query into a (budgets x days) matrix. Every statistic below is a
+# difference of cumulative sums over that matrix, so forecasting 50 budgets
+# costs about as much as forecasting one.
+
+RECENT_DAYS = 28
+# Two-sided 95% band of a normal distribution.
+BAND_Z = 1.96
+FORECAST_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def forecast_cache_key(budget, window_start, today):
+    return f"budget-forecast:{budget.pk}:{window_start}:{budget.data_version}:{today}"
+
+
+def daily_matrix(budgets, first_day, last_day):
+    """Expenses per budget per day from ``first_day`` to ``last_day``."""
+    days = (last_day - first_day).days + 1
+    rows = list(
+        Record.objects.filter(
+            user_id__in={budget.user_id for budget in budgets},
+            record_type="expense",
+            account__in={a.pk for budget in budgets for a in budget.account.all()},
+            category__in={c for budget in budgets for c in budget.categories},
+            date__gte=first_day,
+            date__lte=last_day,
+        )
+        .values_list("user_id", "account_id", "category", "date")
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+    matrix = np.zeros((len(budgets), days))
+    if not rows:
+        return matrix
+
+    users, accounts, categories, dates, totals = zip(*rows)
+    users = np.array(users)
+    accounts = np.array(accounts)
+    categories = np.array(categories, dtype=object)
+    offsets = np.array([(day - first_day).days for day in dates])
+    totals = np.array(totals, dtype=float)
+    for index, budget in enumerate(budgets):
+        mask = (
+            (users == budget.user_id)
+            & np.isin(accounts, [a.pk for a in budget.account.all()])
+            & np.isin(categories, budget.categories)
+        )
+        matrix[index] = np.bincount(offsets[mask], weights=totals[mask], minlength=days)
+    return matrix
+
+
+def forecast_budgets(budgets, today):
+    """
+    Forecast the spend of each budget's current window at its last day,
+    skipping budgets without one.
+
+    ``budgets`` need their ``account`` and ``budget_categories`` prefetched.
+    Returns one dict per budget with the spend so far, the individual model
+    projections, the combined forecast and a 95% band around it.
+    """
+    budgets = [budget for budget in budgets if current_window(budget, today)]
+    if not budgets:
+        return []
+
+    windows = [current_window(budget, today) for budget in budgets]
+    starts = [start for start, _ in windows]
+    ends = [end for _, end in windows]
+    last_year = [
+        (add_months(start, -12), add_months(end, -12)) for start, end in windows
+    ]
+    first_day = min(
+        min(start for start, _ in last_year), today - timedelta(days=RECENT_DAYS)
+    )
+    last_day = max(max(ends), today)
+
+    matrix = daily_matrix(budgets, first_day, last_day)
+    # cumulative[:, i] is the total of the first i days; sums over day ranges
+    # become two lookups.
+    cumulative = np.pad(matrix.cumsum(axis=1), ((0, 0), (1, 0)))
+    squares = np.pad((matrix**2).cumsum(axis=1), ((0, 0), (1, 0)))
+    rows = np.arange(len(budgets))
+
+    def offsets(days):
+        return np.array([(day - first_day).days for day in days])
+
+    def total(start, stop, source=cumulative):
+        """Sum over days [start, stop) for every budget."""
+        stop = np.maximum(stop, start)
+        return source[rows, stop] - source[rows, start]
+
+    window_start, window_end = offsets(starts), offsets(ends) + 1
+    length = window_end - window_start
+    today_index = (today - first_day).days + 1
+    elapsed_end = np.clip(today_index, window_start, window_end)
+    elapsed = elapsed_end - window_start
+    remaining = length - elapsed
+
+    spent = total(window_start, elapsed_end)
+
+    recent_start = np.full(len(budgets), today_index - RECENT_DAYS)
+    recent_stop = np.full(len(budgets), today_index)
+    recent_mean = total(recent_start, recent_stop) / RECENT_DAYS
+    recent_var = np.maximum(
+        total(recent_start, recent_stop, squares) / RECENT_DAYS - recent_mean**2, 0
+    )
+    moving_average = spent + recent_mean * remaining
+    run_rate = np.where(
+        elapsed > 0, spent / np.maximum(elapsed, 1) * length, moving_average
+    )
+
+    ly_start = offsets([start for start, _ in last_year])
+    ly_end = offsets([end for _, end in last_year]) + 1
+    ly_remaining = total(np.minimum(ly_start + elapsed, ly_end), ly_end)
+    # Only trust last year when there was any spending in its window.
+    has_last_year = total(ly_start, ly_end) > 0
+    same_period_last_year = np.where(has_last_year, spent + ly_remaining, np.nan)
+
+    models = np.vstack([moving_average, run_rate, same_period_last_year])
+    forecast = np.nanmean(models, axis=0)
+    spread = BAND_Z * np.sqrt(recent_var * remaining)
+    low = np.maximum(forecast - spread, spent)
+    high = forecast + spread
+
+    results = []
+    for index, budget in enumerate(budgets):
+        amount = float(budget.amount)
+        results.append(
+            {
+                "budget": budget.pk,
+                "start": starts[index],
+                "end": ends[index],
+                "amount": amount,
+                "spent": float(spent[index]),
+                "forecast": float(forecast[index]),
+                "low": float(low[index]),
+                "high": float(high[index]),
+                "moving_average": float(moving_average[index]),
+                "run_rate": float(run_rate[index]),
+                "same_period_last_year": (
+                    float(same_period_last_year[index])
+                    if has_last_year[index]
+                    else None
+                ),
+                "will_exceed": bool(forecast[index] > amount),
+            }
+        )
+    return results
+
+
+def cached_forecasts(budgets, today):
+    """
+    ``forecast_budgets`` through the cache, keyed by budget, window, data
+    version and day. ``budgets`` need a ``data_version``. Budgets without a
+    window (ending before they start) are left out.
+    """
+    budgets = [budget for budget in budgets if current_window(budget, today)]
+    keys = {
+        forecast_cache_key(budget, current_window(budget, today)[0], today): budget
+        for budget in budgets
+    }
+    found = cache.get_many(keys)
+    missing = [budget for key, budget in keys.items() if key not in found]
+    if missing:
+        computed = dict(
+            zip(
+                (key for key, budget in keys.items() if key not in found),
+                forecast_budgets(missing, today),
+            )
+        )
+        cache.set_many(computed, FORECAST_CACHE_TIMEOUT)
+        found.update(computed)
+    return [found[key] for key in keys]
@@ -16,6 +16,11 @@ from datetime import timedelta, date
 from public.models import CustomUser
 from django.core.exceptions import ValidationError
 
+CURRENCY_CHOICES = [
+    (c.alpha_3, f"{c.name} ({c.alpha_3})")
+    for c in sorted(pycountry.currencies, key=lambda c: c.name)
+]
+
 # account form page
 class AccountForm(forms.ModelForm):
     balance = forms.DecimalField(
@@ -42,10 +47,7 @@ class AccountForm(forms.ModelForm):
     )
 
     currency = forms.ChoiceField(
-        choices=[
-            (c.alpha_3, f"{c.name} ({c.alpha_3})")
-            for c in sorted(pycountry.currencies, key=lambda c: c.name)
-        ],
+        choices=CURRENCY_CHOICES,
         widget=forms.Select(attrs={"class": "form-select"}),
         initial="NGN",
     )
@@ -187,10 +189,16 @@ class RecordUpdateForm(forms.ModelForm):
 
 
 from django_select2.forms import Select2MultipleWidget
+from .budgets import set_budget_categories
 
 # budget form page
 class BudgetForm(forms.ModelForm):
     currency = forms.CharField(required=False, widget=forms.HiddenInput())
+    categories = forms.MultipleChoiceField(
+        label="Category",
+        choices=CATEGORY_TYPE_CHOICES,
+        widget=Select2MultipleWidget(),
+    )
 
     class Meta:
         model = Budget
@@ -205,7 +213,6 @@ class BudgetForm(forms.ModelForm):
             "account",
         ]
         widgets = {
-            "categories": Select2MultipleWidget(),
             "account": Select2MultipleWidget(),
             "period": forms.Select(attrs={"class": "form-select"}),
             "start_date": forms.DateInput(
@@ -229,8 +236,8 @@ class BudgetForm(forms.ModelForm):
             (k, v) for k, v in PERIOD_TYPE_CHOICES if k != ""
         ]
 
-        self.fields["categories"].choices = CATEGORY_TYPE_CHOICES
-        self.fields["categories"].required = True
+        if self.instance.pk:
+            self.fields["categories"].initial = self.instance.categories
 
         if user is not None:
             self.fields["account"].queryset = Account.objects.filter(user=user)
@@ -248,6 +255,11 @@ class BudgetForm(forms.ModelForm):
         cleaned = super().clean()
         accounts = cleaned.get("account")
         currency = cleaned.get("currency")
+        start_date = cleaned.get("start_date")
+        end_date = cleaned.get("end_date")
+
+        if start_date and end_date and start_date > end_date:
+            self.add_error("end_date", "End date can't be before the start date.")
 
         if accounts:
             currencies = {acc.currency for acc in accounts}
@@ -263,6 +275,10 @@ class BudgetForm(forms.ModelForm):
                 cleaned["currency"] = next(iter(currencies))
         return cleaned
 
+    def _save_m2m(self):
+        super()._save_m2m()
+        set_budget_categories(self.instance, self.cleaned_data["categories"])
+
 # goal form page
 class GoalForm(forms.ModelForm):
     custom_goal_name = forms.CharField(
@@ -294,9 +310,15 @@ class GoalForm(forms.ModelForm):
 
 
 class ProfileUpdateForm(forms.ModelForm):
+    base_currency = forms.ChoiceField(
+        choices=CURRENCY_CHOICES,
+        widget=forms.Select(attrs={"class": "form-select"}),
+        label="Base Currency",
+    )
+
     class Meta:
         model = CustomUser
-        fields = ["first_name", "last_name", "email"]
+        fields = ["first_name", "last_name", "email", "base_currency"]
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -0,0 +1,213 @@
+import csv
+import re
+from collections import namedtuple
+from datetime import datetime, time
+from decimal import Decimal, InvalidOperation
+
+from .models import CATEGORY_TYPE_CHOICES, Record
+
+# Every parser is a generator over the lines of a bank export, so an import
+# holds one row (plus one insert chunk) in memory whatever the file size.
+
+ImportedRow = namedtuple(
+    "ImportedRow", ["line", "date", "time", "amount", "note", "category"]
+)
+
+DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y", "%m/%d/%Y"]
+
+CATEGORIES = {value.lower(): value for value, _ in CATEGORY_TYPE_CHOICES}
+
+CSV_COLUMNS = {
+    "date": ["date", "transaction date", "posting date", "value date"],
+    "amount": ["amount", "value"],
+    "debit": ["debit", "withdrawal", "withdrawals", "money out"],
+    "credit": ["credit", "deposit", "deposits", "money in"],
+    "note": ["note", "description", "narration", "details", "memo", "payee"],
+    "category": ["category"],
+}
+
+
+class ImportFormatError(ValueError):
+    def __init__(self, line, message):
+        super().__init__(f"Line {line}: {message}")
+        self.line = line
+
+
+def parse_date(value, line, date_formats=DATE_FORMATS):
+    value = value.strip()
+    for date_format in date_formats:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    raise ImportFormatError(line, f"unrecognised date {value!r}")
+
+
+def parse_amount(value, line):
+    cleaned = value.strip().replace(",", "").replace(" ", "")
+    if cleaned.startswith("(") and cleaned.endswith(")"):
+        cleaned = "-" + cleaned[1:-1]
+    try:
+        return Decimal(cleaned)
+    except InvalidOperation:
+        raise ImportFormatError(line, f"unrecognised amount {value!r}")
+
+
+def parse_csv(lines, date_formats=DATE_FORMATS):
+    reader = csv.reader(lines)
+    header = [column.strip().lower() for column in next(reader, [])]
+    columns = {}
+    for field, names in CSV_COLUMNS.items():
+        for name in names:
+            if name in header:
+                columns[field] = header.index(name)
+                break
+    if "date" not in columns or not (
+        "amount" in columns or "debit" in columns or "credit" in columns
+    ):
+        raise ImportFormatError(1, "CSV needs a date column and an amount column")
+
+    def cell(row, field):
+        index = columns.get(field)
+        return row[index].strip() if index is not None and index < len(row) else ""
+
+    for row in reader:
+        if not any(value.strip() for value in row):
+            continue
+        line = reader.line_num
+        if "amount" in columns:
+            amount = parse_amount(cell(row, "amount"), line)
+        else:
+            credit, debit = cell(row, "credit"), cell(row, "debit")
+            amount = (parse_amount(credit, line) if credit else 0) - (
+                parse_amount(debit, line) if debit else 0
+            )
+        yield ImportedRow(
+            line,
+            parse_date(cell(row, "date"), line, date_formats),
+            None,
+            amount,
+            cell(row, "note"),
+            cell(row, "category"),
+        )
+
+
+OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+
+def parse_ofx(lines, date_formats=DATE_FORMATS):
+    """Handles both SGML (OFX 1.x, unclosed tags) and XML (OFX 2.x) exports."""
+    transaction = None
+    for line_number, text in enumerate(lines, start=1):
+        for closing, tag, value in OFX_TAG.findall(text):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if not closing:
+                    transaction = {"line": line_number}
+                elif transaction is not None:
+                    yield _ofx_row(transaction)
+                    transaction = None
+            elif transaction is not None and not closing and value.strip():
+                transaction[tag] = value.strip()
+
+
+def _ofx_row(transaction):
+    line = transaction["line"]
+    posted = transaction.get("DTPOSTED", "")
+    if len(posted) < 8:
+        raise ImportFormatError(line, "transaction without DTPOSTED")
+    try:
+        day = datetime.strptime(posted[:8], "%Y%m%d").date()
+        moment = (
+            datetime.strptime(posted[8:14], "%H%M%S").time()
+            if posted[8:14].isdigit() and len(posted) >= 14
+            else None
+        )
+    except ValueError:
+        raise ImportFormatError(line, f"unrecognised date {posted!r}")
+    if "TRNAMT" not in transaction:
+        raise ImportFormatError(line, "transaction without TRNAMT")
+    note = " - ".join(
+        part for part in (transaction.get("NAME"), transaction.get("MEMO")) if part
+    )
+    return ImportedRow(
+        line, day, moment, parse_amount(transaction["TRNAMT"], line), note, ""
+    )
+
+
+QIF_DATE_FORMATS = ["%m/%d/%Y", "%m/%d/%y", "%d/%m/%Y", "%Y-%m-%d"]
+
+
+def parse_qif(lines, date_formats=QIF_DATE_FORMATS):
+    fields, start = {}, None
+    for line_number, text in enumerate(lines, start=1):
+        text = text.rstrip("\r\n")
+        if not text or text.startswith("!"):
+            continue
+        if text.startswith("^"):
+            if fields:
+                yield _qif_row(fields, start, date_formats)
+            fields, start = {}, None
+            continue
+        start = start or line_number
+        fields.setdefault(text[0], text[1:].strip())
+    if fields:
+        yield _qif_row(fields, start, date_formats)
+
+
+def _qif_row(fields, line, date_formats):
+    if "D" not in fields or not ("T" in fields or "U" in fields):
+        raise ImportFormatError(line, "entry needs a D (date) and T (amount) line")
+    # Quicken writes two-digit years as 1/31'25.
+    day = parse_date(fields["D"].replace("'", "/").replace(" ", ""), line, date_formats)
+    amount = parse_amount(fields.get("T", fields.get("U")), line)
+    note = " - ".join(part for part in (fields.get("P"), fields.get("M")) if part)
+    category = fields.get("L", "").split(":")[0]
+    return ImportedRow(line, day, None, amount, note, category)
+
+
+PARSERS = {"csv": parse_csv, "ofx": parse_ofx, "qfx": parse_ofx, "qif": parse_qif}
+
+
+def guess_format(filename):
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    return extension if extension in PARSERS else None
+
+
+def parse_rows(lines, file_format, date_format=None):
+    parser = PARSERS[file_format]
+    if date_format:
+        return parser(lines, date_formats=[date_format])
+    return parser(lines)
+
+
+def rows_to_records(rows, account):
+    """
+    Map parsed rows onto unsaved ``Record`` instances for ``account``.
+
+    Negative amounts are expenses and positive ones income. Categories that
+    match ``CATEGORY_TYPE_CHOICES`` (ignoring case) are kept, anything else
+    lands in "Others" or "Other Income".
+    """
+    for row in rows:
+        if not row.amount:
+            continue
+        record_type = "expense" if row.amount < 0 else "income"
+        category = CATEGORIES.get(row.category.strip().lower()) or (
+            "Others" if record_type == "expense" else "Other Income"
+        )
+        yield Record(
+            user_id=account.user_id,
+            account=account,
+            record_type=record_type,
+            category=category,
+            amount=abs(row.amount),
+            note=row.note,
+            date=row.date,
+            time=row.time or time(0, 0),
+        )
+
+
+def decode_lines(binary_lines, encoding="utf-8-sig"):
+    for line in binary_lines:
+        yield line.decode(encoding, errors="replace")
@@ -0,0 +1,178 @@
+import asyncio
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from private.models import Account, Record
+from public.models import CustomUser
+
+# Each pair is the sync DRF endpoint and its async counterpart.
+ENDPOINTS = [
+    ("accounts", "account-api-list-create", "async-account-list"),
+    ("records", "record-api-list-create", "async-record-list"),
+    ("budgets", "budget-list-create", "async-budget-list"),
+    ("dashboard", "dashboard-api", "async-dashboard"),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests per second of the sync list endpoints served by the "
+        "WSGI application with the async ones served by the ASGI application, "
+        "both driven in-process at the same concurrency. A throwaway user and "
+        "its records are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=2000)
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=16)
+
+    def handle(self, *args, **options):
+        from expensetracker.asgi import application as asgi_application
+        from expensetracker.wsgi import application as wsgi_application
+
+        self.host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else "localhost"
+        if self.host.startswith("."):
+            self.host = self.host[1:]
+        user = CustomUser.objects.create_user(
+            username="benchmark-async", email="benchmark-async@example.com"
+        )
+        try:
+            account = Account.objects.create(
+                user=user,
+                name="Benchmark",
+                balance=Decimal("0.00"),
+                account_type="Cash",
+                currency="NGN",
+            )
+            Record.objects.bulk_create(
+                (
+                    Record(
+                        user=user,
+                        account=account,
+                        record_type="expense",
+                        category="Groceries",
+                        amount=Decimal(i % 1000) + Decimal("0.25"),
+                        date=date(2020, 1, 1) + timedelta(days=i % 2000),
+                        note=f"Record {i}",
+                    )
+                    for i in range(options["rows"])
+                ),
+                batch_size=1000,
+            )
+            token = f"Bearer {RefreshToken.for_user(user).access_token}"
+
+            self.stdout.write(
+                f"{options['requests']} requests per endpoint, "
+                f"{options['concurrency']} at a time:"
+            )
+            for label, sync_name, async_name in ENDPOINTS:
+                wsgi = self.run_wsgi(
+                    wsgi_application,
+                    reverse(sync_name),
+                    token,
+                    options["requests"],
+                    options["concurrency"],
+                )
+                asgi = asyncio.run(
+                    self.run_asgi(
+                        asgi_application,
+                        reverse(async_name),
+                        token,
+                        options["requests"],
+                        options["concurrency"],
+                    )
+                )
+                self.stdout.write(
+                    f"  {label:<10} WSGI {wsgi:8.1f} req/s   "
+                    f"ASGI {asgi:8.1f} req/s   ({asgi / wsgi:.2f}x)"
+                )
+        finally:
+            Record.objects.filter(user=user).delete()
+            user.delete()
+
+    def check_status(self, path, status):
+        if not status.startswith("200"):
+            raise CommandError(f"GET {path} answered {status}")
+
+    def run_wsgi(self, application, path, token, requests, concurrency):
+        def request(_):
+            environ = {
+                "REQUEST_METHOD": "GET",
+                "PATH_INFO": path,
+                "QUERY_STRING": "",
+                "SERVER_NAME": self.host,
+                "SERVER_PORT": "80",
+                "SERVER_PROTOCOL": "HTTP/1.1",
+                "HTTP_HOST": self.host,
+                "HTTP_AUTHORIZATION": token,
+                "wsgi.url_scheme": "http",
+                "wsgi.input": io.BytesIO(),
+                "wsgi.errors": io.StringIO(),
+            }
+            statuses = []
+            body = application(environ, lambda status, headers: statuses.append(status))
+            b"".join(body)
+            body.close()
+            self.check_status(path, statuses[0])
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            list(pool.map(request, range(requests)))
+        return requests / (time.perf_counter() - started)
+
+    async def run_asgi(self, application, path, token, requests, concurrency):
+        slots = asyncio.Semaphore(concurrency)
+
+        async def request():
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": "1.1",
+                "method": "GET",
+                "scheme": "http",
+                "path": path,
+                "raw_path": path.encode(),
+                "query_string": b"",
+                "root_path": "",
+                "headers": [
+                    (b"host", self.host.encode()),
+                    (b"authorization", token.encode()),
+                ],
+                "server": (self.host, 80),
+            }
+            messages = []
+            body_sent = asyncio.Event()
+            requested = False
+
+            async def receive():
+                # The body once, then a disconnect after the response.
+                nonlocal requested
+                if not requested:
+                    requested = True
+                    return {"type": "http.request", "body": b"", "more_body": False}
+                await body_sent.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                messages.append(message)
+                if message["type"] == "http.response.body" and not message.get(
+                    "more_body"
+                ):
+                    body_sent.set()
+
+            async with slots:
+                await application(scope, receive, send)
+            self.check_status(path, str(messages[0]["status"]))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(request() for _ in range(requests)))
+        return requests / (time.perf_counter() - started)
@@ -0,0 +1,92 @@
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from private.fieldsets import (
+    RECORD_FIELDS,
+    record_values,
+    serialize_record_rows,
+)
+from private.models import Account, Record
+from private.serializers import RecordSerializer
+from public.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Time RecordSerializer against the values() fast path of the record "
+        "list on generated records. Everything is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def best_of(self, repeat, func):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        with transaction.atomic():
+            user = CustomUser.objects.create_user(
+                username="benchmark-records", email="benchmark-records@example.com"
+            )
+            account = Account.objects.create(
+                user=user,
+                name="Benchmark",
+                balance=Decimal("0.00"),
+                account_type="Cash",
+                currency="NGN",
+            )
+            Record.objects.bulk_create(
+                (
+                    Record(
+                        user=user,
+                        account=account,
+                        record_type="expense",
+                        category="Groceries",
+                        amount=Decimal(i % 1000) + Decimal("0.25"),
+                        date=date(2020, 1, 1) + timedelta(days=i % 2000),
+                        note=f"Record {i}",
+                    )
+                    for i in range(rows)
+                ),
+                batch_size=1000,
+            )
+            records = Record.objects.filter(user=user).order_by("-date", "-id")
+            fields = list(RECORD_FIELDS)
+
+            serializer = self.best_of(
+                options["repeat"],
+                lambda: RecordSerializer(list(records), many=True).data,
+            )
+            fast = self.best_of(
+                options["repeat"],
+                lambda: serialize_record_rows(record_values(records, fields), fields),
+            )
+            sparse = self.best_of(
+                options["repeat"],
+                lambda: serialize_record_rows(
+                    record_values(records, ["amount"]), ["amount"]
+                ),
+            )
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"{rows} records, best of {options['repeat']}:")
+        self.stdout.write(f"  RecordSerializer       {serializer * 1000:8.1f} ms")
+        self.stdout.write(
+            f"  values() fast path     {fast * 1000:8.1f} ms "
+            f"({serializer / fast:.1f}x faster)"
+        )
+        self.stdout.write(
+            f"  ?fields=amount         {sparse * 1000:8.1f} ms "
+            f"({serializer / sparse:.1f}x faster)"
+        )
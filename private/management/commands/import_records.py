@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from private.importers import (
+    PARSERS,
+    ImportFormatError,
+    guess_format,
+    parse_rows,
+    rows_to_records,
+)
+from private.models import Account
+from private.services import stream_create_records
+
+
+class Command(BaseCommand):
+    help = "Import a CSV, OFX or QIF bank export into an account's records."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import.")
+        parser.add_argument(
+            "--account", type=int, required=True, help="Id of the target account."
+        )
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=sorted(PARSERS),
+            help="File format. Guessed from the extension by default.",
+        )
+        parser.add_argument(
+            "--date-format", help="strptime format of the dates, e.g. %%d/%%m/%%Y."
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of rows inserted per query (default: 1000).",
+        )
+        parser.add_argument("--encoding", default="utf-8-sig")
+
+    def handle(self, *args, **options):
+        try:
+            account = Account.objects.get(pk=options["account"])
+        except Account.DoesNotExist:
+            raise CommandError(f"Account {options['account']} does not exist.")
+
+        file_format = options["file_format"] or guess_format(options["path"])
+        if file_format is None:
+            raise CommandError("Cannot guess the file format, pass --format.")
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive.")
+
+        try:
+            with open(
+                options["path"], newline="", encoding=options["encoding"]
+            ) as lines:
+                rows = parse_rows(lines, file_format, options["date_format"])
+                count = stream_create_records(
+                    rows_to_records(rows, account), options["chunk_size"]
+                )
+        except OSError as exc:
+            raise CommandError(str(exc))
+        except ImportFormatError as exc:
+            raise CommandError(f"Nothing imported. {exc}")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Imported {count} records into {account.name}.")
+        )
@@ -0,0 +1,46 @@
+import csv
+import json
+from datetime import date
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from private.models import ExchangeRate
+
+
+class Command(BaseCommand):
+    help = (
+        "Load exchange rates from a CSV (date,base,quote,rate) or JSON file "
+        "(a list of objects with those keys). Existing rates are replaced."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+
+    def read_rows(self, path):
+        with open(path, newline="", encoding="utf-8") as handle:
+            if path.endswith(".json"):
+                return json.load(handle)
+            return list(csv.DictReader(handle))
+
+    def handle(self, *args, **options):
+        try:
+            rates = [
+                ExchangeRate(
+                    base=row["base"].strip().upper(),
+                    quote=row["quote"].strip().upper(),
+                    date=date.fromisoformat(row["date"].strip()),
+                    rate=Decimal(str(row["rate"]).strip()),
+                )
+                for row in self.read_rows(options["path"])
+            ]
+        except (KeyError, ValueError, ArithmeticError) as exc:
+            raise CommandError(f"Could not read {options['path']}: {exc!r}")
+        ExchangeRate.objects.bulk_create(
+            rates,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["base", "quote", "date"],
+            update_fields=["rate", "updated_at"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Loaded {len(rates)} exchange rates."))
@@ -0,0 +1,38 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from private.recurring import materialize_due_records, run_scheduler
+
+
+class Command(BaseCommand):
+    help = "Create the due occurrences of every recurring record."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date", help="Generate occurrences up to this day (default: today)."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of recurring records handled per transaction.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            help="Keep running, every this many seconds, instead of once.",
+        )
+
+    def handle(self, *args, **options):
+        if options["interval"]:
+            if options["date"]:
+                raise CommandError("--date can't be combined with --interval.")
+            run_scheduler(options["interval"])
+        try:
+            today = date.fromisoformat(options["date"]) if options["date"] else None
+        except ValueError:
+            raise CommandError("--date must use the YYYY-MM-DD format.")
+
+        created = materialize_due_records(today, options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Created {created} records."))
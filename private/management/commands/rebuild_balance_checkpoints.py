@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from private.balances import rebuild_checkpoints, rebuild_daily_balances
+from private.models import Account
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the month-end balance checkpoints and the daily balance "
+        "series of every account."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--account", type=int, help="Only rebuild this account.")
+
+    def handle(self, *args, **options):
+        accounts = Account.objects.order_by("pk")
+        if options["account"]:
+            accounts = accounts.filter(pk=options["account"])
+
+        checkpoints = days = 0
+        for account in accounts.iterator():
+            checkpoints += rebuild_checkpoints(account)
+            days += rebuild_daily_balances(account)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {checkpoints} checkpoints and {days} daily balances."
+            )
+        )
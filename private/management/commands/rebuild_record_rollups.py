@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from private.rollups import rebuild_rollups
+from public.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "Regenerate the monthly record rollups from the records table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, help="Only rebuild this user.")
+
+    def handle(self, *args, **options):
+        user = None
+        if options["user"]:
+            user = CustomUser.objects.get(pk=options["user"])
+        count = rebuild_rollups(user)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} rollup rows."))
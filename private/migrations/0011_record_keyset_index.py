@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("private", "0010_rename_save_goal_goal_goal_name_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="record",
+            name="private_rec_user_id_17fe7f_idx",
+        ),
+        migrations.AddIndex(
+            model_name="record",
+            index=models.Index(
+                fields=["user", "date", "time", "id"],
+                name="private_rec_user_id_3aea8d_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,106 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:14
+
+import calendar
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+# (months, days) per recurrence period, as of this migration.
+STEPS = {
+    "daily": (0, 1),
+    "weekly": (0, 7),
+    "monthly": (1, 0),
+    "yearly": (12, 0),
+}
+
+
+def shifted(anchor, months, days):
+    month_index = anchor.month - 1 + months
+    year = anchor.year + month_index // 12
+    month = month_index % 12 + 1
+    day = min(anchor.day, calendar.monthrange(year, month)[1])
+    return anchor.replace(year=year, month=month, day=day) + timedelta(days=days)
+
+
+def first_occurrence_after(anchor, months, days, today):
+    """The first ``anchor + k * period`` (k >= 1) after ``today``."""
+    if months:
+        months_apart = (today.year - anchor.year) * 12 + today.month - anchor.month
+        step = max(1, months_apart // months)
+    else:
+        step = max(1, (today - anchor).days // days)
+    while (day := shifted(anchor, months * step, days * step)) <= today:
+        step += 1
+    return day
+
+
+def schedule_existing_templates(apps, schema_editor):
+    # Repeats of existing recurring records were entered by hand so far, so
+    # their schedule starts after today rather than back-filling the past.
+    Record = apps.get_model("private", "Record")
+    today = timezone.localdate()
+    templates = Record.objects.filter(is_recurring=True, next_occurrence__isnull=True)
+    for record in templates.iterator():
+        step = STEPS.get((record.recurrence_period or "").strip().lower())
+        if step:
+            record.next_occurrence = first_occurrence_after(record.date, *step, today)
+            record.save(update_fields=["next_occurrence"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("private", "0012_balancecheckpoint"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="record",
+            name="next_occurrence",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="record",
+            name="recurring_parent",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="occurrences",
+                to="private.record",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="record",
+            name="recurrence_period",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("daily", "Daily"),
+                    ("weekly", "Weekly"),
+                    ("monthly", "Monthly"),
+                    ("yearly", "Yearly"),
+                ],
+                max_length=20,
+            ),
+        ),
+        migrations.RunPython(schedule_existing_templates, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="record",
+            index=models.Index(
+                condition=models.Q(("is_recurring", True)),
+                fields=["next_occurrence"],
+                name="record_recurring_due_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="record",
+            constraint=models.UniqueConstraint(
+                fields=("recurring_parent", "date"), name="unique_occurrence_per_date"
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("private", "0014_record_note_search"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="record",
+            index=models.Index(
+                fields=["user", "category", "date", "time", "id"],
+                name="record_user_category_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="record",
+            index=models.Index(
+                fields=["user", "record_type", "date", "time", "id"],
+                name="record_user_type_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="record",
+            index=models.Index(
+                condition=models.Q(("is_recurring", True)),
+                fields=["user", "date", "time", "id"],
+                name="record_user_recurring_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="record",
+            index=models.Index(
+                fields=["user", "amount"], name="record_user_amount_idx"
+            ),
+        ),
+    ]
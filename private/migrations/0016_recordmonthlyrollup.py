@@ -0,0 +1,161 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce, TruncMonth
+
+
+def backfill_rollups(apps, schema_editor):
+    Record = apps.get_model("private", "Record")
+    RecordMonthlyRollup = apps.get_model("private", "RecordMonthlyRollup")
+    groups = (
+        Record.objects.annotate(
+            rollup_account=Coalesce("account", "from_account"),
+            month=TruncMonth("date"),
+        )
+        .filter(rollup_account__isnull=False)
+        .values("user", "rollup_account", "category", "record_type", "month")
+        .annotate(total=Sum("amount"), count=Count("id"))
+        .order_by()
+    )
+    RecordMonthlyRollup.objects.bulk_create(
+        (
+            RecordMonthlyRollup(
+                user_id=row["user"],
+                account_id=row["rollup_account"],
+                category=row["category"],
+                record_type=row["record_type"],
+                month=row["month"],
+                total=row["total"],
+                count=row["count"],
+            )
+            for row in groups.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("private", "0015_record_filter_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RecordMonthlyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "category",
+                    models.CharField(
+                        choices=[
+                            ("Salary", "Salary"),
+                            ("Freelance", "Freelance"),
+                            ("Investments", "Investments"),
+                            ("Rental Income", "Rental Income"),
+                            ("Gifts", "Gifts"),
+                            ("Refunds", "Refunds"),
+                            ("Other Income", "Other Income"),
+                            ("Food & Drinks", "Food & Drinks"),
+                            ("Groceries", "Groceries"),
+                            ("Dining Out", "Dining Out"),
+                            ("Shopping", "Shopping"),
+                            ("Housing", "Housing"),
+                            ("Utilities", "Utilities"),
+                            ("Transportation", "Transportation"),
+                            ("Vehicle", "Vehicle"),
+                            ("Life & Entertainment", "Life & Entertainment"),
+                            ("Communication, PC", "Communication, PC"),
+                            ("Financial expenses", "Financial expenses"),
+                            ("Health & Medical", "Health & Medical"),
+                            ("Education", "Education"),
+                            ("Insurance", "Insurance"),
+                            ("Travel", "Travel"),
+                            ("Gifts & Donations", "Gifts & Donations"),
+                            ("Personal Care", "Personal Care"),
+                            ("Subscriptions", "Subscriptions"),
+                            ("Taxes", "Taxes"),
+                            ("Savings", "Savings"),
+                            ("Pets", "Pets"),
+                            ("Childcare", "Childcare"),
+                            ("Hobbies", "Hobbies"),
+                            ("Debt & Loans", "Debt & Loans"),
+                            ("Repairs & Maintenance", "Repairs & Maintenance"),
+                            ("Electronics", "Electronics"),
+                            ("Clothing & Apparel", "Clothing & Apparel"),
+                            ("Beauty & Wellness", "Beauty & Wellness"),
+                            ("Books & Media", "Books & Media"),
+                            ("Office Supplies", "Office Supplies"),
+                            ("Gardening", "Gardening"),
+                            ("Sports & Fitness", "Sports & Fitness"),
+                            ("Weddings & Events", "Weddings & Events"),
+                            ("Household Supplies", "Household Supplies"),
+                            ("Legal Fees", "Legal Fees"),
+                            ("Charity", "Charity"),
+                            ("Business Expenses", "Business Expenses"),
+                            ("Others", "Others"),
+                        ],
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "record_type",
+                    models.CharField(
+                        choices=[
+                            ("income", "Income"),
+                            ("expense", "Expense"),
+                            ("transfer", "Transfer"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("month", models.DateField()),
+                (
+                    "total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rollups",
+                        to="private.account",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["user", "month"], name="private_rec_user_id_b7f8b9_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "account", "category", "record_type", "month"),
+                        name="unique_rollup_per_month",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
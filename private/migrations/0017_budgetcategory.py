@@ -0,0 +1,142 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def split_categories(stored, choices):
+    # Categories were stored comma-joined, and "Communication, PC" contains a
+    # comma itself, so match whole known values instead of splitting.
+    wrapped = f",{stored},"
+    return [value for value, _ in choices if f",{value}," in wrapped]
+
+
+def copy_categories(apps, schema_editor):
+    Budget = apps.get_model("private", "Budget")
+    BudgetCategory = apps.get_model("private", "BudgetCategory")
+    choices = BudgetCategory._meta.get_field("category").choices
+    links = []
+    for budget_id, stored in Budget.objects.values_list("pk", "categories").iterator():
+        if isinstance(stored, list):
+            # The field already split the string on every comma; undo that.
+            stored = ",".join(stored)
+        links.extend(
+            BudgetCategory(budget_id=budget_id, category=category)
+            for category in split_categories(stored or "", choices)
+        )
+    BudgetCategory.objects.bulk_create(links, batch_size=1000)
+
+
+def restore_categories(apps, schema_editor):
+    Budget = apps.get_model("private", "Budget")
+    BudgetCategory = apps.get_model("private", "BudgetCategory")
+    categories = {}
+    for budget_id, category in BudgetCategory.objects.values_list(
+        "budget_id", "category"
+    ).order_by("pk"):
+        categories.setdefault(budget_id, []).append(category)
+    for budget_id, values in categories.items():
+        Budget.objects.filter(pk=budget_id).update(categories=",".join(values))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("private", "0016_recordmonthlyrollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BudgetCategory",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "category",
+                    models.CharField(
+                        choices=[
+                            ("Salary", "Salary"),
+                            ("Freelance", "Freelance"),
+                            ("Investments", "Investments"),
+                            ("Rental Income", "Rental Income"),
+                            ("Gifts", "Gifts"),
+                            ("Refunds", "Refunds"),
+                            ("Other Income", "Other Income"),
+                            ("Food & Drinks", "Food & Drinks"),
+                            ("Groceries", "Groceries"),
+                            ("Dining Out", "Dining Out"),
+                            ("Shopping", "Shopping"),
+                            ("Housing", "Housing"),
+                            ("Utilities", "Utilities"),
+                            ("Transportation", "Transportation"),
+                            ("Vehicle", "Vehicle"),
+                            ("Life & Entertainment", "Life & Entertainment"),
+                            ("Communication, PC", "Communication, PC"),
+                            ("Financial expenses", "Financial expenses"),
+                            ("Health & Medical", "Health & Medical"),
+                            ("Education", "Education"),
+                            ("Insurance", "Insurance"),
+                            ("Travel", "Travel"),
+                            ("Gifts & Donations", "Gifts & Donations"),
+                            ("Personal Care", "Personal Care"),
+                            ("Subscriptions", "Subscriptions"),
+                            ("Taxes", "Taxes"),
+                            ("Savings", "Savings"),
+                            ("Pets", "Pets"),
+                            ("Childcare", "Childcare"),
+                            ("Hobbies", "Hobbies"),
+                            ("Debt & Loans", "Debt & Loans"),
+                            ("Repairs & Maintenance", "Repairs & Maintenance"),
+                            ("Electronics", "Electronics"),
+                            ("Clothing & Apparel", "Clothing & Apparel"),
+                            ("Beauty & Wellness", "Beauty & Wellness"),
+                            ("Books & Media", "Books & Media"),
+                            ("Office Supplies", "Office Supplies"),
+                            ("Gardening", "Gardening"),
+                            ("Sports & Fitness", "Sports & Fitness"),
+                            ("Weddings & Events", "Weddings & Events"),
+                            ("Household Supplies", "Household Supplies"),
+                            ("Legal Fees", "Legal Fees"),
+                            ("Charity", "Charity"),
+                            ("Business Expenses", "Business Expenses"),
+                            ("Others", "Others"),
+                        ],
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "budget",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="budget_categories",
+                        to="private.budget",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["category", "budget"],
+                        name="private_bud_categor_835551_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("budget", "category"), name="unique_budget_category"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(copy_categories, restore_categories),
+        migrations.RemoveField(
+            model_name="budget",
+            name="categories",
+        ),
+    ]
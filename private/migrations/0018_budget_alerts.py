@@ -0,0 +1,107 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+
+ALERT_THRESHOLDS = (50, 80, 100)
+
+
+def backfill_running_spent(apps, schema_editor):
+    # Start from the current spend without notifying about past crossings.
+    Budget = apps.get_model("private", "Budget")
+    Record = apps.get_model("private", "Record")
+    for budget in Budget.objects.iterator():
+        spent = (
+            Record.objects.filter(
+                user_id=budget.user_id,
+                record_type="expense",
+                date__gte=budget.start_date,
+                date__lte=budget.end_date,
+                account__in=budget.account.all(),
+                category__in=budget.budget_categories.values("category"),
+            ).aggregate(total=Sum("amount"))["total"]
+            or 0
+        )
+        progress = spent / budget.amount * 100 if budget.amount > 0 else 0
+        budget.running_spent = spent
+        budget.alert_level = max(
+            (t for t in ALERT_THRESHOLDS if progress >= t), default=0
+        )
+        budget.save(update_fields=["running_spent", "alert_level"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("private", "0017_budgetcategory"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Notification",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("threshold", models.PositiveSmallIntegerField(blank=True, null=True)),
+                ("message", models.CharField(max_length=255)),
+                ("is_read", models.BooleanField(default=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name="budget",
+            name="private_bud_user_id_65164f_idx",
+        ),
+        migrations.AddField(
+            model_name="budget",
+            name="alert_level",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="budget",
+            name="running_spent",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddIndex(
+            model_name="budget",
+            index=models.Index(
+                fields=["user", "start_date", "end_date"], name="budget_user_window_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="budget",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="notifications",
+                to="private.budget",
+            ),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["user", "is_read", "created_at"],
+                name="private_not_user_id_57773c_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_running_spent, migrations.RunPython.noop),
+    ]
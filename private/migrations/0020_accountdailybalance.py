@@ -0,0 +1,104 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:42
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_daily_balances(apps, schema_editor):
+    # Same walk as ``balances.rebuild_daily_balances``: back from the live
+    # balance, one grouped query per account.
+    Account = apps.get_model("private", "Account")
+    AccountDailyBalance = apps.get_model("private", "AccountDailyBalance")
+    Record = apps.get_model("private", "Record")
+    zero = Value(Decimal("0.00"))
+    output_field = DecimalField(max_digits=14, decimal_places=2)
+    for account_id, balance in Account.objects.values_list("pk", "balance").iterator():
+        inflow = Q(record_type="income", account_id=account_id) | Q(
+            record_type="transfer",
+            to_account_id=account_id,
+            from_account__isnull=False,
+        )
+        outflow = Q(record_type="expense", account_id=account_id) | Q(
+            record_type="transfer",
+            from_account_id=account_id,
+            to_account__isnull=False,
+        )
+        flows = (
+            Record.objects.filter(
+                Q(account_id=account_id)
+                | Q(from_account_id=account_id)
+                | Q(to_account_id=account_id)
+            )
+            .values("date")
+            .annotate(
+                flow=Coalesce(
+                    Sum("amount", filter=inflow), zero, output_field=output_field
+                )
+                - Coalesce(
+                    Sum("amount", filter=outflow), zero, output_field=output_field
+                )
+            )
+            .order_by("-date")
+        )
+        rows = []
+        for row in flows:
+            rows.append(
+                AccountDailyBalance(
+                    account_id=account_id,
+                    date=row["date"],
+                    balance=balance,
+                    flow=row["flow"],
+                )
+            )
+            balance -= row["flow"]
+        AccountDailyBalance.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("private", "0019_exchangerate"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AccountDailyBalance",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("balance", models.DecimalField(decimal_places=2, max_digits=14)),
+                (
+                    "flow",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_balances",
+                        to="private.account",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("account", "date"), name="unique_daily_balance"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_daily_balances, migrations.RunPython.noop),
+    ]
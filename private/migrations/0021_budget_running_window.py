@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("private", "0020_accountdailybalance"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="budget",
+            name="running_window_start",
+            field=models.DateField(blank=True, null=True),
+        ),
+    ]
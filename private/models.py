@@ -2,7 +2,7 @@ from django.db import models
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.utils import timezone
-from multiselectfield import MultiSelectField
+from django.utils.functional import cached_property
 
 # Create your models here.
 
@@ -97,6 +97,13 @@ CATEGORY_TYPE_CHOICES = [
     ("Others", "Others"),
 ]
 
+RECURRENCE_PERIOD_CHOICES = [
+    ("daily", "Daily"),
+    ("weekly", "Weekly"),
+    ("monthly", "Monthly"),
+    ("yearly", "Yearly"),
+]
+
 PERIOD_TYPE_CHOICES = [
     ("Week", "Week"),
     ("Month", "Month"),
@@ -133,50 +140,250 @@ class Record(models.Model):
     date = models.DateField(default=timezone.now)
     time = models.TimeField(default=timezone.now)
     is_recurring = models.BooleanField(default=False)
-    recurrence_period = models.CharField(max_length=20, blank=True)
+    recurrence_period = models.CharField(
+        max_length=20, blank=True, choices=RECURRENCE_PERIOD_CHOICES
+    )
+    # Set on recurring templates: the date of the next occurrence to generate.
+    next_occurrence = models.DateField(null=True, blank=True)
+    # Set on generated occurrences: the template they were copied from.
+    recurring_parent = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        related_name="occurrences",
+        null=True,
+        blank=True,
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"{self.get_record_type_display()} - {self.amount} ({self.category})"
 
     class Meta:
-        indexes = [models.Index(fields=["user", "date"])]
+        indexes = [
+            # Matches the keyset ordering used to paginate record lists.
+            models.Index(fields=["user", "date", "time", "id"]),
+            # Back the list filters in ``filters.py``. Equality columns come
+            # before the keyset columns so a filtered page is still read in
+            # order instead of being sorted.
+            models.Index(
+                fields=["user", "category", "date", "time", "id"],
+                name="record_user_category_idx",
+            ),
+            models.Index(
+                fields=["user", "record_type", "date", "time", "id"],
+                name="record_user_type_idx",
+            ),
+            models.Index(
+                fields=["user", "date", "time", "id"],
+                condition=models.Q(is_recurring=True),
+                name="record_user_recurring_idx",
+            ),
+            models.Index(fields=["user", "amount"], name="record_user_amount_idx"),
+            # Lets the recurring scheduler find due templates without a scan.
+            models.Index(
+                fields=["next_occurrence"],
+                condition=models.Q(is_recurring=True),
+                name="record_recurring_due_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recurring_parent", "date"], name="unique_occurrence_per_date"
+            )
+        ]
+
+
+class BalanceCheckpoint(models.Model):
+    """An account's balance at the end of ``month`` (stored as its first day)."""
+
+    account = models.ForeignKey(
+        Account, on_delete=models.CASCADE, related_name="checkpoints"
+    )
+    month = models.DateField()
+    balance = models.DecimalField(max_digits=12, decimal_places=2)
+
+    def __str__(self):
+        return f"{self.account.name} {self.month:%Y-%m}: {self.balance}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["account", "month"], name="unique_checkpoint_per_month"
+            )
+        ]
+
+
+class AccountDailyBalance(models.Model):
+    """
+    An account's balance at the end of ``date`` and its net change that day.
+
+    There is a row for every day the account had records on. Kept up to date
+    by ``services.RecordChanges`` and rebuilt by ``balances.rebuild_daily_balances``.
+    """
+
+    account = models.ForeignKey(
+        Account, on_delete=models.CASCADE, related_name="daily_balances"
+    )
+    date = models.DateField()
+    balance = models.DecimalField(max_digits=14, decimal_places=2)
+    flow = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.account.name} {self.date}: {self.balance}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["account", "date"], name="unique_daily_balance"
+            )
+        ]
+
+
+class RecordMonthlyRollup(models.Model):
+    """
+    Sum and count of a user's records per account, category, type and month.
+
+    Kept up to date by ``services.RecordChanges`` and rebuilt from scratch by
+    ``rollups.rebuild_rollups``. Transfers are counted against their source
+    account.
+    """
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    account = models.ForeignKey(
+        Account, on_delete=models.CASCADE, related_name="rollups"
+    )
+    category = models.CharField(max_length=100, choices=CATEGORY_TYPE_CHOICES)
+    record_type = models.CharField(max_length=10, choices=RECORD_TYPE_CHOICES)
+    month = models.DateField()
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.category} {self.month:%Y-%m}: {self.total} ({self.count})"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "account", "category", "record_type", "month"],
+                name="unique_rollup_per_month",
+            )
+        ]
+        indexes = [models.Index(fields=["user", "month"])]
 
 
 class Budget(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     account = models.ManyToManyField(Account)
     name = models.CharField(max_length=100)
-    categories = MultiSelectField(
-        "Category", choices=CATEGORY_TYPE_CHOICES, default=list
-    )
     period = models.CharField(max_length=100, choices=PERIOD_TYPE_CHOICES)
     start_date = models.DateField()
     end_date = models.DateField()
     amount = models.DecimalField(max_digits=12, decimal_places=2)
     currency = models.CharField(max_length=3)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Running spend and the highest alert threshold reached in the window
+    # starting on ``running_window_start``, maintained by ``alerts`` on every
+    # expense write so alerts never rescan records.
+    running_spent = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    alert_level = models.PositiveSmallIntegerField(default=0)
+    running_window_start = models.DateField(null=True, blank=True)
 
     @property
-    def progress(self):
-        total_spent = (
-            Record.objects.filter(
-                user=self.user,
-                account__in=self.account.all(),
-                category__in=self.categories,
-                record_type="expense",
-                date__range=(self.start_date, self.end_date),
-            ).aggregate(models.Sum("amount"))["amount__sum"]
-            or 0
-        )
+    def categories(self):
+        # Prefetch ``budget_categories`` when listing budgets.
+        return [link.category for link in self.budget_categories.all()]
+
+    @cached_property
+    def spent(self):
+        # Lists should load this up front with ``budgets.load_spent``.
+        from .budgets import cached_spent, with_data_version
 
-        return (total_spent / self.amount) * 100 if self.amount > 0 else 0
+        if not hasattr(self, "data_version"):
+            self.data_version = (
+                with_data_version(Budget.objects.filter(pk=self.pk)).get().data_version
+            )
+        return cached_spent([self])[self.pk]
+
+    @property
+    def progress(self):
+        return (self.spent / self.amount) * 100 if self.amount > 0 else 0
 
     def __str__(self):
         return self.name
 
     class Meta:
-        indexes = [models.Index(fields=["user", "start_date"])]
+        # Finds the budgets whose window contains a record's date.
+        indexes = [
+            models.Index(
+                fields=["user", "start_date", "end_date"], name="budget_user_window_idx"
+            )
+        ]
+
+
+class BudgetCategory(models.Model):
+    """One category a budget tracks. Set through ``budgets.set_budget_categories``."""
+
+    budget = models.ForeignKey(
+        Budget, on_delete=models.CASCADE, related_name="budget_categories"
+    )
+    category = models.CharField(max_length=100, choices=CATEGORY_TYPE_CHOICES)
+
+    def __str__(self):
+        return f"{self.budget.name}: {self.category}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["budget", "category"], name="unique_budget_category"
+            )
+        ]
+        # Finds the budgets a record's category belongs to.
+        indexes = [models.Index(fields=["category", "budget"])]
+
+
+class Notification(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    budget = models.ForeignKey(
+        Budget,
+        on_delete=models.CASCADE,
+        related_name="notifications",
+        null=True,
+        blank=True,
+    )
+    threshold = models.PositiveSmallIntegerField(null=True, blank=True)
+    message = models.CharField(max_length=255)
+    is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.message
+
+    class Meta:
+        indexes = [models.Index(fields=["user", "is_read", "created_at"])]
+
+
+class ExchangeRate(models.Model):
+    """One unit of ``base`` is worth ``rate`` units of ``quote`` from ``date`` on."""
+
+    base = models.CharField(max_length=3)
+    quote = models.CharField(max_length=3)
+    date = models.DateField()
+    rate = models.DecimalField(max_digits=20, decimal_places=8)
+    # Part of the version ``rates.current_rates`` reloads on.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.base}/{self.quote} {self.date}: {self.rate}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["base", "quote", "date"], name="unique_exchange_rate"
+            ),
+            models.CheckConstraint(
+                condition=models.Q(rate__gt=0), name="exchange_rate_positive"
+            ),
+        ]
 
 
 SAVE_CHOICES = [
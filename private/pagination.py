@@ -0,0 +1,122 @@
+import base64
+import binascii
+from datetime import date, time
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+# Newest first. ``id`` breaks ties so the ordering is total and a cursor
+# always points at exactly one position.
+RECORD_ORDERING = ("-date", "-time", "-id")
+
+
+def encode_cursor(record_date, record_time, pk):
+    raw = f"{record_date.isoformat()}|{record_time.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        record_date, record_time, pk = raw.split("|")
+        return date.fromisoformat(record_date), time.fromisoformat(record_time), int(pk)
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+def page_queryset(queryset, cursor=None, page_size=50):
+    """
+    The records of the keyset page after ``cursor``, plus one more to tell
+    whether there is a next page. Raises ``ValueError`` for a bad cursor.
+
+    Instead of an OFFSET the page starts right after the ``(date, time, id)``
+    position stored in the cursor, so every page is a short index range scan
+    on ``(user, date, time, id)`` no matter how deep the client has scrolled.
+    """
+    queryset = queryset.order_by(*RECORD_ORDERING)
+    if cursor:
+        record_date, record_time, pk = decode_cursor(cursor)
+        # The plain ``date__lte`` bound lets the database seek into the index;
+        # the OR below only trims the rows sharing the cursor's date.
+        queryset = queryset.filter(date__lte=record_date).filter(
+            Q(date__lt=record_date)
+            | Q(date=record_date, time__lt=record_time)
+            | Q(date=record_date, time=record_time, pk__lt=pk)
+        )
+    return queryset[: page_size + 1]
+
+
+def split_page(rows, page_size):
+    """``(page, next_cursor)`` from the rows of a ``page_queryset``."""
+    if len(rows) <= page_size:
+        return rows, None
+
+    page = rows[:page_size]
+    last = page[-1]
+    if isinstance(last, dict):
+        # A ``.values()`` queryset.
+        return page, encode_cursor(last["date"], last["time"], last["id"])
+    return page, encode_cursor(last.date, last.time, last.pk)
+
+
+def paginate_records(queryset, cursor=None, page_size=50):
+    """Return ``(page, next_cursor)`` for a keyset page of records."""
+    return split_page(list(page_queryset(queryset, cursor, page_size)), page_size)
+
+
+class RecordCursorPagination(BasePagination):
+    page_size = 50
+    max_page_size = 500
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        cursor = request.query_params.get(self.cursor_query_param)
+        try:
+            page, self.next_cursor = paginate_records(
+                queryset, cursor, self.get_page_size(request)
+            )
+        except ValueError:
+            raise NotFound("Invalid cursor")
+        return page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_first_link(self):
+        url = self.request.build_absolute_uri()
+        return remove_query_param(url, self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "first": self.get_first_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "first": {"type": "string", "format": "uri"},
+                "results": schema,
+            },
+        }
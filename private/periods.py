@@ -0,0 +1,68 @@
+import calendar
+from datetime import date, timedelta
+
+# (months, days) per step of each period. Keys are lower-case so both the
+# recurrence choices ("monthly") and budget periods ("Month") resolve.
+PERIOD_STEPS = {
+    "daily": (0, 1),
+    "day": (0, 1),
+    "weekly": (0, 7),
+    "week": (0, 7),
+    "monthly": (1, 0),
+    "month": (1, 0),
+    "yearly": (12, 0),
+    "year": (12, 0),
+}
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def month_end(day):
+    return day.replace(day=calendar.monthrange(day.year, day.month)[1])
+
+
+def add_months(day, months):
+    """Shift ``day`` by ``months``, clamping to the last day of short months."""
+    month_index = day.month - 1 + months
+    year = day.year + month_index // 12
+    month = month_index % 12 + 1
+    return day.replace(
+        year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1])
+    )
+
+
+def period_step(period):
+    """Return ``(months, days)`` for ``period`` or ``None`` if it is not periodic."""
+    return PERIOD_STEPS.get((period or "").strip().lower())
+
+
+def advance(anchor, period, steps=1):
+    """
+    The date ``steps`` periods after ``anchor``.
+
+    Always counted from the anchor rather than from the previous occurrence,
+    so a series starting on the 31st comes back to the 31st after February.
+    """
+    months, days = period_step(period)
+    return add_months(anchor, months * steps) + timedelta(days=days * steps)
+
+
+def occurrences(anchor, period, start, end):
+    """Yield the dates ``anchor + k * period`` (k >= 1) between ``start`` and ``end``."""
+    months, days = period_step(period)
+    if months:
+        months_apart = (start.year - anchor.year) * 12 + start.month - anchor.month
+        step = max(1, months_apart // months)
+    else:
+        step = max(1, (start - anchor).days // days)
+
+    while (day := advance(anchor, period, step)) <= end:
+        if day >= start:
+            yield day
+        step += 1
+
+
+def first_occurrence_after(anchor, period, day):
+    return next(occurrences(anchor, period, day + timedelta(days=1), date.max))
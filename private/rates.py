@@ -0,0 +1,99 @@
+from bisect import bisect_right
+from decimal import Decimal
+
+from django.db.models import Count, Max
+
+from .models import ExchangeRate
+
+# Currency conversion through an in-process rate table. The whole
+# ``ExchangeRate`` table is loaded once into sorted per-pair date lists, so
+# the rate of a pair on a day is a binary search rather than a query.
+#
+# The table's version is read from the database (its row count and latest
+# ``updated_at``), so a load, admin edit or delete in any process is seen by
+# every other one. Call ``current_rates()`` once per request or report and
+# look rates up on the table it returns: it checks the version with one
+# aggregate query and reloads only when it changed.
+
+CENTS = Decimal("0.01")
+ONE = Decimal(1)
+
+
+class MissingRate(LookupError):
+    """No rate, direct, inverse or through a third currency, on or before a day."""
+
+
+class RateTable:
+    """Every stored rate as of ``version``. Equal versions compare equal."""
+
+    def __init__(self, version, rows=()):
+        self.version = version
+        # (base, quote) -> (sorted dates, rates)
+        self.pairs = {}
+        for base, quote, day, rate in rows:
+            dates, rates = self.pairs.setdefault((base, quote), ([], []))
+            dates.append(day)
+            rates.append(rate)
+        # Intermediates for cross rates, tried in this order.
+        self.currencies = sorted({currency for pair in self.pairs for currency in pair})
+
+    def __eq__(self, other):
+        return isinstance(other, RateTable) and self.version == other.version
+
+    def __hash__(self):
+        return hash(self.version)
+
+    def stored_rate(self, base, quote, day):
+        """The latest stored ``base``/``quote`` rate (or its inverse) on or before ``day``."""
+        for pair, invert in (((base, quote), False), ((quote, base), True)):
+            if pair in self.pairs:
+                dates, rates = self.pairs[pair]
+                index = bisect_right(dates, day)
+                if index:
+                    return ONE / rates[index - 1] if invert else rates[index - 1]
+        return None
+
+    def rate(self, base, quote, day):
+        """How many units of ``quote`` one unit of ``base`` is worth on ``day``."""
+        if base == quote:
+            return ONE
+        found = self.stored_rate(base, quote, day)
+        if found is not None:
+            return found
+        # Cross through a currency both are quoted against, e.g. EUR -> USD -> NGN.
+        for middle in self.currencies:
+            if middle in (base, quote):
+                continue
+            first = self.stored_rate(base, middle, day)
+            if first is not None:
+                second = self.stored_rate(middle, quote, day)
+                if second is not None:
+                    return first * second
+        raise MissingRate(f"No {base}/{quote} rate on or before {day}.")
+
+    def convert(self, amount, base, quote, day):
+        return (amount * self.rate(base, quote, day)).quantize(CENTS)
+
+
+_current = RateTable(None)
+
+
+def rates_version():
+    """The version of the stored rates, as a string."""
+    stats = ExchangeRate.objects.aggregate(count=Count("pk"), updated=Max("updated_at"))
+    updated = stats["updated"].isoformat() if stats["updated"] else ""
+    return f"{stats['count']}:{updated}"
+
+
+def current_rates():
+    """The ``RateTable`` of the stored rates, reloaded if they changed."""
+    global _current
+    version = rates_version()
+    if version != _current.version:
+        _current = RateTable(
+            version,
+            ExchangeRate.objects.order_by("base", "quote", "date").values_list(
+                "base", "quote", "date", "rate"
+            ),
+        )
+    return _current
@@ -0,0 +1,111 @@
+import logging
+import time
+
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Record
+from .periods import first_occurrence_after, occurrences, period_step
+from .services import bulk_create_records
+
+logger = logging.getLogger(__name__)
+
+# Fields copied from a recurring template onto each generated occurrence.
+COPIED_FIELDS = [
+    "user_id",
+    "record_type",
+    "category",
+    "account_id",
+    "from_account_id",
+    "to_account_id",
+    "amount",
+    "note",
+    "time",
+]
+
+
+def materialize_due_records(today=None, batch_size=500):
+    """
+    Create every missing occurrence of recurring records up to ``today``.
+
+    Due templates are read ``batch_size`` at a time through the partial
+    index on ``next_occurrence``; each batch costs a handful of queries
+    however many users or occurrences it covers. Running it twice is
+    harmless: occurrences that already exist are skipped and the
+    ``(recurring_parent, date)`` constraint rejects duplicates from a
+    concurrent run. Returns the number of records created.
+    """
+    today = today or timezone.localdate()
+    created = 0
+    while True:
+        with transaction.atomic():
+            templates = list(
+                Record.objects.select_for_update(skip_locked=True)
+                .filter(is_recurring=True, next_occurrence__lte=today)
+                .order_by("next_occurrence", "pk")[:batch_size]
+            )
+            if not templates:
+                return created
+            created += _materialize_batch(templates, today)
+
+
+def _materialize_batch(templates, today):
+    wanted = []
+    for template in templates:
+        if not period_step(template.recurrence_period):
+            template.next_occurrence = None
+            continue
+        days = list(
+            occurrences(
+                template.date,
+                template.recurrence_period,
+                template.next_occurrence,
+                today,
+            )
+        )
+        wanted.extend((template, day) for day in days)
+        template.next_occurrence = first_occurrence_after(
+            template.date, template.recurrence_period, today
+        )
+
+    existing = set()
+    if wanted:
+        existing = set(
+            Record.objects.filter(
+                recurring_parent__in=templates,
+                date__gte=min(day for _, day in wanted),
+            ).values_list("recurring_parent_id", "date")
+        )
+
+    records = [
+        Record(
+            recurring_parent=template,
+            date=day,
+            **{field: getattr(template, field) for field in COPIED_FIELDS},
+        )
+        for template, day in wanted
+        if (template.pk, day) not in existing
+    ]
+    bulk_create_records(records)
+    Record.objects.bulk_update(templates, ["next_occurrence"])
+    return len(records)
+
+
+def run_scheduler(interval):
+    """
+    Run ``materialize_due_records`` every ``interval`` seconds until the
+    process is stopped. Meant for one dedicated process per deployment, via
+    ``manage.py materialize_recurring_records --interval``.
+    """
+    while True:
+        close_old_connections()
+        try:
+            created = materialize_due_records()
+        except Exception:
+            logger.exception("Materializing recurring records failed")
+        else:
+            if created:
+                logger.info("Materialized %s recurring records", created)
+        finally:
+            close_old_connections()
+        time.sleep(interval)
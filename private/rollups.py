@@ -0,0 +1,88 @@
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncMonth
+
+from .models import Record, RecordMonthlyRollup
+from .periods import month_start
+
+# (user_id, account_id, category, record_type, first day of month)
+ROLLUP_KEY = ["user_id", "account_id", "category", "record_type", "month"]
+
+
+def rollup_account_id(record):
+    return record.account_id or record.from_account_id
+
+
+def rollup_entries(records):
+    """Yield ``(key, amount)`` for each record that belongs in a rollup row."""
+    for record in records:
+        account_id = rollup_account_id(record)
+        if account_id:
+            yield (
+                record.user_id,
+                account_id,
+                record.category,
+                record.record_type,
+                month_start(record.date),
+            ), record.amount
+
+
+def apply_rollup_deltas(deltas):
+    """
+    Apply ``{key: (total delta, count delta)}`` to the rollup table.
+
+    Rows are moved with ``F()`` updates like account balances; a missing row is
+    created empty first, so concurrent writers never overwrite each other.
+    Rows left without records are deleted.
+    """
+    emptied = Q(pk__in=[])
+    for key in sorted(deltas):
+        total, count = deltas[key]
+        if not total and not count:
+            continue
+        rows = RecordMonthlyRollup.objects.filter(**dict(zip(ROLLUP_KEY, key)))
+        updated = rows.update(total=F("total") + total, count=F("count") + count)
+        if not updated:
+            RecordMonthlyRollup.objects.get_or_create(**dict(zip(ROLLUP_KEY, key)))
+            rows.update(total=F("total") + total, count=F("count") + count)
+        if count < 0:
+            emptied |= Q(**dict(zip(ROLLUP_KEY, key)))
+    RecordMonthlyRollup.objects.filter(emptied, count=0).delete()
+
+
+def rebuild_rollups(user=None):
+    """Regenerate the rollup rows (of one user, or everyone) with one grouped query."""
+    records = Record.objects.all()
+    rollups = RecordMonthlyRollup.objects.all()
+    if user is not None:
+        records = records.filter(user=user)
+        rollups = rollups.filter(user=user)
+
+    groups = (
+        records.annotate(
+            rollup_account=Coalesce("account", "from_account"),
+            month=TruncMonth("date"),
+        )
+        .filter(rollup_account__isnull=False)
+        .values("user", "rollup_account", "category", "record_type", "month")
+        .annotate(total=Sum("amount"), count=Count("id"))
+        .order_by()
+    )
+    with transaction.atomic():
+        rollups.delete()
+        created = RecordMonthlyRollup.objects.bulk_create(
+            (
+                RecordMonthlyRollup(
+                    user_id=row["user"],
+                    account_id=row["rollup_account"],
+                    category=row["category"],
+                    record_type=row["record_type"],
+                    month=row["month"],
+                    total=row["total"],
+                    count=row["count"],
+                )
+                for row in groups.iterator()
+            ),
+            batch_size=1000,
+        )
+    return len(created)
@@ -0,0 +1,125 @@
+import re
+
+from django.db import connection
+from django.db.models import F
+
+from .models import Record
+
+# Full-text index over ``Record.note``.
+#
+# On SQLite it is an FTS5 table keyed by the record id. The owner is stored as
+# an indexed "u<id>" token, so the user filter is part of the MATCH and only
+# walks that user's postings. The table is kept in sync by the Record signals
+# in ``signals.py`` and by the bulk paths in ``services.py``. On PostgreSQL the
+# migration adds a GIN index on ``to_tsvector(note)`` and queries use it
+# directly. Other backends fall back to ``icontains``.
+
+FTS_TABLE = "private_record_fts"
+PG_CONFIG = "simple"
+
+WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def search_vector():
+    from django.contrib.postgres.search import SearchVector
+
+    # Must stay identical to the indexed expression created in migration 0014.
+    return SearchVector("note", config=PG_CONFIG)
+
+
+def uses_fts():
+    return connection.vendor == "sqlite"
+
+
+def _owner(user_id):
+    return f"u{user_id}"
+
+
+def index_records(records):
+    if not uses_fts():
+        return
+    rows = [(r.pk, r.note, _owner(r.user_id)) for r in records if r.note]
+    empty = [(r.pk,) for r in records if not r.note]
+    with connection.cursor() as cursor:
+        if rows:
+            cursor.executemany(
+                f"INSERT OR REPLACE INTO {FTS_TABLE}(rowid, note, owner) "
+                "VALUES (%s, %s, %s)",
+                rows,
+            )
+        if empty:
+            cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", empty)
+
+
+def unindex_records(pks):
+    if not uses_fts() or not pks:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(pk,) for pk in pks]
+        )
+
+
+def rebuild_index():
+    """Repopulate the index from scratch. Returns the number of indexed notes."""
+    if not uses_fts():
+        return Record.objects.exclude(note="").count()
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}(rowid, note, owner) "
+            f"SELECT id, note, 'u' || user_id FROM {Record._meta.db_table} "
+            "WHERE note != ''"
+        )
+        return cursor.rowcount
+
+
+def match_expression(text):
+    """
+    Turn free text into a safe FTS5 query: every word must appear, and the
+    last one may be a prefix so results update while the user is typing.
+    """
+    words = WORD.findall(text)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search_records(user, text, offset=0, limit=20):
+    """Return the user's records whose note matches ``text``, best match first."""
+    words = WORD.findall(text)
+    if not words:
+        return []
+
+    if uses_fts():
+        query = f'owner:"{_owner(user.pk)}" AND note:({match_expression(text)})'
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+                "ORDER BY rank LIMIT %s OFFSET %s",
+                [query, limit, offset],
+            )
+            pks = [row[0] for row in cursor.fetchall()]
+        records = Record.objects.filter(user=user).in_bulk(pks)
+        return [records[pk] for pk in pks if pk in records]
+
+    records = Record.objects.filter(user=user)
+    if connection.vendor == "postgresql":
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        query = SearchQuery(
+            " & ".join(words) + ":*", config=PG_CONFIG, search_type="raw"
+        )
+        records = (
+            records.annotate(search=search_vector())
+            .filter(search=query)
+            .annotate(rank=SearchRank(F("search"), query))
+            .order_by("-rank", "-date", "-id")
+        )
+    else:
+        for word in words:
+            records = records.filter(note__icontains=word)
+        records = records.order_by("-date", "-time", "-id")
+    return list(records[offset : offset + limit])
@@ -1,6 +1,9 @@
 from rest_framework import serializers
-from .models import Account, Record, Budget
-from datetime import datetime, date, time
+from .batch import BATCH_METHODS, MAX_BATCH_REQUESTS
+from .budgets import set_budget_categories
+from .models import CATEGORY_TYPE_CHOICES, Account, Record, Budget, Notification
+from .services import create_record, update_record
+from datetime import datetime
 
 
 class AccountSerializer(serializers.ModelSerializer):
@@ -20,58 +23,265 @@ class AccountSerializer(serializers.ModelSerializer):
         read_only_fields = ["user", "created_at"]
 
 
+class RecordDateField(serializers.DateField):
+    # ``Record.date`` defaults to ``timezone.now`` so unsaved instances can
+    # still hold a datetime.
+    def to_representation(self, value):
+        if isinstance(value, datetime):
+            value = value.date()
+        return super().to_representation(value)
+
+
+class RecordTimeField(serializers.TimeField):
+    def to_representation(self, value):
+        if isinstance(value, datetime):
+            value = value.time()
+        return super().to_representation(value)
+
+
+class UserAccountField(serializers.PrimaryKeyRelatedField):
+    """
+    Only accepts accounts owned by the requesting user.
+
+    When used under ``many=True`` the user's accounts are loaded once for the
+    whole list instead of one lookup per row.
+    """
+
+    def get_queryset(self):
+        request = self.context.get("request")
+        if request is None:
+            return Account.objects.none()
+        return Account.objects.filter(user=request.user)
+
+    def to_internal_value(self, data):
+        if not isinstance(self.root, serializers.ListSerializer):
+            return super().to_internal_value(data)
+
+        accounts = getattr(self.root, "_account_cache", None)
+        if accounts is None:
+            accounts = {account.pk: account for account in self.get_queryset()}
+            self.root._account_cache = accounts
+        try:
+            return accounts[int(data)]
+        except KeyError:
+            self.fail("does_not_exist", pk_value=data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+
 class RecordSerializer(serializers.ModelSerializer):
-    date = serializers.SerializerMethodField()
-    time = serializers.SerializerMethodField()
+    date = RecordDateField(required=False)
+    time = RecordTimeField(required=False)
+    account = UserAccountField(required=False, allow_null=True)
+    from_account = UserAccountField(required=False, allow_null=True)
+    to_account = UserAccountField(required=False, allow_null=True)
 
     class Meta:
         model = Record
         fields = "__all__"
+        read_only_fields = [
+            "user",
+            "created_at",
+            "next_occurrence",
+            "recurring_parent",
+        ]
+        # The (recurring_parent, date) constraint only concerns occurrences
+        # generated by the scheduler; API clients cannot set the parent.
+        validators = []
 
-    def get_date(self, obj):
-        value = getattr(obj, "date", None)
-        if isinstance(value, datetime):
-            return value.date()
-        if isinstance(value, date):
-            return value
-        return None
+    def validate(self, attrs):
+        record_type = attrs.get("record_type")
+        if record_type in ["income", "expense"]:
+            if not attrs.get("account"):
+                raise serializers.ValidationError(
+                    "Account is required for income or expense records."
+                )
+            attrs["from_account"] = None
+            attrs["to_account"] = None
 
-    def get_time(self, obj):
-        value = getattr(obj, "time", None)
-        if isinstance(value, datetime):
-            return value.time()
-        if isinstance(value, time):
-            return value
-        return None
+        elif record_type == "transfer":
+            if not attrs.get("from_account") or not attrs.get("to_account"):
+                raise serializers.ValidationError(
+                    "Both from_account and to_account are required for transfers."
+                )
+            attrs["account"] = None
+
+        return attrs
 
     def create(self, validated_data):
         if isinstance(validated_data.get("date"), datetime):
             validated_data["date"] = validated_data["date"].date()
         if isinstance(validated_data.get("time"), datetime):
             validated_data["time"] = validated_data["time"].time()
-        return super().create(validated_data)
+        return create_record(Record(**validated_data))
+
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        return update_record(instance)
+
+
+class BalancePointSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    balance = serializers.DecimalField(max_digits=14, decimal_places=2)
 
 
 class BudgetSerializer(serializers.ModelSerializer):
-    # Accept a list from the API
-    categories = serializers.ListField(child=serializers.CharField(), allow_empty=True)
+    categories = serializers.ListField(
+        child=serializers.ChoiceField(choices=CATEGORY_TYPE_CHOICES), allow_empty=True
+    )
+    spent = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    progress = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
 
     class Meta:
         model = Budget
         fields = "__all__"
-        read_only_fields = ["user", "created_at"]
+        read_only_fields = [
+            "user",
+            "created_at",
+            "running_spent",
+            "alert_level",
+            "running_window_start",
+        ]
+
+    def validate(self, attrs):
+        # A partial update may change only one end of the range.
+        start_date = attrs.get("start_date", getattr(self.instance, "start_date", None))
+        end_date = attrs.get("end_date", getattr(self.instance, "end_date", None))
+        if start_date and end_date and start_date > end_date:
+            raise serializers.ValidationError(
+                {"end_date": "End date can't be before the start date."}
+            )
+        return attrs
 
     def create(self, validated_data):
-        # Convert list comma-separated string for MultiSelectField
         categories = validated_data.pop("categories", [])
-        validated_data["categories"] = ",".join(categories)
         validated_data["user"] = self.context["request"].user
-        return super().create(validated_data)
-
-    def to_representation(self, instance):
-        # Convert comma-separated string -> list when returning data
-        data = super().to_representation(instance)
-        data["categories"] = (
-            instance.categories.split(",") if instance.categories else []
-        )
-        return data
+        budget = super().create(validated_data)
+        set_budget_categories(budget, categories)
+        return budget
+
+    def update(self, instance, validated_data):
+        categories = validated_data.pop("categories", None)
+        instance = super().update(instance, validated_data)
+        if categories is not None:
+            set_budget_categories(instance, categories)
+        # Saving bumped the owner's data version; reload spend under the new one.
+        instance.__dict__.pop("spent", None)
+        instance.__dict__.pop("data_version", None)
+        return instance
+
+
+class BudgetPeriodSerializer(serializers.Serializer):
+    start = serializers.DateField()
+    end = serializers.DateField()
+    spent = serializers.DecimalField(max_digits=14, decimal_places=2)
+    remaining = serializers.DecimalField(max_digits=14, decimal_places=2)
+    progress = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class BudgetForecastSerializer(serializers.Serializer):
+    budget = serializers.IntegerField()
+    start = serializers.DateField()
+    end = serializers.DateField()
+    amount = serializers.DecimalField(max_digits=14, decimal_places=2)
+    spent = serializers.DecimalField(max_digits=14, decimal_places=2)
+    forecast = serializers.DecimalField(max_digits=14, decimal_places=2)
+    low = serializers.DecimalField(max_digits=14, decimal_places=2)
+    high = serializers.DecimalField(max_digits=14, decimal_places=2)
+    moving_average = serializers.DecimalField(max_digits=14, decimal_places=2)
+    run_rate = serializers.DecimalField(max_digits=14, decimal_places=2)
+    same_period_last_year = serializers.DecimalField(
+        max_digits=14, decimal_places=2, allow_null=True
+    )
+    will_exceed = serializers.BooleanField()
+
+
+class CashFlowSerializer(serializers.Serializer):
+    start = serializers.DateField()
+    income = serializers.DecimalField(max_digits=14, decimal_places=2)
+    expense = serializers.DecimalField(max_digits=14, decimal_places=2)
+    net = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class CategoryTotalSerializer(serializers.Serializer):
+    category = serializers.CharField()
+    total = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class BudgetProgressSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    amount = serializers.DecimalField(max_digits=14, decimal_places=2)
+    currency = serializers.CharField()
+    spent = serializers.DecimalField(max_digits=14, decimal_places=2)
+    progress = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class GoalProgressSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    goal_name = serializers.CharField()
+    target_amount = serializers.DecimalField(max_digits=14, decimal_places=2)
+    saved_amount = serializers.DecimalField(max_digits=14, decimal_places=2)
+    target_date = serializers.DateField()
+    progress = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class DashboardSerializer(serializers.Serializer):
+    currency = serializers.CharField()
+    net_worth = serializers.DecimalField(max_digits=14, decimal_places=2)
+    balances = serializers.DictField(
+        child=serializers.DecimalField(max_digits=14, decimal_places=2)
+    )
+    missing_rates = serializers.ListField(child=serializers.CharField())
+    month = serializers.DateField()
+    income = serializers.DecimalField(max_digits=14, decimal_places=2)
+    expense = serializers.DecimalField(max_digits=14, decimal_places=2)
+    net = serializers.DecimalField(max_digits=14, decimal_places=2)
+    top_categories = CategoryTotalSerializer(many=True)
+    budgets = BudgetProgressSerializer(many=True)
+    goals = GoalProgressSerializer(many=True)
+
+
+class DailyTotalSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    total = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class RecordAnalyticsSerializer(serializers.Serializer):
+    currency = serializers.CharField()
+    missing_rates = serializers.ListField(child=serializers.CharField())
+    start = serializers.DateField()
+    end = serializers.DateField()
+    categories = CategoryTotalSerializer(many=True)
+    percentiles = serializers.DictField(
+        child=serializers.DecimalField(max_digits=14, decimal_places=2, allow_null=True)
+    )
+    rolling = DailyTotalSerializer(many=True)
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Notification
+        fields = ["id", "budget", "threshold", "message", "is_read", "created_at"]
+        read_only_fields = ["budget", "threshold", "message", "created_at"]
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(choices=BATCH_METHODS, default="GET")
+    path = serializers.CharField()
+    body = serializers.JSONField(required=False)
+
+    def validate_path(self, value):
+        if not value.startswith("/"):
+            raise serializers.ValidationError(
+                "Use an absolute path, e.g. /api/records/."
+            )
+        return value
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = BatchRequestSerializer(
+        many=True, allow_empty=False, max_length=MAX_BATCH_REQUESTS
+    )
+    atomic = serializers.BooleanField(default=False)
@@ -0,0 +1,171 @@
+from collections import defaultdict
+from decimal import Decimal
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import F
+
+from .alerts import apply_expense_deltas, expense_entries
+from .balances import ledger_entries, update_checkpoints, update_daily_balances
+from .budgets import bump_data_version
+from .models import Account, Record
+from .periods import advance, month_start, period_step
+from .rollups import apply_rollup_deltas, rollup_entries
+from .search import index_records
+
+# Every write to ``Record`` goes through this module so account balances are
+# only ever moved by database-side ``F()`` updates inside one transaction.
+# Reading a balance into Python, changing it and saving it back loses updates
+# when two requests touch the same account.
+
+DATE_FIELD = Record._meta.get_field("date")
+TIME_FIELD = Record._meta.get_field("time")
+
+
+def normalize_record(record):
+    # ``date`` and ``time`` default to ``timezone.now`` and keep holding that
+    # datetime until the instance is reloaded.
+    record.date = DATE_FIELD.to_python(record.date)
+    record.time = TIME_FIELD.to_python(record.time)
+    if record.is_recurring and period_step(record.recurrence_period):
+        if record.next_occurrence is None:
+            record.next_occurrence = advance(record.date, record.recurrence_period)
+    else:
+        record.next_occurrence = None
+    return record
+
+
+def apply_balance_deltas(deltas):
+    per_account = defaultdict(Decimal)
+    per_month = defaultdict(Decimal)
+    for (account_id, day), delta in deltas.items():
+        per_account[account_id] += delta
+        per_month[account_id, month_start(day)] += delta
+
+    # A fixed lock order keeps concurrent writers from deadlocking.
+    for account_id in sorted(per_account):
+        delta = per_account[account_id]
+        if delta:
+            Account.objects.filter(pk=account_id).update(balance=F("balance") + delta)
+
+    update_checkpoints(per_month)
+    update_daily_balances(deltas)
+
+
+class RecordChanges:
+    """
+    The net effect of a batch of record writes.
+
+    Records are added as they are written and removed as they are deleted or
+    replaced; ``apply()`` then updates balances and derived data once for the
+    whole batch. It only keeps aggregates, never the records themselves.
+    """
+
+    def __init__(self):
+        # (account_id, date) -> balance change
+        self.balance_deltas = defaultdict(Decimal)
+        # rollup key -> [total change, count change]
+        self.rollup_deltas = defaultdict(lambda: [Decimal(0), 0])
+        # Owners of changed records, whose cached spend and summaries are stale.
+        self.changed_users = set()
+        # (user_id, account_id, category, date) -> expense change, for alerts
+        self.expense_deltas = defaultdict(Decimal)
+
+    def add(self, records, sign=1):
+        records = list(records)
+        for account_id, day, amount in ledger_entries(records):
+            self.balance_deltas[account_id, day] += sign * amount
+        for key, amount in rollup_entries(records):
+            delta = self.rollup_deltas[key]
+            delta[0] += sign * amount
+            delta[1] += sign
+        self.changed_users.update(record.user_id for record in records)
+        for key, amount in expense_entries(records):
+            self.expense_deltas[key] += sign * amount
+
+    def remove(self, records):
+        self.add(records, sign=-1)
+
+    def apply(self):
+        """Must run inside the transaction that performed the writes."""
+        apply_balance_deltas(self.balance_deltas)
+        apply_rollup_deltas(self.rollup_deltas)
+        apply_expense_deltas(self.expense_deltas)
+        bump_data_version(self.changed_users)
+
+
+def apply_record_changes(added=(), removed=()):
+    changes = RecordChanges()
+    changes.add(added)
+    changes.remove(removed)
+    changes.apply()
+
+
+def create_record(record):
+    normalize_record(record)
+    with transaction.atomic():
+        record.save()
+        apply_record_changes(added=[record])
+    return record
+
+
+def update_record(record):
+    """Save an edited ``record``, reversing the effect of its stored version."""
+    normalize_record(record)
+    with transaction.atomic():
+        old_record = Record.objects.select_for_update().get(pk=record.pk)
+        if (record.date, record.recurrence_period) != (
+            old_record.date,
+            old_record.recurrence_period,
+        ):
+            # The schedule moved: the next occurrence follows the new date.
+            record.next_occurrence = None
+            normalize_record(record)
+        record.save()
+        apply_record_changes(added=[record], removed=[old_record])
+    return record
+
+
+def delete_record(record):
+    with transaction.atomic():
+        old_record = Record.objects.select_for_update().get(pk=record.pk)
+        old_record.delete()
+        apply_record_changes(removed=[old_record])
+
+
+def bulk_create_records(records, batch_size=500):
+    """
+    Insert ``records`` in one transaction and move each touched account's
+    balance once by its net delta.
+    """
+    for record in records:
+        normalize_record(record)
+    with transaction.atomic():
+        created = Record.objects.bulk_create(records, batch_size=batch_size)
+        # bulk_create sends no post_save, so index the notes here.
+        index_records(created)
+        apply_record_changes(added=created)
+    return created
+
+
+def stream_create_records(records, chunk_size=1000):
+    """
+    Insert an iterable of unsaved records ``chunk_size`` rows at a time.
+
+    Only one chunk is held in memory. Balances are adjusted once at the end,
+    and the whole stream is one transaction, so a failure part way leaves no
+    rows and no balance change behind. Returns the number of rows inserted.
+    """
+    records = iter(records)
+    changes = RecordChanges()
+    count = 0
+    with transaction.atomic():
+        while chunk := list(islice(records, chunk_size)):
+            for record in chunk:
+                normalize_record(record)
+            Record.objects.bulk_create(chunk)
+            index_records(chunk)
+            changes.add(chunk)
+            count += len(chunk)
+        changes.apply()
+    return count
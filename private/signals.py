@@ -0,0 +1,47 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .alerts import refresh_running_spent
+from .budgets import bump_data_version
+from .models import Account, Budget, Goal, Record
+from .search import index_records, unindex_records
+
+
+@receiver(post_save, sender=Record)
+def index_record_note(sender, instance, **kwargs):
+    index_records([instance])
+
+
+@receiver(post_delete, sender=Record)
+def unindex_record_note(sender, instance, **kwargs):
+    unindex_records([instance.pk])
+
+
+@receiver(post_save, sender=Budget)
+@receiver(post_delete, sender=Budget)
+@receiver(post_delete, sender=Account)
+def invalidate_budget_spend(sender, instance, **kwargs):
+    # Deleting an account cascades to its records outside ``services``.
+    bump_data_version([instance.user_id])
+    if sender is Budget and kwargs["signal"] is post_save:
+        refresh_running_spent(Budget.objects.filter(pk=instance.pk))
+    elif sender is Account:
+        refresh_running_spent(Budget.objects.filter(user_id=instance.user_id))
+
+
+@receiver(m2m_changed, sender=Budget.account.through)
+def invalidate_budget_accounts(sender, instance, action, pk_set, **kwargs):
+    # ``instance`` is the budget, or the account when edited from that side.
+    if action.startswith("post_"):
+        bump_data_version([instance.user_id])
+        if isinstance(instance, Budget):
+            refresh_running_spent(Budget.objects.filter(pk=instance.pk))
+        elif pk_set:
+            refresh_running_spent(Budget.objects.filter(pk__in=pk_set))
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_save, sender=Goal)
+@receiver(post_delete, sender=Goal)
+def invalidate_dashboard(sender, instance, **kwargs):
+    bump_data_version([instance.user_id])
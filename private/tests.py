@@ -1,3 +1,2096 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+import threading
+import time as clock
+from datetime import date, time, timedelta
+from decimal import Decimal
+from importlib import import_module
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import numpy as np
+from asgiref.sync import sync_to_async
+
+from django.apps import apps as django_apps
+from django.db import OperationalError, connection
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.http import QueryDict
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from public.models import CustomUser
+from .budgets import (
+    budget_history,
+    budget_windows,
+    budgets_for_record,
+    load_spent,
+    set_budget_categories,
+    with_data_version,
+)
+from .dashboard import dashboard_summary
+from .filters import filter_records
+from .forecast import forecast_budgets
+from .importers import parse_ofx, parse_qif
+from .rates import MissingRate, current_rates
+from .recurring import materialize_due_records
+from .analytics import (
+    amount_percentiles,
+    cached_frame,
+    category_totals,
+    record_frame,
+    rolling_sums,
+)
+from .balances import (
+    balance_as_of,
+    balance_series,
+    rebuild_checkpoints,
+    rebuild_daily_balances,
+)
+from .models import (
+    Account,
+    AccountDailyBalance,
+    BalanceCheckpoint,
+    Budget,
+    ExchangeRate,
+    Goal,
+    Notification,
+    Record,
+    RecordMonthlyRollup,
+)
+from .pagination import RECORD_ORDERING
+from .periods import add_months
+from .serializers import RecordSerializer
+from .services import (
+    bulk_create_records,
+    create_record,
+    delete_record,
+    update_record,
+)
+
+
+class PrivateTestCase(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username="ada", email="ada@example.com", password="pass12345"
+        )
+        self.account = Account.objects.create(
+            user=self.user,
+            name="Wallet",
+            balance=Decimal("100.00"),
+            account_type="Cash",
+            currency="NGN",
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def make_record(self, **kwargs):
+        values = {
+            "user": self.user,
+            "record_type": "expense",
+            "category": "Groceries",
+            "account": self.account,
+            "amount": Decimal("10.00"),
+            "date": date(2025, 1, 1),
+            "time": time(12, 0),
+        }
+        values.update(kwargs)
+        return Record.objects.create(**values)
+
+
+class RecordPaginationTest(PrivateTestCase):
+    def test_api_walks_every_record_once_in_keyset_order(self):
+        for day in range(1, 6):
+            for hour in (9, 9, 18):
+                self.make_record(date=date(2025, 1, day), time=time(hour, 0))
+
+        seen = []
+        url = reverse("record-api-list-create") + "?page_size=4"
+        while url:
+            response = self.api.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(row["id"] for row in response.data["results"])
+            url = response.data["next"]
+
+        expected = list(
+            Record.objects.order_by("-date", "-time", "-id").values_list(
+                "id", flat=True
+            )
+        )
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.api.get(reverse("record-api-list-create") + "?cursor=bogus")
+        self.assertEqual(response.status_code, 404)
+
+
+class RecordFieldsetTest(PrivateTestCase):
+    def test_fast_path_matches_the_serializer_and_selects_fields(self):
+        savings = Account.objects.create(
+            user=self.user,
+            name="Savings",
+            balance=Decimal("0.00"),
+            account_type="Saving account",
+            currency="NGN",
+        )
+        self.make_record(amount=Decimal("12.5"), note="Lunch")
+        self.make_record(
+            record_type="transfer",
+            account=None,
+            from_account=self.account,
+            to_account=savings,
+            date=date(2025, 1, 2),
+        )
+        create_record(
+            Record(
+                user=self.user,
+                record_type="income",
+                category="Salary",
+                account=self.account,
+                amount=Decimal("100.00"),
+                date=date(2025, 1, 3),
+                is_recurring=True,
+                recurrence_period="monthly",
+            )
+        )
+        url = reverse("record-api-list-create")
+
+        response = self.api.get(url)
+        expected = RecordSerializer(
+            Record.objects.order_by(*RECORD_ORDERING), many=True
+        ).data
+        self.assertEqual(response.json()["results"], json.loads(json.dumps(expected)))
+
+        response = self.api.get(url, {"fields": "amount,date", "page_size": 2})
+        body = response.json()
+        self.assertEqual(
+            body["results"],
+            [
+                {"date": "2025-01-03", "amount": "100.00"},
+                {"date": "2025-01-02", "amount": "10.00"},
+            ],
+        )
+        body = self.api.get(body["next"]).json()
+        self.assertEqual(body["results"], [{"date": "2025-01-01", "amount": "12.50"}])
+
+        response = self.api.get(url, {"fields": "amount,owner"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"fields": "Unknown field: owner."})
+
+
+class RecordFilterTest(PrivateTestCase):
+    # Every combination the list endpoint is expected to serve from an index.
+    FILTER_COMBINATIONS = [
+        "start_date=2025-01-01&end_date=2025-01-31",
+        "category=Groceries",
+        "category=Groceries,Housing",
+        "category=Groceries&start_date=2025-01-01",
+        "record_type=income",
+        "record_type=expense&end_date=2025-01-31",
+        "account=1",
+        "account=1&start_date=2025-01-01",
+        "min_amount=5&max_amount=20",
+        "is_recurring=true",
+        "is_recurring=false",
+        "category=Groceries&record_type=expense&min_amount=5&is_recurring=false",
+    ]
+
+    def setUp(self):
+        super().setUp()
+        self.groceries = self.make_record(date=date(2025, 1, 5))
+        self.salary = self.make_record(
+            record_type="income",
+            category="Salary",
+            amount=Decimal("500.00"),
+            date=date(2025, 2, 1),
+        )
+        self.rent = self.make_record(
+            category="Housing",
+            amount=Decimal("200.00"),
+            date=date(2025, 2, 3),
+            is_recurring=True,
+            recurrence_period="monthly",
+        )
+
+    def ids(self, query):
+        response = self.api.get(reverse("record-api-list-create") + "?" + query)
+        self.assertEqual(response.status_code, 200)
+        return {row["id"] for row in response.json()["results"]}
+
+    def test_filters(self):
+        self.assertEqual(
+            self.ids("start_date=2025-02-01"), {self.salary.pk, self.rent.pk}
+        )
+        self.assertEqual(
+            self.ids("category=Groceries&category=Housing"),
+            {self.groceries.pk, self.rent.pk},
+        )
+        self.assertEqual(
+            self.ids("category=Groceries,Housing&end_date=2025-01-31"),
+            {self.groceries.pk},
+        )
+        self.assertEqual(self.ids("record_type=income"), {self.salary.pk})
+        self.assertEqual(self.ids("min_amount=100&max_amount=300"), {self.rent.pk})
+        self.assertEqual(self.ids("is_recurring=true"), {self.rent.pk})
+        self.assertEqual(
+            self.ids(f"account={self.account.pk}"),
+            {self.groceries.pk, self.salary.pk, self.rent.pk},
+        )
+        self.assertEqual(self.ids(f"account={self.account.pk + 1}"), set())
+
+    def test_invalid_filters_are_rejected(self):
+        response = self.api.get(
+            reverse("record-api-list-create")
+            + "?record_type=gift&category=Rent&min_amount=lots&is_recurring=maybe"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            set(response.json()),
+            {"record_type", "category", "min_amount", "is_recurring"},
+        )
+
+    @skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN is SQLite")
+    def test_every_filter_combination_uses_an_index(self):
+        for query in self.FILTER_COMBINATIONS:
+            with self.subTest(query=query):
+                queryset = filter_records(
+                    Record.objects.filter(user=self.user), QueryDict(query)
+                ).order_by(*RECORD_ORDERING)
+                plan = queryset.explain()
+                self.assertRegex(plan, r"SEARCH private_record USING (COVERING )?INDEX")
+                self.assertNotRegex(plan, r"SCAN private_record\b(?! USING)")
+
+    @skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN is SQLite")
+    def test_filters_read_pages_in_index_order(self):
+        expected = {
+            "category=Groceries": "record_user_category_idx",
+            "record_type=income": "record_user_type_idx",
+            "is_recurring=true": "record_user_recurring_idx",
+            "min_amount=5&max_amount=20": "record_user_amount_idx",
+        }
+        for query, index in expected.items():
+            with self.subTest(query=query):
+                queryset = filter_records(
+                    Record.objects.filter(user=self.user), QueryDict(query)
+                ).order_by(*RECORD_ORDERING)
+                self.assertIn(index, queryset.explain())
+
+
+class RecordBulkCreateTest(PrivateTestCase):
+    def test_bulk_create_applies_one_net_delta_per_account(self):
+        savings = Account.objects.create(
+            user=self.user,
+            name="Savings",
+            balance=Decimal("0.00"),
+            account_type="Saving account",
+            currency="NGN",
+        )
+        payload = [
+            {
+                "record_type": "income",
+                "category": "Salary",
+                "account": self.account.pk,
+                "amount": "50.00",
+                "date": "2025-02-01",
+            },
+            {
+                "record_type": "expense",
+                "category": "Groceries",
+                "account": self.account.pk,
+                "amount": "20.00",
+            },
+            {
+                "record_type": "transfer",
+                "category": "Savings",
+                "from_account": self.account.pk,
+                "to_account": savings.pk,
+                "amount": "30.00",
+            },
+        ]
+        response = self.api.post(reverse("record-api-bulk"), payload, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 3)
+        self.assertEqual(
+            Record.objects.get(pk=response.data["ids"][0]).date, date(2025, 2, 1)
+        )
+        self.account.refresh_from_db()
+        savings.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("100.00"))
+        self.assertEqual(savings.balance, Decimal("30.00"))
+
+    def test_bulk_create_reports_errors_per_row_and_inserts_nothing(self):
+        other = CustomUser.objects.create_user(
+            username="bob", email="bob@example.com", password="pass12345"
+        )
+        foreign = Account.objects.create(
+            user=other,
+            name="Foreign",
+            balance=Decimal("0.00"),
+            account_type="Cash",
+            currency="NGN",
+        )
+        payload = [
+            {
+                "record_type": "expense",
+                "category": "Groceries",
+                "account": self.account.pk,
+                "amount": "5.00",
+            },
+            {
+                "record_type": "expense",
+                "category": "Groceries",
+                "account": foreign.pk,
+                "amount": "5.00",
+            },
+            {"record_type": "expense", "category": "Groceries", "amount": "5.00"},
+        ]
+        response = self.api.post(reverse("record-api-bulk"), payload, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error["index"] for error in response.data["errors"]], [1, 2])
+        self.assertFalse(Record.objects.exists())
+
+
+class RecordBalanceServiceTest(PrivateTestCase):
+    def test_edit_and_delete_reverse_the_stored_record(self):
+        record = create_record(
+            Record(
+                user=self.user,
+                record_type="expense",
+                category="Groceries",
+                account=self.account,
+                amount=Decimal("30.00"),
+            )
+        )
+        record.record_type = "income"
+        record.amount = Decimal("5.00")
+        update_record(record)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("105.00"))
+
+        response = self.api.delete(reverse("record-api-detail", args=[record.pk]))
+        self.assertEqual(response.status_code, 204)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("100.00"))
+
+
+class ConditionalGetTest(PrivateTestCase):
+    def setUp(self):
+        super().setUp()
+        # Authenticate like a real client, so the user row is read per request.
+        self.api = APIClient()
+        token = RefreshToken.for_user(self.user).access_token
+        self.api.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_unchanged_lists_are_not_modified_until_a_write(self):
+        self.make_record()
+        urls = [
+            reverse("account-api-list-create"),
+            reverse("record-api-list-create"),
+            reverse("budget-list-create"),
+            reverse("record-api-detail", args=[Record.objects.get().pk]),
+        ]
+        detail_url = urls[-1]
+        etags = {}
+        for url in urls:
+            response = self.api.get(url)
+            self.assertEqual(response.status_code, 200)
+            etags[url] = response["ETag"]
+            # The user lookup of the JWT authentication, and for the detail
+            # view a check that the record is still there.
+            with self.assertNumQueries(2 if url == detail_url else 1):
+                response = self.api.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response["ETag"], etags[url])
+
+        Goal.objects.create(
+            user=self.user,
+            goal_name="holiday_trip",
+            target_amount=Decimal("400.00"),
+            target_date=date(2030, 1, 1),
+        )
+        for url in urls:
+            response = self.api.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response["ETag"], etags[url])
+
+    def test_missing_and_foreign_objects_are_not_found(self):
+        record = self.make_record()
+        url = reverse("record-api-detail", args=[record.pk])
+        etag = self.api.get(url)["ETag"]
+        other = CustomUser.objects.create_user(
+            username="other", email="other@example.com", password="p"
+        )
+        Record.objects.filter(pk=record.pk).update(user=other)
+        for url in [url, reverse("record-api-detail", args=[record.pk + 1])]:
+            response = self.api.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 404)
+
+
+class AsyncReadViewTest(PrivateTestCase):
+    def setUp(self):
+        super().setUp()
+        token = RefreshToken.for_user(self.user).access_token
+        self.auth = {"headers": {"Authorization": f"Bearer {token}"}}
+        for day in range(1, 6):
+            self.make_record(date=date(2025, 1, day), note=f"Day {day}")
+        self.make_record(record_type="income", category="Salary")
+        budget = Budget.objects.create(
+            user=self.user,
+            name="Essentials",
+            period="Month",
+            start_date=date(2025, 1, 1),
+            end_date=date(2025, 1, 31),
+            amount=Decimal("60.00"),
+            currency="NGN",
+        )
+        budget.account.add(self.account)
+        set_budget_categories(budget, ["Groceries", "Transportation"])
+
+    async def test_matches_the_sync_endpoints(self):
+        pairs = [
+            ("async-account-list", "account-api-list-create", ""),
+            ("async-record-list", "record-api-list-create", "?page_size=4"),
+            ("async-record-list", "record-api-list-create", "?fields=amount,note"),
+            ("async-budget-list", "budget-list-create", ""),
+            ("async-dashboard", "dashboard-api", ""),
+        ]
+        for async_name, sync_name, query in pairs:
+            response = await self.async_client.get(
+                reverse(async_name) + query, **self.auth
+            )
+            self.assertEqual(response.status_code, 200)
+            expected = await sync_to_async(self.api.get)(reverse(sync_name) + query)
+            data = response.json()
+            if "next" in data:
+                # Same cursor, on the async URL.
+                for page in (data, expected.data):
+                    page["next"] = page["next"] and page["next"].split("?")[1]
+                    del page["first"]
+            self.assertEqual(data, json.loads(json.dumps(expected.data)))
+
+    async def test_pages_and_etags(self):
+        url = reverse("async-record-list")
+        response = await self.async_client.get(url + "?page_size=4", **self.auth)
+        page = response.json()
+        self.assertEqual(len(page["results"]), 4)
+        response = await self.async_client.get(page["next"], **self.auth)
+        self.assertEqual(len(response.json()["results"]), 2)
+        self.assertIsNone(response.json()["next"])
+
+        response = await self.async_client.get(
+            url,
+            headers={**self.auth["headers"], "If-None-Match": response["ETag"]},
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_rejects_bad_requests(self):
+        url = reverse("async-record-list")
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get(
+            url, headers={"Authorization": "Bearer nonsense"}
+        )
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get(url + "?fields=owner", **self.auth)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("fields", response.json())
+        response = await self.async_client.get(url + "?cursor=bogus", **self.auth)
+        self.assertEqual(response.status_code, 404)
+        response = await self.async_client.post(url, **self.auth)
+        self.assertEqual(response.status_code, 405)
+
+
+class BatchAPITest(PrivateTestCase):
+    def setUp(self):
+        super().setUp()
+        self.api = APIClient()
+        token = RefreshToken.for_user(self.user).access_token
+        self.api.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.url = reverse("batch-api")
+
+    def record(self, category="Groceries"):
+        return {
+            "record_type": "expense",
+            "category": category,
+            "account": self.account.pk,
+            "amount": "5.00",
+            "date": "2025-01-01",
+        }
+
+    def test_reads_match_the_endpoints(self):
+        self.make_record()
+        paths = [
+            reverse("account-api-list-create"),
+            reverse("record-api-list-create") + "?fields=amount,category",
+            reverse("budget-list-create"),
+            reverse("dashboard-api"),
+        ]
+        response = self.api.post(
+            self.url, {"requests": [{"path": path} for path in paths]}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        for path, result in zip(paths, response.json()["results"]):
+            expected = self.api.get(path)
+            self.assertEqual(result["status"], 200)
+            self.assertEqual(result["body"], expected.json())
+
+    def test_writes_run_in_order(self):
+        response = self.api.post(
+            self.url,
+            {
+                "requests": [
+                    {
+                        "method": "POST",
+                        "path": reverse("record-api-list-create"),
+                        "body": self.record(),
+                    },
+                    {"method": "POST", "path": reverse("record-api-list-create")},
+                    {"path": reverse("account-api-detail", args=[self.account.pk])},
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        created, invalid, account = response.json()["results"]
+        self.assertEqual(created["status"], 201)
+        self.assertEqual(created["body"]["user"], self.user.pk)
+        self.assertEqual(invalid["status"], 400)
+        self.assertEqual(account["body"]["balance"], "95.00")
+        self.assertEqual(Record.objects.count(), 1)
+
+    def test_atomic_batch_rolls_back_at_the_first_failure(self):
+        path = reverse("record-api-list-create")
+        response = self.api.post(
+            self.url,
+            {
+                "atomic": True,
+                "requests": [
+                    {"method": "POST", "path": path, "body": self.record()},
+                    {"method": "POST", "path": path, "body": self.record("Nonsense")},
+                    {"method": "POST", "path": path, "body": self.record()},
+                ],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            [result["status"] for result in response.json()["results"]], [201, 400]
+        )
+        self.assertFalse(Record.objects.exists())
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("100.00"))
+
+    def test_rejects_what_cannot_be_batched(self):
+        requests = [
+            {"path": "/api/nowhere/"},
+            {"path": self.url},
+            {"path": reverse("async-record-list")},
+            {"path": reverse("account")},
+        ]
+        response = self.api.post(self.url, {"requests": requests}, format="json")
+        self.assertEqual(
+            [result["status"] for result in response.json()["results"]],
+            [404, 400, 400, 400],
+        )
+
+        for payload in [
+            {"requests": []},
+            {"requests": [{"path": "api/records/"}]},
+            {"requests": [{"method": "HEAD", "path": "/api/records/"}]},
+            {"requests": [{"path": "/api/records/"}] * 26},
+        ]:
+            response = self.api.post(self.url, payload, format="json")
+            self.assertEqual(response.status_code, 400)
+
+        self.api.credentials()
+        response = self.api.post(self.url, {"requests": requests}, format="json")
+        self.assertEqual(response.status_code, 401)
+
+
+class BalanceCheckpointTest(PrivateTestCase):
+    def replayed_balance(self, day):
+        self.account.refresh_from_db()
+        later = sum(
+            record.amount if record.record_type == "income" else -record.amount
+            for record in Record.objects.filter(date__gt=day)
+        )
+        return self.account.balance - later
+
+    def test_back_dated_writes_keep_checkpoints_consistent(self):
+        def add(day, record_type="expense", amount="10.00"):
+            return create_record(
+                Record(
+                    user=self.user,
+                    record_type=record_type,
+                    category="Groceries",
+                    account=self.account,
+                    amount=Decimal(amount),
+                    date=day,
+                )
+            )
+
+        add(date(2025, 3, 10))
+        add(date(2025, 5, 2), "income", "40.00")
+        back_dated = add(date(2025, 1, 20), amount="7.50")
+        add(date(2024, 11, 30), "income", "3.00")
+        back_dated.date = date(2025, 4, 1)
+        update_record(back_dated)
+        delete_record(Record.objects.get(date=date(2025, 3, 10)))
+
+        for day in [
+            date(2024, 11, 1),
+            date(2024, 12, 31),
+            date(2025, 2, 15),
+            date(2025, 4, 1),
+            date(2025, 6, 1),
+        ]:
+            self.assertEqual(
+                balance_as_of(self.account.pk, day), self.replayed_balance(day)
+            )
+
+        stored = list(
+            BalanceCheckpoint.objects.order_by("month").values_list("month", "balance")
+        )
+        rebuild_checkpoints(self.account)
+        rebuilt = list(
+            BalanceCheckpoint.objects.order_by("month").values_list("month", "balance")
+        )
+        self.assertEqual(
+            [row for row in stored if row[0] in {month for month, _ in rebuilt}],
+            rebuilt,
+        )
+
+    def test_a_decade_of_monthly_records_is_applied_in_a_few_queries(self):
+        for day in [date(2016, 6, 10), date(2020, 2, 29), date(2030, 1, 1)]:
+            create_record(
+                Record(
+                    user=self.user,
+                    record_type="income",
+                    category="Salary",
+                    account=self.account,
+                    amount=Decimal("100.00"),
+                    date=day,
+                )
+            )
+        records = [
+            Record(
+                user=self.user,
+                record_type="expense",
+                category="Groceries",
+                account=self.account,
+                amount=Decimal(month % 7) + Decimal("0.50"),
+                date=add_months(date(2015, 1, 15), month),
+            )
+            for month in range(120)
+            if month % 11
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            bulk_create_records(records)
+        checkpoint_queries = [
+            query["sql"]
+            for query in queries.captured_queries
+            if "private_balancecheckpoint" in query["sql"]
+        ]
+        # One UPDATE, one read of the stored months, the INSERT and one
+        # balance_as_of each for the new checkpoints and new daily rows.
+        self.assertEqual(sum(sql.startswith("UPDATE") for sql in checkpoint_queries), 1)
+        self.assertLessEqual(len(checkpoint_queries), 7)
+
+        stored = list(
+            BalanceCheckpoint.objects.order_by("month").values_list("month", "balance")
+        )
+        rebuild_checkpoints(self.account)
+        rebuilt = list(
+            BalanceCheckpoint.objects.order_by("month").values_list("month", "balance")
+        )
+        self.assertEqual(
+            [row for row in stored if row[0] in {month for month, _ in rebuilt}],
+            rebuilt,
+        )
+        for day in [date(2014, 12, 31), date(2019, 7, 20), date(2031, 1, 1)]:
+            self.assertEqual(
+                balance_as_of(self.account.pk, day), self.replayed_balance(day)
+            )
+
+    def test_balance_api(self):
+        create_record(
+            Record(
+                user=self.user,
+                record_type="expense",
+                category="Groceries",
+                account=self.account,
+                amount=Decimal("25.00"),
+                date=date(2025, 3, 10),
+            )
+        )
+        url = reverse("account-api-balance", args=[self.account.pk])
+        self.assertEqual(self.api.get(url + "?date=2025-03-09").data["balance"], 100)
+        self.assertEqual(self.api.get(url + "?date=2025-03-10").data["balance"], 75)
+        self.assertEqual(self.api.get(url + "?date=March").status_code, 400)
+
+
+class DailyBalanceSeriesTest(PrivateTestCase):
+    def add(self, day, record_type="expense", amount="10.00", **kwargs):
+        values = {
+            "user": self.user,
+            "record_type": record_type,
+            "category": "Groceries",
+            "account": self.account,
+            "amount": Decimal(amount),
+            "date": day,
+        }
+        values.update(kwargs)
+        return create_record(Record(**values))
+
+    def test_series_follows_back_dated_writes_and_transfers(self):
+        savings = Account.objects.create(
+            user=self.user,
+            name="Savings",
+            balance=Decimal("0.00"),
+            account_type="Saving account",
+            currency="NGN",
+        )
+        self.add(date(2025, 3, 10))
+        self.add(date(2025, 3, 12), "income", "40.00")
+        back_dated = self.add(date(2025, 3, 5), amount="7.50")
+        self.add(
+            date(2025, 3, 11),
+            "transfer",
+            "20.00",
+            account=None,
+            from_account=self.account,
+            to_account=savings,
+        )
+        back_dated.date = date(2025, 3, 11)
+        update_record(back_dated)
+        delete_record(Record.objects.get(date=date(2025, 3, 10)))
+
+        url = reverse("account-api-balance-series", args=[self.account.pk])
+        with self.assertNumQueries(2):
+            response = self.api.get(
+                url, {"start_date": "2025-03-09", "end_date": "2025-03-13"}
+            )
+        self.assertEqual(
+            [(p["date"], p["balance"]) for p in response.json()["series"]],
+            [
+                ("2025-03-09", "100.00"),
+                ("2025-03-10", "100.00"),
+                ("2025-03-11", "72.50"),
+                ("2025-03-12", "112.50"),
+                ("2025-03-13", "112.50"),
+            ],
+        )
+        self.assertEqual(
+            balance_series(savings.pk, date(2025, 3, 10), date(2025, 3, 11)),
+            [
+                (date(2025, 3, 10), Decimal("0.00")),
+                (date(2025, 3, 11), Decimal("20.00")),
+            ],
+        )
+        self.assertEqual(
+            balance_series(self.account.pk, date(2025, 1, 1), date(2025, 1, 1)),
+            [(date(2025, 1, 1), Decimal("100.00"))],
+        )
+
+        stored = list(
+            AccountDailyBalance.objects.filter(account=self.account)
+            .exclude(flow=0)
+            .order_by("date")
+            .values_list("date", "balance", "flow")
+        )
+        rebuild_daily_balances(self.account)
+        rebuilt = list(
+            AccountDailyBalance.objects.filter(account=self.account)
+            .order_by("date")
+            .values_list("date", "balance", "flow")
+        )
+        self.assertEqual(stored, rebuilt)
+
+    def test_a_year_of_daily_records_is_applied_in_a_few_queries(self):
+        self.add(date(2025, 3, 1), "income", "500.00")
+        self.add(date(2025, 9, 1))
+        records = [
+            Record(
+                user=self.user,
+                record_type="expense",
+                category="Groceries",
+                account=self.account,
+                amount=Decimal("1.00"),
+                date=date(2025, 1, 1) + timedelta(days=offset),
+            )
+            for offset in range(365)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            bulk_create_records(records)
+        daily = [
+            query["sql"]
+            for query in queries.captured_queries
+            if "private_accountdailybalance" in query["sql"]
+        ]
+        # One UPDATE, one read of the stored days, and the batched INSERTs.
+        self.assertEqual(sum(sql.startswith("UPDATE") for sql in daily), 1)
+        self.assertLessEqual(len(daily), 4)
+
+        stored = list(
+            AccountDailyBalance.objects.filter(account=self.account)
+            .order_by("date")
+            .values_list("date", "balance", "flow")
+        )
+        rebuild_daily_balances(self.account)
+        rebuilt = list(
+            AccountDailyBalance.objects.filter(account=self.account)
+            .order_by("date")
+            .values_list("date", "balance", "flow")
+        )
+        self.assertEqual(stored, rebuilt)
+
+
+OFX_EXPORT = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20250314093000
+<TRNAMT>-12.50
+<NAME>UBER TRIP
+</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT</TRNTYPE><DTPOSTED>20250315</DTPOSTED>
+<TRNAMT>1,000.00</TRNAMT><NAME>ACME</NAME><MEMO>Salary</MEMO></STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+QIF_EXPORT = """!Type:Bank
+D03/14'25
+T-40.00
+PShoprite
+LGroceries:Weekly
+^
+D3/15/2025
+T15.00
+MRefund
+^
+"""
+
+
+class RecordImportTest(PrivateTestCase):
+    def test_ofx_and_qif_parsers(self):
+        uber, salary = parse_ofx(OFX_EXPORT.splitlines())
+        self.assertEqual((uber.date, uber.time), (date(2025, 3, 14), time(9, 30)))
+        self.assertEqual(uber.amount, Decimal("-12.50"))
+        self.assertEqual(salary.amount, Decimal("1000.00"))
+        self.assertEqual(salary.note, "ACME - Salary")
+
+        shoprite, refund = parse_qif(QIF_EXPORT.splitlines(keepends=True))
+        self.assertEqual(shoprite.date, date(2025, 3, 14))
+        self.assertEqual(shoprite.category, "Groceries")
+        self.assertEqual(refund.amount, Decimal("15.00"))
+
+    def test_csv_upload_maps_rows_and_adjusts_balance(self):
+        export = (
+            "Date,Description,Amount,Category\n"
+            "14/03/2025,Shoprite,-40.00,groceries\n"
+            "15/03/2025,Side gig,15.00,\n"
+        )
+        response = self.api.post(
+            reverse("record-api-import"),
+            {
+                "file": SimpleUploadedFile("statement.csv", export.encode()),
+                "account": self.account.pk,
+            },
+            format="multipart",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["imported"], 2)
+        self.assertEqual(
+            list(
+                Record.objects.order_by("date").values_list(
+                    "record_type", "category", "amount"
+                )
+            ),
+            [
+                ("expense", "Groceries", Decimal("40.00")),
+                ("income", "Other Income", Decimal("15.00")),
+            ],
+        )
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("75.00"))
+
+    def test_bad_row_imports_nothing(self):
+        export = "Date,Amount\n2025-03-14,-5\nyesterday,-5\n"
+        response = self.api.post(
+            reverse("record-api-import"),
+            {
+                "file": SimpleUploadedFile("statement.csv", export.encode()),
+                "account": self.account.pk,
+            },
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Line 3", response.data["detail"])
+        self.assertFalse(Record.objects.exists())
+
+    def test_management_command_inserts_in_chunks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "statement.qif")
+            with open(path, "w") as export:
+                export.write(QIF_EXPORT)
+            call_command(
+                "import_records",
+                path,
+                account=self.account.pk,
+                chunk_size=1,
+                stdout=io.StringIO(),
+            )
+
+        self.assertEqual(Record.objects.count(), 2)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("75.00"))
+
+
+class RecordExportTest(PrivateTestCase):
+    def setUp(self):
+        super().setUp()
+        self.make_record(date=date(2025, 1, 5), note='Lunch, "Mama Put"')
+        self.make_record(date=date(2025, 2, 5), record_type="income", category="Salary")
+
+    def export(self, query=""):
+        response = self.api.get(reverse("record-api-export") + query)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_export(self):
+        lines = self.export().splitlines()
+        self.assertEqual(lines[0].split(",")[:3], ["id", "date", "time"])
+        self.assertEqual(len(lines), 3)
+        self.assertIn('"Lunch, ""Mama Put"""', lines[1])
+
+    def test_ndjson_export_with_filters(self):
+        body = self.export("?format=ndjson&start_date=2025-02-01")
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["date"], "2025-02-05")
+        self.assertEqual(rows[0]["amount"], "10.00")
+
+        body = self.export(f"?format=ndjson&account={self.account.pk + 1}")
+        self.assertEqual(body, "")
+
+    def test_bad_filter(self):
+        response = self.api.get(reverse("record-api-export") + "?end_date=soon")
+        self.assertEqual(response.status_code, 400)
+
+
+class RecurringRecordTest(PrivateTestCase):
+    def test_materializes_missing_occurrences_once(self):
+        rent = create_record(
+            Record(
+                user=self.user,
+                record_type="expense",
+                category="Housing",
+                account=self.account,
+                amount=Decimal("20.00"),
+                date=date(2025, 1, 31),
+                is_recurring=True,
+                recurrence_period="monthly",
+            )
+        )
+        self.assertEqual(rent.next_occurrence, date(2025, 2, 28))
+
+        self.assertEqual(materialize_due_records(date(2025, 4, 30)), 3)
+        self.assertEqual(materialize_due_records(date(2025, 4, 30)), 0)
+
+        self.assertEqual(
+            list(rent.occurrences.order_by("date").values_list("date", flat=True)),
+            [date(2025, 2, 28), date(2025, 3, 31), date(2025, 4, 30)],
+        )
+        self.assertFalse(rent.occurrences.filter(is_recurring=True).exists())
+        rent.refresh_from_db()
+        self.assertEqual(rent.next_occurrence, date(2025, 5, 31))
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("20.00"))
+
+    def test_existing_templates_are_scheduled_from_the_migration_date(self):
+        migration = import_module("private.migrations.0013_record_recurring_schedule")
+        rent = self.make_record(
+            date=date(2023, 1, 31), is_recurring=True, recurrence_period="monthly"
+        )
+        with mock.patch.object(timezone, "localdate", return_value=date(2025, 3, 5)):
+            migration.schedule_existing_templates(django_apps, None)
+        rent.refresh_from_db()
+        self.assertEqual(rent.next_occurrence, date(2025, 3, 31))
+        self.assertEqual(materialize_due_records(date(2025, 3, 5)), 0)
+
+    def test_editing_the_schedule_moves_the_next_occurrence(self):
+        rent = create_record(
+            Record(
+                user=self.user,
+                record_type="expense",
+                category="Housing",
+                account=self.account,
+                amount=Decimal("20.00"),
+                date=date(2025, 1, 31),
+                is_recurring=True,
+                recurrence_period="monthly",
+            )
+        )
+        response = self.api.patch(
+            reverse("record-api-detail", args=[rent.pk]),
+            {"date": "2025-03-10", "recurrence_period": "weekly"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        rent.refresh_from_db()
+        self.assertEqual(rent.next_occurrence, date(2025, 3, 17))
+
+        rent.amount = Decimal("25.00")
+        update_record(rent)
+        rent.refresh_from_db()
+        self.assertEqual(rent.next_occurrence, date(2025, 3, 17))
+
+
+class RecordSearchTest(PrivateTestCase):
+    def search(self, q, **params):
+        response = self.api.get(reverse("record-api-search"), {"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_matches_words_and_prefix_for_the_owner_only(self):
+        lunch = self.make_record(note="Lunch at the coffee shop")
+        self.make_record(note="Coffee beans")
+        self.make_record(note="Rent")
+        other = CustomUser.objects.create_user(
+            username="bob", email="bob@example.com", password="pass12345"
+        )
+        self.make_record(user=other, note="coffee shop")
+
+        results = self.search("coffee sh")["results"]
+        self.assertEqual([r["id"] for r in results], [lunch.pk])
+        self.assertEqual(len(self.search("coff")["results"]), 2)
+        self.assertEqual(self.search("")["results"], [])
+
+    def test_index_follows_updates_deletes_and_bulk_inserts(self):
+        record = self.make_record(note="gym membership")
+        record.note = "swimming pool"
+        update_record(record)
+        self.assertEqual(self.search("gym")["results"], [])
+        self.assertEqual(len(self.search("swim")["results"]), 1)
+
+        delete_record(record)
+        self.assertEqual(self.search("swim")["results"], [])
+
+        payload = [
+            {
+                "record_type": "expense",
+                "category": "Groceries",
+                "account": self.account.pk,
+                "amount": "1.00",
+                "note": f"market run {i}",
+            }
+            for i in range(3)
+        ]
+        self.api.post(reverse("record-api-bulk"), payload, format="json")
+        page = self.search("market", page_size=2)
+        self.assertEqual(len(page["results"]), 2)
+        self.assertIsNotNone(page["next"])
+        self.assertEqual(len(self.search("market", page=2, page_size=2)["results"]), 1)
+
+
+class RecordCashFlowTest(PrivateTestCase):
+    def test_buckets_are_grouped_in_the_database_and_zero_filled(self):
+        self.make_record(
+            record_type="income", category="Salary", amount=Decimal("100.00")
+        )
+        self.make_record(date=date(2025, 1, 2))
+        self.make_record(date=date(2025, 1, 7), amount=Decimal("5.00"))
+        self.make_record(record_type="transfer", to_account=self.account)
+        self.make_record(date=date(2025, 3, 31), amount=Decimal("2.50"))
+        url = reverse("record-api-cashflow")
+
+        current_rates()
+        # The exchange rate version, then the grouped totals.
+        with self.assertNumQueries(2):
+            response = self.api.get(
+                url, {"start_date": "2025-01-01", "end_date": "2025-03-31"}
+            )
+        body = response.json()
+        self.assertEqual(body["bucket"], "month")
+        self.assertEqual(
+            body["series"],
+            [
+                {
+                    "start": "2025-01-01",
+                    "income": "100.00",
+                    "expense": "15.00",
+                    "net": "85.00",
+                },
+                {
+                    "start": "2025-02-01",
+                    "income": "0.00",
+                    "expense": "0.00",
+                    "net": "0.00",
+                },
+                {
+                    "start": "2025-03-01",
+                    "income": "0.00",
+                    "expense": "2.50",
+                    "net": "-2.50",
+                },
+            ],
+        )
+
+        # 2025-01-01 is a Wednesday; weeks start on the Monday before.
+        series = self.api.get(
+            url,
+            {"bucket": "week", "start_date": "2025-01-01", "end_date": "2025-01-14"},
+        ).json()["series"]
+        self.assertEqual(
+            [(week["start"], week["expense"]) for week in series],
+            [("2024-12-30", "10.00"), ("2025-01-06", "5.00"), ("2025-01-13", "0.00")],
+        )
+
+        series = self.api.get(url, {"bucket": "day", "end_date": "2025-01-02"}).json()[
+            "series"
+        ]
+        self.assertEqual(len(series), 90)
+        self.assertEqual((series[-2]["net"], series[-1]["net"]), ("100.00", "-10.00"))
+
+        response = self.api.get(url, {"bucket": "hour"})
+        self.assertEqual(response.status_code, 400)
+        response = self.api.get(url, {"bucket": "day", "start_date": "1900-01-01"})
+        self.assertEqual(response.status_code, 400)
+
+
+class RecordAnalyticsTest(PrivateTestCase):
+    def setUp(self):
+        super().setUp()
+        cached_frame.cache_clear()
+        for day, category, amount in [
+            (1, "Groceries", "10.00"),
+            (2, "Dining Out", "4.50"),
+            (2, "Groceries", "2.25"),
+            (5, "Travel", "30.00"),
+            (9, "Groceries", "1.00"),
+        ]:
+            self.make_record(
+                date=date(2025, 1, day), category=category, amount=Decimal(amount)
+            )
+        self.make_record(record_type="income", category="Salary", amount=Decimal(99))
+
+    def test_frame_columns_and_vectorized_aggregates(self):
+        frame = record_frame(self.user)
+        self.assertEqual(len(frame), 6)
+        self.assertEqual(frame.amounts.dtype, np.int64)
+        self.assertEqual(list(frame.amounts[:3]), [1000, 9900, 450])
+        self.assertEqual(frame.account_ids, [self.account.pk])
+
+        self.assertEqual(
+            category_totals(frame, date(2025, 1, 1), date(2025, 1, 5)),
+            [
+                ("Travel", Decimal("30.00")),
+                ("Groceries", Decimal("12.25")),
+                ("Dining Out", Decimal("4.50")),
+            ],
+        )
+        self.assertEqual(
+            category_totals(frame, record_type="income"), [("Salary", Decimal("99.00"))]
+        )
+        self.assertEqual(
+            amount_percentiles(frame, (0, 50, 100)),
+            {0: Decimal("1.00"), 50: Decimal("4.50"), 100: Decimal("30.00")},
+        )
+        self.assertEqual(
+            rolling_sums(frame, 3, date(2025, 1, 2), date(2025, 1, 5)),
+            [
+                (date(2025, 1, 2), Decimal("16.75")),
+                (date(2025, 1, 3), Decimal("16.75")),
+                (date(2025, 1, 4), Decimal("6.75")),
+                (date(2025, 1, 5), Decimal("30.00")),
+            ],
+        )
+
+    def test_frames_are_cached_per_data_version(self):
+        frame = record_frame(self.user)
+        # The data version and the exchange rate version.
+        with self.assertNumQueries(2):
+            self.assertIs(record_frame(self.user), frame)
+        create_record(
+            Record(
+                user=self.user,
+                record_type="expense",
+                category="Groceries",
+                account=self.account,
+                amount=Decimal("5.00"),
+                date=date(2025, 1, 3),
+            )
+        )
+        self.assertEqual(len(record_frame(self.user)), 7)
+
+        response = self.api.get(
+            reverse("record-api-analytics"),
+            {"start_date": "2025-01-01", "end_date": "2025-01-09", "window": "2"},
+        )
+        body = response.json()
+        self.assertEqual(
+            body["categories"][1], {"category": "Groceries", "total": "18.25"}
+        )
+        self.assertEqual(body["percentiles"]["p50"], "4.50")
+        self.assertEqual(len(body["rolling"]), 9)
+        response = self.api.get(reverse("record-api-analytics"), {"window": "0"})
+        self.assertEqual(response.status_code, 400)
+        response = self.api.get(
+            reverse("record-api-analytics"),
+            {"start_date": "1900-01-01", "end_date": "2025-01-01"},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("start_date", response.json())
+
+
+class RecordRollupTest(PrivateTestCase):
+    def add_record(self, **kwargs):
+        values = {
+            "user": self.user,
+            "record_type": "expense",
+            "category": "Groceries",
+            "account": self.account,
+            "amount": Decimal("10.00"),
+            "date": date(2025, 1, 1),
+        }
+        values.update(kwargs)
+        return create_record(Record(**values))
+
+    def rollups(self):
+        return set(
+            RecordMonthlyRollup.objects.values_list(
+                "account", "category", "record_type", "month", "total", "count"
+            )
+        )
+
+    def test_writes_keep_rollups_in_step_with_a_rebuild(self):
+        savings = Account.objects.create(
+            user=self.user,
+            name="Savings",
+            balance=Decimal("0.00"),
+            account_type="Saving account",
+            currency="NGN",
+        )
+        lunch = self.add_record(date=date(2025, 1, 5))
+        self.add_record(date=date(2025, 1, 20))
+        self.add_record(
+            record_type="transfer",
+            category="Savings",
+            account=None,
+            from_account=self.account,
+            to_account=savings,
+            amount=Decimal("30.00"),
+        )
+        self.assertIn(
+            (
+                self.account.pk,
+                "Groceries",
+                "expense",
+                date(2025, 1, 1),
+                Decimal("20.00"),
+                2,
+            ),
+            self.rollups(),
+        )
+
+        lunch.category = "Dining Out"
+        lunch.date = date(2025, 2, 1)
+        update_record(lunch)
+        delete_record(lunch)
+        self.api.post(
+            reverse("record-api-bulk"),
+            [
+                {
+                    "record_type": "income",
+                    "category": "Salary",
+                    "account": savings.pk,
+                    "amount": "250.00",
+                    "date": "2025-01-31",
+                }
+            ],
+            format="json",
+        )
+
+        maintained = self.rollups()
+        call_command("rebuild_record_rollups", stdout=io.StringIO())
+        self.assertEqual(maintained, self.rollups())
+        self.assertEqual(
+            maintained,
+            {
+                (
+                    self.account.pk,
+                    "Groceries",
+                    "expense",
+                    date(2025, 1, 1),
+                    Decimal("10.00"),
+                    1,
+                ),
+                (
+                    self.account.pk,
+                    "Savings",
+                    "transfer",
+                    date(2025, 1, 1),
+                    Decimal("30.00"),
+                    1,
+                ),
+                (
+                    savings.pk,
+                    "Salary",
+                    "income",
+                    date(2025, 1, 1),
+                    Decimal("250.00"),
+                    1,
+                ),
+            },
+        )
+
+
+class BudgetTestCase(PrivateTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.card = Account.objects.create(
+            user=self.user,
+            name="Card",
+            balance=Decimal("0.00"),
+            account_type="Credit card",
+            currency="NGN",
+        )
+        self.make_record(amount=Decimal("20.00"), date=date(2025, 1, 3))
+        self.make_record(category="Communication, PC", date=date(2025, 1, 4))
+        self.make_record(category="Dining Out", date=date(2025, 1, 5))
+        self.make_record(account=self.card, date=date(2025, 1, 6))
+        self.make_record(date=date(2025, 2, 1))
+        self.make_record(record_type="income", category="Salary")
+
+    def make_budget(self, categories=("Groceries", "Communication, PC"), **kwargs):
+        values = {
+            "user": self.user,
+            "name": "Essentials",
+            "period": "Month",
+            "start_date": date(2025, 1, 1),
+            "end_date": date(2025, 1, 31),
+            "amount": Decimal("60.00"),
+            "currency": "NGN",
+        }
+        values.update(kwargs)
+        budget = Budget.objects.create(**values)
+        budget.account.add(self.account)
+        set_budget_categories(budget, categories)
+        return budget
+
+
+class BudgetSpendTest(BudgetTestCase):
+    def test_spent_matches_accounts_categories_and_window(self):
+        budget = self.make_budget()
+        self.assertEqual(budget.spent, Decimal("30.00"))
+        self.assertEqual(budget.progress, Decimal("50"))
+
+        budget.account.add(self.card)
+        budget = Budget.objects.get(pk=budget.pk)
+        self.assertEqual(budget.spent, Decimal("40.00"))
+
+        empty = self.make_budget(name="Travel", categories=["Travel"])
+        self.assertEqual(empty.spent, Decimal("0.00"))
+
+    def test_budget_lists_use_a_constant_number_of_queries(self):
+        self.make_budget()
+        self.client.force_login(self.user)
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as api_queries:
+                response = self.api.get(reverse("budget-list-create"))
+            self.assertEqual(response.status_code, 200)
+            with CaptureQueriesContext(connection) as page_queries:
+                page = self.client.get(reverse("budget-list"))
+            self.assertEqual(page.status_code, 200)
+            return response.json(), len(api_queries), len(page_queries)
+
+        budgets, api_single, page_single = count_queries()
+        self.assertEqual(budgets[0]["spent"], "30.00")
+        self.assertEqual(budgets[0]["progress"], "50.00")
+
+        for i in range(9):
+            self.make_budget(name=f"Budget {i}")
+        budgets, api_many, page_many = count_queries()
+        self.assertEqual(len(budgets), 10)
+        self.assertEqual(api_many, api_single)
+        self.assertEqual(page_many, page_single)
+        # Budgets, their accounts and categories, then the spend not cached yet.
+        self.assertEqual(api_many, 4)
+
+    def test_spend_is_cached_until_an_expense_or_the_budget_changes(self):
+        budget = self.make_budget()
+
+        def spent():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.api.get(reverse("budget-list-create"))
+            return response.json()[0]["spent"], len(queries)
+
+        self.assertEqual(spent(), ("30.00", 4))
+        self.assertEqual(spent(), ("30.00", 3))
+
+        create_record(
+            Record(
+                user=self.user,
+                record_type="expense",
+                category="Groceries",
+                account=self.account,
+                amount=Decimal("5.00"),
+                date=date(2025, 1, 10),
+            )
+        )
+        self.assertEqual(spent(), ("35.00", 4))
+
+        budget.account.add(self.card)
+        self.assertEqual(spent(), ("45.00", 4))
+
+        response = self.api.patch(
+            reverse("budget-detail", args=[budget.pk]),
+            {"end_date": "2025-02-28"},
+            format="json",
+        )
+        # February is now the current window, holding just its own expense.
+        self.assertEqual(response.json()["spent"], "10.00")
+        self.assertEqual(spent(), ("10.00", 3))
+
+    def test_spend_covers_only_the_current_window(self):
+        monthly = self.make_budget(end_date=date(2025, 12, 31))
+        once = self.make_budget(
+            name="Once", period="One-Time", end_date=date(2025, 12, 31)
+        )
+        budgets = with_data_version(Budget.objects.order_by("pk"))
+
+        spent = {
+            budget.pk: budget.spent
+            for budget in load_spent(budgets, today=date(2025, 1, 20))
+        }
+        self.assertEqual(
+            spent, {monthly.pk: Decimal("30.00"), once.pk: Decimal("40.00")}
+        )
+        spent = {
+            budget.pk: (budget.spent, budget.progress)
+            for budget in load_spent(budgets, today=date(2025, 2, 20))
+        }
+        self.assertEqual(
+            spent[monthly.pk], (Decimal("10.00"), Decimal("10.00") / 60 * 100)
+        )
+        self.assertEqual(spent[once.pk][0], Decimal("40.00"))
+
+    def test_etags_change_when_a_new_window_starts(self):
+        budget = self.make_budget(end_date=date(2025, 12, 31))
+        urls = [
+            reverse("budget-list-create"),
+            reverse("budget-detail", args=[budget.pk]),
+        ]
+        for url in urls:
+            with mock.patch.object(
+                timezone, "localdate", return_value=date(2025, 1, 20)
+            ):
+                etag = self.api.get(url)["ETag"]
+                response = self.api.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+            with mock.patch.object(
+                timezone, "localdate", return_value=date(2025, 2, 2)
+            ):
+                response = self.api.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.json()["spent"], "10.00")
+
+    def test_categories_are_matched_in_the_database(self):
+        budget = self.make_budget()
+        self.make_budget(name="Fun", categories=["Dining Out"])
+        self.make_budget(name="Later", start_date=date(2025, 2, 1))
+        record = Record(
+            user=self.user,
+            record_type="expense",
+            category="Communication, PC",
+            account=self.account,
+            amount=Decimal("1.00"),
+            date=date(2025, 1, 9),
+        )
+        self.assertEqual(list(budgets_for_record(record)), [budget])
+
+        response = self.api.patch(
+            reverse("budget-detail", args=[budget.pk]),
+            {"categories": ["Dining Out", "Groceries"]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sorted(response.json()["categories"]), ["Dining Out", "Groceries"]
+        )
+        self.assertEqual(response.json()["spent"], "30.00")
+        self.assertEqual(list(budgets_for_record(record)), [])
+
+        response = self.api.patch(
+            reverse("budget-detail", args=[budget.pk]),
+            {"categories": ["Rent"]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_budget_form_saves_categories(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse("budget-add"),
+            {
+                "name": "Bills",
+                "categories": ["Utilities", "Communication, PC"],
+                "period": "Month",
+                "start_date": "2025-01-01",
+                "end_date": "2025-01-31",
+                "amount": "100.00",
+                "account": [self.account.pk],
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        budget = Budget.objects.get(name="Bills")
+        self.assertEqual(sorted(budget.categories), ["Communication, PC", "Utilities"])
+        self.assertEqual(budget.spent, Decimal("10.00"))
+
+    def test_history_buckets_every_period_window_in_one_query(self):
+        budget = self.make_budget(
+            start_date=date(2020, 1, 15), end_date=date(2024, 12, 31)
+        )
+        self.make_record(date=date(2020, 2, 14))
+        self.make_record(date=date(2020, 2, 15), amount=Decimal("7.00"))
+        self.make_record(date=date(2024, 12, 31), amount=Decimal("3.00"))
+        url = reverse("budget-history", args=[budget.pk])
+
+        with self.assertNumQueries(2):
+            response = self.api.get(url, {"until": "2030-01-01"})
+        periods = response.json()["periods"]
+        self.assertEqual(len(periods), 60)
+        self.assertEqual(
+            periods[0],
+            {
+                "start": "2020-01-15",
+                "end": "2020-02-14",
+                "spent": "10.00",
+                "remaining": "50.00",
+                "progress": "16.67",
+            },
+        )
+        self.assertEqual(periods[1]["spent"], "7.00")
+        self.assertEqual(periods[2]["spent"], "0.00")
+        self.assertEqual(
+            (periods[-1]["start"], periods[-1]["end"], periods[-1]["spent"]),
+            ("2024-12-15", "2024-12-31", "3.00"),
+        )
+
+        periods = self.api.get(url, {"until": "2020-03-01"}).json()["periods"]
+        self.assertEqual([p["start"] for p in periods], ["2020-01-15", "2020-02-15"])
+
+    def test_weekly_and_one_time_windows(self):
+        weekly = self.make_budget(period="Week")
+        self.assertEqual(
+            budget_windows(weekly)[-2:],
+            [
+                (date(2025, 1, 22), date(2025, 1, 28)),
+                (date(2025, 1, 29), date(2025, 1, 31)),
+            ],
+        )
+        self.assertEqual(
+            [p["spent"] for p in budget_history(weekly, date(2025, 1, 31))],
+            [
+                Decimal("30.00"),
+                Decimal("0.00"),
+                Decimal("0.00"),
+                Decimal("0.00"),
+                Decimal("0.00"),
+            ],
+        )
+        one_time = self.make_budget(period="One-Time")
+        self.assertEqual(
+            budget_windows(one_time), [(date(2025, 1, 1), date(2025, 1, 31))]
+        )
+
+
+class BudgetAlertTest(BudgetTestCase):
+    def expense(self, amount, **kwargs):
+        values = {
+            "user": self.user,
+            "record_type": "expense",
+            "category": "Groceries",
+            "account": self.account,
+            "amount": Decimal(amount),
+            "date": date(2025, 1, 10),
+        }
+        values.update(kwargs)
+        return create_record(Record(**values))
+
+    def thresholds(self):
+        return list(
+            Notification.objects.filter(user=self.user)
+            .order_by("pk")
+            .values_list("threshold", flat=True)
+        )
+
+    def test_thresholds_are_notified_once_per_crossing(self):
+        budget = self.make_budget()
+        # The 30.00 already spent is half of the 60.00 budget.
+        self.assertEqual(self.thresholds(), [50])
+
+        self.expense("19.00")
+        self.expense("1.00", date=date(2025, 2, 10))
+        self.expense("1.00", category="Dining Out")
+        self.assertEqual(self.thresholds(), [50, 80])
+        record = self.expense("15.00")
+        self.assertEqual(self.thresholds(), [50, 80, 100])
+        budget.refresh_from_db()
+        self.assertEqual(budget.running_spent, Decimal("64.00"))
+        self.assertEqual(budget.running_spent, budget.spent)
+
+        delete_record(record)
+        budget.refresh_from_db()
+        self.assertEqual(
+            (budget.running_spent, budget.alert_level), (Decimal("49.00"), 80)
+        )
+        self.expense("20.00")
+        self.assertEqual(self.thresholds(), [50, 80, 100, 100])
+
+        response = self.api.get(reverse("notification-list"), {"unread": "true"})
+        notification = response.json()[0]
+        self.assertEqual(
+            notification["message"], 'You have used all of your "Essentials" budget.'
+        )
+        self.api.patch(
+            reverse("notification-detail", args=[notification["id"]]),
+            {"is_read": True},
+            format="json",
+        )
+        response = self.api.get(reverse("notification-list"), {"unread": "true"})
+        self.assertEqual(len(response.json()), 3)
+
+    def test_totals_and_thresholds_start_over_in_each_window(self):
+        with mock.patch.object(timezone, "localdate", return_value=date(2025, 1, 15)):
+            budget = self.make_budget(end_date=date(2025, 12, 31))
+        self.assertEqual(self.thresholds(), [50])
+
+        with mock.patch.object(timezone, "localdate", return_value=date(2025, 2, 10)):
+            # February already holds 10.00; 35.00 of 60.00 crosses 50% again.
+            self.expense("25.00", date=date(2025, 2, 10))
+            budget.refresh_from_db()
+            self.assertEqual(
+                (budget.running_spent, budget.running_window_start),
+                (Decimal("35.00"), date(2025, 2, 1)),
+            )
+            # A late January expense is not part of February's window.
+            self.expense("50.00", date=date(2025, 1, 20))
+            self.expense("15.00", date=date(2025, 2, 11))
+        budget.refresh_from_db()
+        self.assertEqual(
+            (budget.running_spent, budget.alert_level), (Decimal("50.00"), 80)
+        )
+        self.assertEqual(self.thresholds(), [50, 50, 80])
+
+    def test_an_expense_costs_one_budget_lookup(self):
+        self.make_budget()
+        self.make_budget(name="Fun", categories=["Dining Out"])
+        with CaptureQueriesContext(connection) as queries:
+            self.expense("5.00")
+        budget_queries = [q["sql"] for q in queries if '"private_budget"' in q["sql"]]
+        self.assertEqual(len(budget_queries), 2)
+        self.assertTrue(budget_queries[0].startswith("SELECT"))
+        self.assertTrue(budget_queries[1].startswith("UPDATE"))
+
+
+class BudgetForecastTest(BudgetTestCase):
+    def forecast(self, budget, today):
+        budget = Budget.objects.prefetch_related("account", "budget_categories").get(
+            pk=budget.pk
+        )
+        return forecast_budgets([budget], today)[0]
+
+    def test_models_project_the_current_window(self):
+        budget = self.make_budget(end_date=date(2025, 12, 31))
+        forecast = self.forecast(budget, date(2025, 1, 10))
+        self.assertEqual(
+            (forecast["start"], forecast["end"]), (date(2025, 1, 1), date(2025, 1, 31))
+        )
+        self.assertEqual(forecast["spent"], 30)
+        # 30.00 over the last 28 days, carried over the 21 days left.
+        self.assertAlmostEqual(forecast["moving_average"], 52.5)
+        self.assertAlmostEqual(forecast["run_rate"], 93)
+        self.assertIsNone(forecast["same_period_last_year"])
+        self.assertAlmostEqual(forecast["forecast"], 72.75)
+        self.assertTrue(forecast["low"] >= 30 and forecast["high"] > 72.75)
+        self.assertTrue(forecast["will_exceed"])
+
+        self.make_record(date=date(2024, 1, 5), amount=Decimal("50.00"))
+        self.make_record(date=date(2024, 1, 20), amount=Decimal("12.00"))
+        forecast = self.forecast(budget, date(2025, 1, 10))
+        self.assertAlmostEqual(forecast["same_period_last_year"], 42)
+        self.assertAlmostEqual(forecast["forecast"], 62.5)
+
+        forecast = self.forecast(budget, date(2025, 2, 1))
+        self.assertEqual(forecast["start"], date(2025, 2, 1))
+        self.assertEqual(forecast["spent"], 10)
+
+    def test_all_budgets_are_forecast_in_one_records_query(self):
+        for i in range(10):
+            self.make_budget(name=f"Budget {i}")
+        url = reverse("budget-forecast-list")
+
+        # Budgets, their accounts and categories, then the daily expenses.
+        with self.assertNumQueries(4):
+            response = self.api.get(url)
+        self.assertEqual(len(response.json()), 10)
+        with self.assertNumQueries(3):
+            cached = self.api.get(url)
+        self.assertEqual(cached.json(), response.json())
+
+        create_record(
+            Record(
+                user=self.user,
+                record_type="expense",
+                category="Groceries",
+                account=self.account,
+                amount=Decimal("5.00"),
+                date=date(2025, 1, 10),
+            )
+        )
+        with self.assertNumQueries(4):
+            self.api.get(url)
+
+        budget = Budget.objects.first()
+        response = self.api.get(reverse("budget-forecast", args=[budget.pk]))
+        self.assertEqual([f["budget"] for f in response.json()], [budget.pk])
+
+    def test_budgets_do_not_affect_each_others_forecasts(self):
+        monthly = self.make_budget(end_date=date(2025, 12, 31))
+        # Before last year's January, so not part of the monthly budget's
+        # same-period model.
+        self.make_record(date=date(2023, 12, 5), amount=Decimal("50.00"))
+        alone = self.forecast(monthly, date(2025, 1, 10))
+        self.assertIsNone(alone["same_period_last_year"])
+
+        # Its last-year window starts in July 2023.
+        self.make_budget(
+            name="Yearly",
+            categories=["Dining Out"],
+            period="Year",
+            start_date=date(2023, 7, 1),
+            end_date=date(2026, 6, 30),
+        )
+        budgets = Budget.objects.prefetch_related(
+            "account", "budget_categories"
+        ).order_by("pk")
+        together = forecast_budgets(budgets, date(2025, 1, 10))
+        self.assertEqual(together[0], alone)
+
+    def test_budgets_ending_before_they_start_are_rejected(self):
+        url = reverse("budget-list-create")
+        response = self.api.post(
+            url,
+            {
+                "name": "Backwards",
+                "categories": ["Groceries"],
+                "period": "Month",
+                "start_date": "2025-02-01",
+                "end_date": "2025-01-01",
+                "amount": "10.00",
+                "currency": "NGN",
+                "account": [self.account.pk],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("end_date", response.json())
+
+        budget = self.make_budget()
+        response = self.api.patch(
+            reverse("budget-detail", args=[budget.pk]),
+            {"start_date": "2025-03-01"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+        # Rows saved before the check get no forecast instead of an error.
+        Budget.objects.filter(pk=budget.pk).update(start_date=date(2025, 3, 1))
+        response = self.api.get(reverse("budget-forecast", args=[budget.pk]))
+        self.assertEqual((response.status_code, response.json()), (200, []))
+
+
+class DashboardTest(BudgetTestCase):
+    def write(self, amount, **kwargs):
+        values = {
+            "user": self.user,
+            "record_type": "expense",
+            "category": "Groceries",
+            "account": self.account,
+            "amount": Decimal(amount),
+            "date": self.today,
+        }
+        values.update(kwargs)
+        return create_record(Record(**values))
+
+    def setUp(self):
+        super().setUp()
+        self.today = timezone.localdate()
+        self.account.balance = Decimal("100.00")
+        self.account.save()
+        self.dollars = Account.objects.create(
+            user=self.user,
+            name="Dollars",
+            balance=Decimal("5.00"),
+            account_type="Cash",
+            currency="USD",
+        )
+        self.write("200.00", record_type="income", category="Salary")
+        self.write("30.00")
+        self.write("20.00", category="Dining Out")
+        self.write("15.00", category="Groceries")
+        self.make_budget(start_date=self.today, end_date=self.today)
+        Goal.objects.create(
+            user=self.user,
+            goal_name="holiday_trip",
+            target_amount=Decimal("400.00"),
+            saved_amount=Decimal("100.00"),
+            target_date=date(2030, 1, 1),
+        )
+
+    def test_summary_in_a_fixed_number_of_queries(self):
+        url = reverse("dashboard-api")
+        current_rates()
+        # The data version and the exchange rate version, then balances, this
+        # month, budgets and goals.
+        with self.assertNumQueries(6):
+            summary = self.api.get(url).json()
+        self.assertEqual(summary["balances"], {"NGN": "235.00", "USD": "5.00"})
+        # No USD rate yet, so the dollars are left out of the total.
+        self.assertEqual(
+            (summary["currency"], summary["net_worth"], summary["missing_rates"]),
+            ("NGN", "235.00", ["USD"]),
+        )
+        self.assertEqual(
+            (summary["income"], summary["expense"], summary["net"]),
+            ("200.00", "65.00", "135.00"),
+        )
+        self.assertEqual(
+            summary["top_categories"],
+            [
+                {"category": "Groceries", "total": "45.00"},
+                {"category": "Dining Out", "total": "20.00"},
+            ],
+        )
+        self.assertEqual(
+            [(b["spent"], b["progress"]) for b in summary["budgets"]],
+            [("45.00", "75.00")],
+        )
+        self.assertEqual(summary["goals"][0]["progress"], "25.00")
+
+        with self.assertNumQueries(2):
+            self.assertEqual(self.api.get(url).json(), summary)
+
+        self.write("5.00", record_type="income", category="Salary")
+        self.assertEqual(self.api.get(url).json()["income"], "205.00")
+        Goal.objects.update(saved_amount=Decimal("200.00"))
+        Goal.objects.get().save()
+        self.assertEqual(self.api.get(url).json()["goals"][0]["progress"], "50.00")
+
+    def test_budget_progress_covers_the_current_window(self):
+        with mock.patch.object(timezone, "localdate", return_value=date(2025, 1, 15)):
+            budget = self.make_budget(name="Monthly", end_date=date(2025, 12, 31))
+        budget.refresh_from_db()
+        self.assertEqual(budget.running_spent, Decimal("30.00"))
+
+        # No write since February began: its spend is computed instead.
+        summary = dashboard_summary(
+            self.user, date(2025, 2, 10), "NGN", current_rates()
+        )
+        self.assertEqual(
+            [(row["name"], row["spent"]) for row in summary["budgets"]],
+            [("Monthly", Decimal("10.00"))],
+        )
+
+    def test_totals_are_converted_to_the_base_currency(self):
+        ExchangeRate.objects.create(
+            base="USD", quote="NGN", date=date(2000, 1, 1), rate=Decimal("1500")
+        )
+        self.write("2.00", account=self.dollars, category="Travel")
+        url = reverse("dashboard-api")
+        summary = self.api.get(url).json()
+        self.assertEqual(
+            (summary["net_worth"], summary["missing_rates"]), ("4735.00", [])
+        )
+        self.assertEqual(summary["expense"], "3065.00")
+        self.assertEqual(summary["top_categories"][0]["category"], "Travel")
+
+        self.user.base_currency = "USD"
+        self.user.save()
+        summary = self.api.get(url).json()
+        self.assertEqual((summary["currency"], summary["net_worth"]), ("USD", "3.16"))
+
+
+class ExchangeRateTest(PrivateTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        ExchangeRate.objects.bulk_create(
+            [
+                ExchangeRate(base="USD", quote="NGN", date=day, rate=Decimal(rate))
+                for day, rate in [
+                    (date(2025, 1, 1), "1500"),
+                    (date(2025, 2, 1), "1600"),
+                    (date(2025, 3, 1), "1550"),
+                ]
+            ]
+            + [
+                ExchangeRate(
+                    base="EUR", quote="USD", date=date(2025, 1, 1), rate=Decimal("1.1")
+                )
+            ]
+        )
+
+    def test_lookups_are_answered_from_memory(self):
+        current_rates()
+        # Only the version check; the table is already loaded.
+        with self.assertNumQueries(1):
+            rates = current_rates()
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                rates.rate("USD", "NGN", date(2025, 2, 14)), Decimal("1600")
+            )
+            self.assertEqual(
+                rates.rate("USD", "NGN", date(2030, 1, 1)), Decimal("1550")
+            )
+            self.assertEqual(
+                rates.convert(Decimal("3200"), "NGN", "USD", date(2025, 2, 1)), 2
+            )
+            # EUR -> USD -> NGN.
+            self.assertEqual(
+                rates.convert(Decimal("10"), "EUR", "NGN", date(2025, 1, 31)),
+                Decimal("16500.00"),
+            )
+            self.assertEqual(rates.rate("GBP", "GBP", date(2025, 1, 1)), 1)
+            with self.assertRaises(MissingRate):
+                rates.rate("USD", "NGN", date(2024, 12, 31))
+            with self.assertRaises(MissingRate):
+                rates.rate("GBP", "NGN", date(2025, 1, 1))
+
+        ExchangeRate.objects.create(
+            base="USD", quote="NGN", date=date(2025, 4, 1), rate=Decimal("1700")
+        )
+        self.assertEqual(
+            current_rates().rate("USD", "NGN", date(2025, 4, 2)), Decimal("1700")
+        )
+
+    def test_changes_made_elsewhere_are_picked_up(self):
+        rates = current_rates()
+        # No signal fires for a queryset update, as in another process.
+        ExchangeRate.objects.filter(date=date(2025, 3, 1)).update(
+            rate=1, updated_at=timezone.now()
+        )
+        self.assertEqual(current_rates().rate("USD", "NGN", date(2025, 3, 2)), 1)
+        self.assertNotEqual(current_rates(), rates)
+        ExchangeRate.objects.filter(date=date(2025, 3, 1)).delete()
+        self.assertEqual(
+            current_rates().rate("USD", "NGN", date(2025, 3, 2)), Decimal("1600")
+        )
+
+    def test_cross_rates_go_through_currencies_in_order(self):
+        ExchangeRate.objects.bulk_create(
+            [
+                ExchangeRate(
+                    base="EUR", quote="GBP", date=date(2025, 1, 1), rate=Decimal("0.9")
+                ),
+                ExchangeRate(
+                    base="GBP", quote="NGN", date=date(2025, 1, 1), rate=Decimal("1900")
+                ),
+            ]
+        )
+        # Both GBP and USD link EUR to NGN; GBP sorts first.
+        self.assertEqual(
+            current_rates().rate("EUR", "NGN", date(2025, 1, 2)), Decimal("1710.0")
+        )
+
+    def test_load_command_upserts_rates(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as handle:
+            handle.write("date,base,quote,rate\n")
+            handle.write("2025-02-01,USD,NGN,1650\n")
+            handle.write("2025-02-01,gbp,ngn,2000.5\n")
+        self.addCleanup(os.remove, handle.name)
+        self.assertEqual(
+            current_rates().rate("USD", "NGN", date(2025, 2, 1)), Decimal("1600")
+        )
+
+        call_command("load_exchange_rates", handle.name, stdout=io.StringIO())
+        self.assertEqual(ExchangeRate.objects.count(), 5)
+        rates = current_rates()
+        self.assertEqual(rates.rate("USD", "NGN", date(2025, 2, 1)), Decimal("1650"))
+        self.assertEqual(rates.rate("GBP", "NGN", date(2025, 2, 2)), Decimal("2000.5"))
+
+
+class ConcurrentBalanceUpdateTest(TransactionTestCase):
+    writers = 8
+    records_per_writer = 25
+
+    def test_concurrent_writers_lose_no_updates(self):
+        user = CustomUser.objects.create_user(
+            username="ada", email="ada@example.com", password="pass12345"
+        )
+        account = Account.objects.create(
+            user=user,
+            name="Wallet",
+            balance=Decimal("0.00"),
+            account_type="Cash",
+            currency="NGN",
+        )
+        failures = []
+
+        # Every writer shares one ``Account`` instance loaded up front, like
+        # records bound to forms in concurrent requests. Any read-modify-write
+        # of that stale balance would drop updates.
+        def write(record):
+            # SQLite rejects a second concurrent writer outright instead of
+            # queueing it; retry the whole transaction like a client would.
+            while True:
+                try:
+                    return create_record(record)
+                except OperationalError as exc:
+                    if "locked" not in str(exc):
+                        raise
+                    record.pk = None
+                    clock.sleep(0.001)
+
+        def writer():
+            try:
+                for _ in range(self.records_per_writer):
+                    write(
+                        Record(
+                            user=user,
+                            record_type="income",
+                            category="Salary",
+                            account=account,
+                            amount=Decimal("1.00"),
+                        )
+                    )
+            except Exception as exc:
+                failures.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=writer) for _ in range(self.writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(failures, [])
+        expected = self.writers * self.records_per_writer
+        self.assertEqual(Record.objects.count(), expected)
+        account.refresh_from_db()
+        self.assertEqual(account.balance, Decimal(expected))
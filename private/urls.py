@@ -20,11 +20,26 @@ from .views import (
     ProfileView,
     AccountListCreateAPI,
     AccountDetailAPI,
+    AccountBalanceAPI,
+    AccountBalanceSeriesAPI,
     RecordListCreateAPI,
+    RecordBulkCreateAPI,
+    RecordImportAPI,
+    RecordExportAPI,
+    RecordSearchAPI,
     RecordDetailAPI,
     BudgetListCreateAPI,
     BudgetRetrieveUpdateDestroyAPI,
+    BudgetHistoryAPI,
+    BudgetForecastAPI,
+    BatchAPI,
+    DashboardAPI,
+    RecordCashFlowAPI,
+    RecordAnalyticsAPI,
+    NotificationListAPI,
+    NotificationDetailAPI,
 )
+from . import views_async
 
 urlpatterns = [
     path("home/", home_view, name="dashboard"),
@@ -42,6 +57,16 @@ urlpatterns = [
     path(
         "api/accounts/<int:pk>/", AccountDetailAPI.as_view(), name="account-api-detail"
     ),
+    path(
+        "api/accounts/<int:pk>/balance/",
+        AccountBalanceAPI.as_view(),
+        name="account-api-balance",
+    ),
+    path(
+        "api/accounts/<int:pk>/balance-series/",
+        AccountBalanceSeriesAPI.as_view(),
+        name="account-api-balance-series",
+    ),
     path("records/", RecordView.as_view(), name="records"),
     path("records/add/", RecordAddView.as_view(), name="record-add"),
     path(
@@ -94,11 +119,60 @@ urlpatterns = [
     ),
     path("profile/", ProfileView.as_view(), name="profile"),
     path("api/records/", RecordListCreateAPI.as_view(), name="record-api-list-create"),
+    path("api/records/bulk/", RecordBulkCreateAPI.as_view(), name="record-api-bulk"),
+    path("api/records/import/", RecordImportAPI.as_view(), name="record-api-import"),
+    path("api/records/export/", RecordExportAPI.as_view(), name="record-api-export"),
+    path("api/records/search/", RecordSearchAPI.as_view(), name="record-api-search"),
+    path(
+        "api/records/cashflow/",
+        RecordCashFlowAPI.as_view(),
+        name="record-api-cashflow",
+    ),
+    path(
+        "api/records/analytics/",
+        RecordAnalyticsAPI.as_view(),
+        name="record-api-analytics",
+    ),
     path("api/records/<int:pk>/", RecordDetailAPI.as_view(), name="record-api-detail"),
+    path("api/dashboard/", DashboardAPI.as_view(), name="dashboard-api"),
+    path("api/batch/", BatchAPI.as_view(), name="batch-api"),
     path("api/budgets/", BudgetListCreateAPI.as_view(), name="budget-list-create"),
+    path(
+        "api/budgets/forecast/",
+        BudgetForecastAPI.as_view(),
+        name="budget-forecast-list",
+    ),
     path(
         "api/budgets/<int:pk>/",
         BudgetRetrieveUpdateDestroyAPI.as_view(),
         name="budget-detail",
     ),
+    path(
+        "api/budgets/<int:pk>/history/",
+        BudgetHistoryAPI.as_view(),
+        name="budget-history",
+    ),
+    path(
+        "api/budgets/<int:pk>/forecast/",
+        BudgetForecastAPI.as_view(),
+        name="budget-forecast",
+    ),
+    path(
+        "api/notifications/",
+        NotificationListAPI.as_view(),
+        name="notification-list",
+    ),
+    path(
+        "api/notifications/<int:pk>/",
+        NotificationDetailAPI.as_view(),
+        name="notification-detail",
+    ),
+    path(
+        "api/async/accounts/",
+        views_async.account_list,
+        name="async-account-list",
+    ),
+    path("api/async/records/", views_async.record_list, name="async-record-list"),
+    path("api/async/budgets/", views_async.budget_list, name="async-budget-list"),
+    path("api/async/dashboard/", views_async.dashboard, name="async-dashboard"),
 ]
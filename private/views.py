@@ -14,13 +14,73 @@ from django.contrib.auth.mixins import (
     LoginRequiredMixin,
 )
 from django.contrib.auth.decorators import login_required
-from .models import Account, Record, Budget, Goal
+from .models import Account, Record, Budget, Goal, Notification
 from django import forms
 from django.shortcuts import redirect
 from public.models import CustomUser
 from rest_framework import generics, permissions
-from .serializers import AccountSerializer, RecordSerializer, BudgetSerializer
-from rest_framework import generics, permissions
+from .serializers import (
+    AccountSerializer,
+    BalancePointSerializer,
+    BatchSerializer,
+    BudgetForecastSerializer,
+    BudgetPeriodSerializer,
+    BudgetSerializer,
+    CashFlowSerializer,
+    DashboardSerializer,
+    NotificationSerializer,
+    RecordAnalyticsSerializer,
+    RecordSerializer,
+)
+from .pagination import RecordCursorPagination, paginate_records
+from .services import (
+    bulk_create_records,
+    stream_create_records,
+    create_record,
+    update_record,
+    delete_record,
+)
+from .analytics import (
+    RECORD_TYPE_CODES,
+    amount_percentiles,
+    category_totals,
+    record_frame,
+    rolling_sums,
+)
+from .batch import run_batch
+from .balances import balance_as_of, balance_series, shift_checkpoints
+from .budgets import budget_history, load_spent, with_data_version
+from .cashflow import (
+    BUCKETS,
+    MAX_BUCKETS,
+    bucket_starts,
+    cash_flow,
+    default_start,
+)
+from .conditional import DataVersionETagMixin
+from .dashboard import cached_dashboard
+from .exporters import EXPORT_FIELDS, CSVRenderer, NDJSONRenderer
+from .fieldsets import parse_fields, record_values, serialize_record_rows
+from .filters import RecordFilterBackend
+from .forecast import cached_forecasts
+from .search import search_records
+from .importers import (
+    PARSERS,
+    ImportFormatError,
+    decode_lines,
+    guess_format,
+    parse_rows,
+    rows_to_records,
+)
+from django.http import Http404, StreamingHttpResponse
+from django.db import transaction
+from django.utils import timezone
+from datetime import date, timedelta
+from urllib.parse import urlencode
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser, FormParser
 
 
 @login_required
@@ -30,6 +90,43 @@ def home_view(request):
     return render(request, "private/home.html", context)
 
 
+class DashboardAPI(generics.GenericAPIView):
+    """
+    Net worth per currency, this month's income, expense and top categories,
+    and the progress of active budgets and goals, in one response.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        summary = cached_dashboard(request.user, timezone.localdate())
+        return Response(DashboardSerializer(summary).data)
+
+
+class BatchAPI(generics.GenericAPIView):
+    serializer_class = BatchSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results, committed = run_batch(
+            request,
+            serializer.validated_data["requests"],
+            serializer.validated_data["atomic"],
+        )
+        if not committed:
+            return Response(
+                {
+                    "detail": f"Request {len(results) - 1} failed; "
+                    "no changes were saved.",
+                    "results": results,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response({"results": results})
+
+
 class AccountView(LoginRequiredMixin, CreateView):
     form_class = AccountForm
     template_name = "private/Account.html"
@@ -84,7 +181,7 @@ class AccountDeleteView(LoginRequiredMixin, DeleteView):
         return Account.objects.filter(user=self.request.user)
 
 
-class AccountListCreateAPI(generics.ListCreateAPIView):
+class AccountListCreateAPI(DataVersionETagMixin, generics.ListCreateAPIView):
     serializer_class = AccountSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -95,41 +192,427 @@ class AccountListCreateAPI(generics.ListCreateAPIView):
         serializer.save(user=self.request.user)
 
 
-class AccountDetailAPI(generics.RetrieveUpdateDestroyAPIView):
+class AccountDetailAPI(DataVersionETagMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = AccountSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         return Account.objects.filter(user=self.request.user)
 
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            old_balance = (
+                Account.objects.select_for_update()
+                .values_list("balance", flat=True)
+                .get(pk=serializer.instance.pk)
+            )
+            account = serializer.save()
+            shift_checkpoints(account.pk, account.balance - old_balance)
+
+
+class AccountBalanceAPI(generics.GenericAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return Account.objects.filter(user=self.request.user)
+
+    def get(self, request, *args, **kwargs):
+        account = self.get_object()
+        try:
+            day = date.fromisoformat(request.query_params["date"])
+        except KeyError:
+            day = timezone.localdate()
+        except ValueError:
+            return Response(
+                {"date": "Use the YYYY-MM-DD format."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(
+            {
+                "account": account.pk,
+                "date": day,
+                "balance": balance_as_of(account.pk, day),
+                "currency": account.currency,
+            }
+        )
+
+
+class AccountBalanceSeriesAPI(generics.GenericAPIView):
+    """
+    End-of-day balances of an account for every day from ``?start_date`` to
+    ``?end_date`` (default the last 90 days), read from the daily series.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    default_days = 90
+    max_days = 3700
+
+    def get_queryset(self):
+        return Account.objects.filter(user=self.request.user)
+
+    def get(self, request, *args, **kwargs):
+        account = self.get_object()
+        params = request.query_params
+        try:
+            end = (
+                date.fromisoformat(params["end_date"])
+                if params.get("end_date")
+                else timezone.localdate()
+            )
+            start = (
+                date.fromisoformat(params["start_date"])
+                if params.get("start_date")
+                else end - timedelta(days=self.default_days - 1)
+            )
+        except ValueError:
+            raise ValidationError(
+                {"date": "Use YYYY-MM-DD for start_date and end_date."}
+            )
+        if start > end:
+            raise ValidationError({"start_date": "Must not be after end_date."})
+        if (end - start).days >= self.max_days:
+            raise ValidationError({"start_date": f"At most {self.max_days} days."})
+
+        series = [
+            {"date": day, "balance": balance}
+            for day, balance in balance_series(account.pk, start, end)
+        ]
+        return Response(
+            {
+                "account": account.pk,
+                "currency": account.currency,
+                "series": BalancePointSerializer(series, many=True).data,
+            }
+        )
+
 
 class RecordView(LoginRequiredMixin, ListView):
     model = Record
     template_name = "private/record_list.html"
     context_object_name = "records"
+    page_size = 50
 
     def get_queryset(self):
-        return Record.objects.filter(user=self.request.user).order_by("-date")
+        queryset = Record.objects.filter(user=self.request.user).select_related(
+            "account"
+        )
+        try:
+            page, self.next_cursor = paginate_records(
+                queryset, self.request.GET.get("cursor"), self.page_size
+            )
+        except ValueError:
+            raise Http404("Invalid cursor")
+        return page
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["next_cursor"] = self.next_cursor
+        return context
 
 
-class RecordListCreateAPI(generics.ListCreateAPIView):
+class RecordListCreateAPI(DataVersionETagMixin, generics.ListCreateAPIView):
     serializer_class = RecordSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = RecordCursorPagination
+    filter_backends = [RecordFilterBackend]
 
     def get_queryset(self):
-        return Record.objects.filter(user=self.request.user).order_by("-date")
+        return Record.objects.filter(user=self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        # ``?fields=`` picks columns; rows are serialized from ``.values()``.
+        fields = parse_fields(request.query_params)
+        queryset = record_values(self.filter_queryset(self.get_queryset()), fields)
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(serialize_record_rows(page, fields))
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
 
-class RecordDetailAPI(generics.RetrieveUpdateDestroyAPIView):
+class RecordBulkCreateAPI(generics.GenericAPIView):
+    serializer_class = RecordSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    max_records = 5000
+
+    def post(self, request, *args, **kwargs):
+        if isinstance(request.data, list) and len(request.data) > self.max_records:
+            return Response(
+                {"detail": f"At most {self.max_records} records per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = self.get_serializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            errors = serializer.errors
+            # Row errors come back as a list, or as a dict keyed by row index
+            # on newer DRF releases. Anything else is a payload-level error.
+            if isinstance(errors, list):
+                errors = dict(enumerate(errors))
+            elif not all(isinstance(key, int) for key in errors):
+                return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+            errors = [
+                {"index": index, "errors": row_errors}
+                for index, row_errors in sorted(errors.items())
+                if row_errors
+            ]
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        records = [
+            Record(user=request.user, **data) for data in serializer.validated_data
+        ]
+        created = bulk_create_records(records)
+        return Response(
+            {"created": len(created), "ids": [record.pk for record in created]},
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class RecordImportAPI(generics.GenericAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+    chunk_size = 1000
+
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response(
+                {"file": "This field is required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            account = Account.objects.get(
+                pk=request.data.get("account"), user=request.user
+            )
+        except (Account.DoesNotExist, ValueError):
+            return Response(
+                {"account": "Unknown account."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        file_format = request.data.get("file_format") or guess_format(upload.name)
+        if file_format not in PARSERS:
+            return Response(
+                {"file_format": f"Use one of: {', '.join(sorted(PARSERS))}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Iterating the upload yields lines straight from memory or the
+        # temporary file Django spooled it to.
+        rows = parse_rows(
+            decode_lines(upload), file_format, request.data.get("date_format")
+        )
+        try:
+            count = stream_create_records(
+                rows_to_records(rows, account), self.chunk_size
+            )
+        except ImportFormatError as exc:
+            return Response(
+                {"detail": f"Nothing imported. {exc}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response({"imported": count}, status=status.HTTP_201_CREATED)
+
+
+class RecordExportAPI(generics.GenericAPIView):
+    """
+    Streams the user's records as CSV (default) or NDJSON (``?format=ndjson``),
+    narrowed by the same filters as the record list.
+
+    Rows are read as plain tuples in chunks, so memory use does not depend on
+    how many records are exported.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [CSVRenderer, NDJSONRenderer]
+    filter_backends = [RecordFilterBackend]
+    chunk_size = 2000
+
+    def get_queryset(self):
+        return Record.objects.filter(user=self.request.user).order_by(
+            "date", "time", "id"
+        )
+
+    def get(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        rows = (
+            self.filter_queryset(self.get_queryset())
+            .values_list(*EXPORT_FIELDS)
+            .iterator(chunk_size=self.chunk_size)
+        )
+        response = StreamingHttpResponse(
+            renderer.lines(rows),
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="records.{renderer.format}"'
+        )
+        return response
+
+
+class RecordSearchAPI(generics.GenericAPIView):
+    """
+    Full-text search over the user's record notes: ``?q=coffee shop``.
+
+    Every word must match and the last one may be a prefix. Results are
+    ordered by relevance and paged with ``?page`` / ``?page_size``.
+    """
+
+    serializer_class = RecordSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    page_size = 20
+    max_page_size = 100
+
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        try:
+            page = max(1, int(params.get("page", 1)))
+            page_size = min(
+                max(1, int(params.get("page_size", self.page_size))),
+                self.max_page_size,
+            )
+        except ValueError:
+            raise ValidationError("page and page_size must be integers.")
+
+        records = search_records(
+            request.user,
+            params.get("q", ""),
+            offset=(page - 1) * page_size,
+            limit=page_size + 1,
+        )
+        next_url = None
+        if len(records) > page_size:
+            records = records[:page_size]
+            next_url = request.build_absolute_uri(
+                f"{request.path}?{urlencode({**params.dict(), 'page': page + 1})}"
+            )
+        serializer = self.get_serializer(records, many=True)
+        return Response({"next": next_url, "results": serializer.data})
+
+
+class RecordCashFlowAPI(generics.GenericAPIView):
+    """
+    Income, expense and net per ``?bucket=day|week|month`` (default month)
+    between ``?start_date`` and ``?end_date``, narrowed by the record filters,
+    in the user's base currency.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [RecordFilterBackend]
+
+    def get_queryset(self):
+        return Record.objects.filter(user=self.request.user)
+
+    def get(self, request, *args, **kwargs):
+        records = self.filter_queryset(self.get_queryset())
+        params = request.query_params
+        bucket = params.get("bucket", "month")
+        if bucket not in BUCKETS:
+            raise ValidationError({"bucket": "Choose from day, week, month."})
+        # ``filter_records`` has already rejected malformed dates.
+        end = (
+            date.fromisoformat(params["end_date"])
+            if params.get("end_date")
+            else timezone.localdate()
+        )
+        start = (
+            date.fromisoformat(params["start_date"])
+            if params.get("start_date")
+            else default_start(end, bucket)
+        )
+        if start > end:
+            raise ValidationError({"start_date": "Must not be after end_date."})
+        if len(bucket_starts(start, end, bucket)) > MAX_BUCKETS:
+            raise ValidationError(
+                {"bucket": f"At most {MAX_BUCKETS} buckets; use a wider bucket."}
+            )
+        currency = request.user.base_currency
+        series, missing_rates = cash_flow(records, start, end, bucket, currency)
+        return Response(
+            {
+                "bucket": bucket,
+                "start": start,
+                "end": end,
+                "currency": currency,
+                "missing_rates": missing_rates,
+                "series": CashFlowSerializer(series, many=True).data,
+            }
+        )
+
+
+class RecordAnalyticsAPI(generics.GenericAPIView):
+    """
+    Category totals, amount percentiles and ``?window``-day rolling sums of the
+    user's ``?record_type`` (default expense) records between ``?start_date``
+    and ``?end_date`` (default the last 90 days), in the base currency.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    default_days = 90
+    max_days = 3700
+    max_window = 366
+
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        errors = {}
+        try:
+            end = (
+                date.fromisoformat(params["end_date"])
+                if params.get("end_date")
+                else timezone.localdate()
+            )
+            start = (
+                date.fromisoformat(params["start_date"])
+                if params.get("start_date")
+                else end - timedelta(days=self.default_days - 1)
+            )
+        except ValueError:
+            errors["date"] = "Use YYYY-MM-DD for start_date and end_date."
+        try:
+            window = int(params.get("window", 7))
+            if not 1 <= window <= self.max_window:
+                raise ValueError
+        except ValueError:
+            errors["window"] = f"Use a number of days from 1 to {self.max_window}."
+        record_type = params.get("record_type", "expense")
+        if record_type not in RECORD_TYPE_CODES:
+            errors["record_type"] = f"Choose from {', '.join(RECORD_TYPE_CODES)}."
+        if not errors:
+            if start > end:
+                errors["start_date"] = "Must not be after end_date."
+            elif (end - start).days >= self.max_days:
+                errors["start_date"] = f"At most {self.max_days} days."
+        if errors:
+            raise ValidationError(errors)
+
+        frame = record_frame(request.user)
+        totals = category_totals(frame, start, end, record_type)
+        percentiles = amount_percentiles(frame, (50, 90, 99), start, end, record_type)
+        rolling = rolling_sums(frame, window, start, end, record_type)
+        analytics = {
+            "currency": frame.currency,
+            "missing_rates": frame.missing_rates,
+            "start": start,
+            "end": end,
+            "categories": [
+                {"category": category, "total": total} for category, total in totals
+            ],
+            "percentiles": {f"p{p}": value for p, value in percentiles.items()},
+            "rolling": [{"date": day, "total": total} for day, total in rolling],
+        }
+        return Response(RecordAnalyticsSerializer(analytics).data)
+
+
+class RecordDetailAPI(DataVersionETagMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = RecordSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         return Record.objects.filter(user=self.request.user)
 
+    def perform_destroy(self, instance):
+        delete_record(instance)
+
 
 class RecordAddView(LoginRequiredMixin, CreateView):
     model = Record
@@ -149,32 +632,9 @@ class RecordAddView(LoginRequiredMixin, CreateView):
         return form
 
     def form_valid(self, form):
-
         form.instance.user = self.request.user
-        record = form.save(commit=False)
-
-        if record.record_type == "expense":
-            if record.account:
-                record.account.balance -= record.amount
-                record.account.save()
-        elif record.record_type == "income":
-            if record.account:
-                record.account.balance += record.amount
-                record.account.save()
-        elif record.record_type == "transfer":
-            if record.from_account and record.to_account:
-                record.from_account.balance -= record.amount
-                record.to_account.balance += record.amount
-                record.from_account.save()
-                record.to_account.save()
-
-        if not record.date:
-            record.date = timezone.now().date()
-        if not record.time:
-            record.time = timezone.now().time()
-
-        record.save()
-        return super().form_valid(form)
+        self.object = create_record(form.save(commit=False))
+        return redirect(self.get_success_url())
 
 
 class RecordUpdateView(LoginRequiredMixin, UpdateView):
@@ -209,50 +669,8 @@ class RecordUpdateView(LoginRequiredMixin, UpdateView):
 
     def form_valid(self, form):
         form.instance.user = self.request.user
-        record = form.save(commit=False)
-
-        old_record = Record.objects.get(pk=self.object.pk)
-        if old_record.record_type == "expense" and old_record.account:
-            old_record.account.balance += old_record.amount
-            old_record.account.save()
-
-        elif old_record.record_type == "income" and old_record.account:
-            old_record.account.balance -= old_record.amount
-            old_record.account.save()
-
-        elif (
-            old_record.record_type == "transfer"
-            and old_record.from_account
-            and old_record.to_account
-        ):
-            old_record.from_account.balance += old_record.amount
-            old_record.to_account.balance -= old_record.amount
-            old_record.from_account.save()
-            old_record.to_account.save()
-
-        if record.record_type == "expense" and record.account:
-            record.account.balance -= record.amount
-            record.account.save()
-        elif record.record_type == "income" and record.account:
-            record.account.balance += record.amount
-            record.account.save()
-        elif (
-            record.record_type == "transfer"
-            and record.from_account
-            and record.to_account
-        ):
-            record.from_account.balance -= record.amount
-            record.to_account.balance += record.amount
-            record.from_account.save()
-            record.to_account.save()
-
-        if not record.date:
-            record.date = timezone.now().date()
-        if not record.time:
-            record.time = timezone.now().time()
-
-        record.save()
-        return super().form_valid(form)
+        self.object = update_record(form.save(commit=False))
+        return redirect(self.get_success_url())
 
 
 class RecordDeleteView(LoginRequiredMixin, DeleteView):
@@ -263,25 +681,121 @@ class RecordDeleteView(LoginRequiredMixin, DeleteView):
     def get_queryset(self):
         return Record.objects.filter(user=self.request.user)
 
+    def form_valid(self, form):
+        delete_record(self.object)
+        return redirect(self.get_success_url())
 
-class BudgetListCreateAPI(generics.ListCreateAPIView):
+
+class BudgetListCreateAPI(DataVersionETagMixin, generics.ListCreateAPIView):
     serializer_class = BudgetSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # ``spent`` and ``progress`` cover the current period window.
+    etag_per_day = True
 
     def get_queryset(self):
-        return Budget.objects.filter(user=self.request.user)
+        return with_data_version(
+            Budget.objects.filter(user=self.request.user).prefetch_related(
+                "account", "budget_categories"
+            )
+        )
+
+    def list(self, request, *args, **kwargs):
+        budgets = load_spent(self.filter_queryset(self.get_queryset()))
+        return Response(self.get_serializer(budgets, many=True).data)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
 
-class BudgetRetrieveUpdateDestroyAPI(generics.RetrieveUpdateDestroyAPIView):
+class BudgetRetrieveUpdateDestroyAPI(
+    DataVersionETagMixin, generics.RetrieveUpdateDestroyAPIView
+):
     serializer_class = BudgetSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    etag_per_day = True
+
+    def get_queryset(self):
+        return with_data_version(Budget.objects.filter(user=self.request.user))
+
+
+class BudgetHistoryAPI(generics.GenericAPIView):
+    """
+    Spent and remaining for each period window of a budget, from its start up
+    to the window containing ``?until`` (default today).
+    """
+
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         return Budget.objects.filter(user=self.request.user)
 
+    def get(self, request, *args, **kwargs):
+        budget = self.get_object()
+        try:
+            until = date.fromisoformat(request.query_params["until"])
+        except KeyError:
+            until = timezone.localdate()
+        except ValueError:
+            return Response(
+                {"until": "Use the YYYY-MM-DD format."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        periods = BudgetPeriodSerializer(budget_history(budget, until), many=True)
+        return Response(
+            {
+                "budget": budget.pk,
+                "period": budget.period,
+                "amount": str(budget.amount),
+                "currency": budget.currency,
+                "periods": periods.data,
+            }
+        )
+
+
+class BudgetForecastAPI(generics.GenericAPIView):
+    """
+    Projected spend at the end of the current window of one budget (with
+    ``pk``) or of all the user's budgets, with a 95% band around it.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return with_data_version(
+            Budget.objects.filter(user=self.request.user).prefetch_related(
+                "account", "budget_categories"
+            )
+        )
+
+    def get(self, request, *args, **kwargs):
+        if "pk" in kwargs:
+            budgets = [self.get_object()]
+        else:
+            budgets = self.get_queryset()
+        forecasts = cached_forecasts(budgets, timezone.localdate())
+        return Response(BudgetForecastSerializer(forecasts, many=True).data)
+
+
+class NotificationListAPI(generics.ListAPIView):
+    """The user's notifications, newest first; ``?unread=true`` for unread only."""
+
+    serializer_class = NotificationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = Notification.objects.filter(user=self.request.user)
+        if self.request.query_params.get("unread") in ("true", "1"):
+            queryset = queryset.filter(is_read=False)
+        return queryset.order_by("-created_at", "-id")
+
+
+class NotificationDetailAPI(generics.RetrieveUpdateAPIView):
+    serializer_class = NotificationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return Notification.objects.filter(user=self.request.user)
+
 
 class BudgetCreateView(LoginRequiredMixin, CreateView):
     model = Budget
@@ -368,7 +882,11 @@ class BudgetListView(LoginRequiredMixin, ListView):
     context_object_name = "budgets"
 
     def get_queryset(self):
-        return Budget.objects.filter(user=self.request.user).order_by("-created_at")
+        return load_spent(
+            with_data_version(Budget.objects.filter(user=self.request.user))
+            .prefetch_related("budget_categories")
+            .order_by("-created_at")
+        )
 
 
 class GoalListView(LoginRequiredMixin, ListView):
@@ -0,0 +1,204 @@
+from collections import defaultdict
+from functools import wraps
+
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from public.models import CustomUser
+from .budgets import current_windows, with_spent
+from .conditional import data_version_etag, not_modified, tag_response
+from .dashboard import acached_dashboard
+from .fieldsets import (
+    parse_fields,
+    record_values,
+    serialize_record_rows,
+    serialize_values,
+)
+from .filters import filter_records
+from .models import Account, Budget, BudgetCategory, Record
+from .pagination import RecordCursorPagination, page_queryset, split_page
+from .serializers import AccountSerializer, BudgetSerializer, DashboardSerializer
+
+# Async versions of the read-heavy list endpoints, for ASGI deployments
+# (``expensetracker.asgi``). They return the same JSON as their DRF
+# counterparts but query through the async ORM, so a slow report waits on
+# the database without holding a worker thread. DRF views are synchronous,
+# which is why these are plain Django views with their own JWT check.
+
+ACCOUNT_FIELDS = AccountSerializer().fields
+BUDGET_FIELDS = BudgetSerializer().fields
+# Stored on ``Budget`` itself; the rest are filled in.
+BUDGET_MODEL_FIELDS = [
+    name
+    for name in BUDGET_FIELDS
+    if name not in ("account", "categories", "spent", "progress")
+]
+
+
+async def authenticate(request):
+    """The active user of the JWT bearer token or session, or None."""
+    jwt = JWTAuthentication()
+    header = jwt.get_header(request)
+    if header is None:
+        user = await request.auser()
+        return user if user.is_authenticated else None
+
+    raw_token = jwt.get_raw_token(header)
+    if raw_token is None:
+        return None
+    try:
+        token = jwt.get_validated_token(raw_token)
+        user_id = token[jwt_settings.USER_ID_CLAIM]
+    except (InvalidToken, TokenError, KeyError):
+        return None
+    try:
+        user = await CustomUser.objects.aget(**{jwt_settings.USER_ID_FIELD: user_id})
+    except CustomUser.DoesNotExist:
+        return None
+    return user if user.is_active else None
+
+
+def async_api_view(etag=False, etag_per_day=False):
+    """
+    Authenticate, pass the user to the view and turn ``ValidationError`` into
+    a 400, like DRF. With ``etag`` the response is tagged with the user's data
+    version (and with ``etag_per_day`` today's date) and unchanged data is
+    answered with 304.
+    """
+
+    def decorator(view):
+        @require_GET
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            user = await authenticate(request)
+            if user is None:
+                return JsonResponse(
+                    {"detail": "Authentication credentials were not provided."},
+                    status=401,
+                )
+            if etag:
+                tag = data_version_etag(
+                    user, timezone.localdate() if etag_per_day else None
+                )
+                response = not_modified(request, tag)
+                if response is not None:
+                    return tag_response(response, tag)
+            try:
+                response = await view(request, user, *args, **kwargs)
+            except ValidationError as exc:
+                return JsonResponse(exc.detail, status=400)
+            return tag_response(response, tag) if etag else response
+
+        return wrapper
+
+    return decorator
+
+
+@async_api_view(etag=True)
+async def account_list(request, user):
+    fields = list(ACCOUNT_FIELDS)
+    rows = [
+        row
+        async for row in Account.objects.filter(user=user).values(*fields).aiterator()
+    ]
+    return JsonResponse(serialize_values(rows, ACCOUNT_FIELDS, fields), safe=False)
+
+
+@async_api_view(etag=True)
+async def record_list(request, user):
+    fields = parse_fields(request.GET)
+    records = filter_records(Record.objects.filter(user=user), request.GET)
+    paginator = RecordCursorPagination()
+    paginator.request = request
+    # ``get_page_size`` reads DRF's ``query_params``.
+    page_size = paginator.get_page_size(Request(request))
+    try:
+        queryset = page_queryset(
+            record_values(records, fields),
+            request.GET.get(paginator.cursor_query_param),
+            page_size,
+        )
+    except ValueError:
+        return JsonResponse({"detail": "Invalid cursor"}, status=404)
+
+    rows = [row async for row in queryset.aiterator()]
+    page, paginator.next_cursor = split_page(rows, page_size)
+    return JsonResponse(
+        {
+            "next": paginator.get_next_link(),
+            "first": paginator.get_first_link(),
+            "results": serialize_record_rows(page, fields),
+        }
+    )
+
+
+@async_api_view(etag=True, etag_per_day=True)
+async def budget_list(request, user):
+    accounts = defaultdict(list)
+    # ``values()`` rather than ``values_list()``: the latter runs its query as
+    # soon as ``aiterator()`` is called, on the event loop.
+    async for link in (
+        Budget.account.through.objects.filter(budget__user=user)
+        .order_by("pk")
+        .values("budget_id", "account_id")
+        .aiterator()
+    ):
+        accounts[link["budget_id"]].append(link["account_id"])
+    categories = defaultdict(list)
+    async for link in (
+        BudgetCategory.objects.filter(budget__user=user)
+        .order_by("pk")
+        .values("budget_id", "category")
+        .aiterator()
+    ):
+        categories[link["budget_id"]].append(link["category"])
+
+    rows = [
+        row
+        async for row in Budget.objects.filter(user=user)
+        .order_by("pk")
+        .values(*BUDGET_MODEL_FIELDS)
+        .aiterator()
+    ]
+    windows = current_windows(
+        (
+            Budget(
+                pk=row["id"],
+                period=row["period"],
+                start_date=row["start_date"],
+                end_date=row["end_date"],
+            )
+            for row in rows
+        ),
+        timezone.localdate(),
+    )
+    spent = {
+        row["pk"]: row["spent"]
+        async for row in with_spent(Budget.objects.filter(user=user), windows)
+        .values("pk", "spent")
+        .aiterator()
+    }
+    for row in rows:
+        row.update(
+            account=accounts[row["id"]],
+            categories=categories[row["id"]],
+            spent=spent[row["id"]],
+            progress=(
+                (spent[row["id"]] / row["amount"]) * 100 if row["amount"] > 0 else 0
+            ),
+        )
+    return JsonResponse(
+        serialize_values(rows, BUDGET_FIELDS, list(BUDGET_FIELDS)), safe=False
+    )
+
+
+@async_api_view()
+async def dashboard(request, user):
+    summary = await acached_dashboard(user, timezone.localdate())
+    return JsonResponse(DashboardSerializer(summary).data)
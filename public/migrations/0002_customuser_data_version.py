@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("public", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customuser",
+            name="data_version",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("public", "0002_customuser_data_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customuser",
+            name="base_currency",
+            field=models.CharField(default="NGN", max_length=3),
+        ),
+    ]
@@ -6,6 +6,11 @@ from django.contrib.auth.models import AbstractUser
 
 class CustomUser(AbstractUser):
     email = models.EmailField(unique=True)
+    # Bumped whenever the user's records, accounts, budgets or goals change;
+    # derived values are cached under it and API responses tagged with it.
+    data_version = models.PositiveBigIntegerField(default=0)
+    # Totals across accounts in different currencies are reported in this one.
+    base_currency = models.CharField(max_length=3, default="NGN")
 
     def __str__(self):
         return self.email
@@ -7,7 +7,15 @@ class RegisterSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = CustomUser
-        fields = ["id", "username", "first_name", "last_name", "email", "password"]
+        fields = [
+            "id",
+            "username",
+            "first_name",
+            "last_name",
+            "email",
+            "password",
+            "base_currency",
+        ]
 
     def create(self, validated_data):
         user = CustomUser(
@@ -15,6 +23,7 @@ class RegisterSerializer(serializers.ModelSerializer):
             first_name=validated_data.get("first_name", ""),
             last_name=validated_data.get("last_name", ""),
             email=validated_data["email"],
+            base_currency=validated_data.get("base_currency", "NGN"),
         )
         user.set_password(validated_data["password"])
         user.save()